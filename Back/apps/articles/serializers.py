@@ -169,10 +169,27 @@ class ArticleSerializer(serializers.ModelSerializer):
 
     def get_is_favorite(self, obj):
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
+        if self.context.get('personalize', True) and request and request.user.is_authenticated:
             return obj.favorites.filter(id=request.user.id).exists()
         return False
 
+    @classmethod
+    def get_user_overlay(cls, user, article_ids):
+        """
+        Retorna os campos pessoais (favorito) de vários artigos com uma única consulta
+
+        Usado para completar as listagens em cache, geradas sem os dados do usuário
+        (context['personalize'] = False).
+
+        Returns:
+            dict: {id do artigo: {'is_favorite': bool}}
+        """
+        favorite_ids = set(
+            Article.favorites.through.objects.filter(user_id=user.id, article_id__in=article_ids)
+            .values_list('article_id', flat=True)
+        )
+        return {article_id: {'is_favorite': article_id in favorite_ids} for article_id in article_ids}
+
     def validate(self, data):
         """
         Validação adicional para o artigo
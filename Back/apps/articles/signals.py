@@ -0,0 +1,11 @@
+"""
+Sinais do app de artigos
+"""
+
+from apps.categories.models import Category
+from core.services.list_cache import list_cache
+from .models import Article, Comment, Tag
+
+# Invalidar a listagem de artigos em cache quando os dados exibidos nela mudarem
+# (os favoritos não fazem parte da listagem compartilhada)
+list_cache.invalidate_on('articles_list', Article, Comment, Tag, Category, Article.tags.through)
@@ -2,12 +2,17 @@
 Testes para o app de artigos
 """
 
+from datetime import timedelta
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from .models import Article, Tag, Comment
+from core.services.view_counter import view_counter
 from apps.categories.models import Category
 import json
 
@@ -67,6 +72,29 @@ class ArticleAPITestCase(TestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['title'], 'Test Article')
 
+    def test_list_articles_favorites_per_user(self):
+        """
+        Teste para verificar que a listagem em cache não compartilha os favoritos entre usuários
+        """
+        url = reverse('article-list')
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpassword'
+        )
+
+        # Primeira requisição anônima (preenche o cache)
+        response = self.client.get(url)
+        self.assertFalse(response.data['results'][0]['is_favorite'])
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        self.assertTrue(response.data['results'][0]['is_favorite'])
+
+        self.client.force_authenticate(user=other_user)
+        response = self.client.get(url)
+        self.assertFalse(response.data['results'][0]['is_favorite'])
+
     def test_retrieve_article(self):
         """
         Teste para recuperar um artigo específico
@@ -186,7 +214,63 @@ class ArticleAPITestCase(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'success')
+        self.assertEqual(response.data['views_count'], 1)
 
-        # Verificar se as visualizações foram incrementadas
+        # Verificar se as visualizações foram incrementadas após a gravação em lote
+        view_counter.flush()
         article = Article.objects.get(slug=self.article.slug)
         self.assertEqual(article.views_count, 1)
+
+
+class CommentCursorPaginationTestCase(TestCase):
+    """
+    Testes para a paginação por cursor dos comentários
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.article = Article.objects.create(title='Artigo comentado', content='Conteúdo do artigo')
+        created_at = timezone.now()
+        # Comentários com o mesmo horário, desempatados pelo id
+        for index in range(7):
+            Comment.objects.create(
+                article=self.article, name=f'Leitor {index}', text='Comentário',
+                created_at=created_at + timedelta(seconds=index // 3)
+            )
+
+        self.client = APIClient()
+        self.url = '/api/v1/articles/comments/'
+
+    def test_cursor_pages_cover_all_comments(self):
+        """
+        Testa que as páginas seguem a ordem (created_at, id) sem repetir nem pular itens
+        """
+        names = []
+        response = self.client.get(self.url, {'article': self.article.id, 'pagination': 'cursor', 'page_size': 2})
+        self.assertNotIn('count', response.data)
+        while True:
+            names += [comment['name'] for comment in response.data['results']]
+            if not response.data['next']:
+                break
+            # Página seguinte: filtro pela posição, sem OFFSET e sem contagem do total
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(response.data['next'])
+            page_query = next(query['sql'] for query in queries if 'article_id" = ' in query['sql'])
+            self.assertNotIn('OFFSET', page_query)
+            self.assertNotIn('COUNT', page_query)
+        self.assertEqual(names, [f'Leitor {index}' for index in range(7)])
+
+    def test_count_on_request_and_invalid_cursor(self):
+        """
+        Testa a contagem opcional e a rejeição de cursores inválidos
+        """
+        response = self.client.get(self.url, {'article': self.article.id, 'pagination': 'cursor', 'count': 'true'})
+        self.assertEqual(response.data['count'], 7)
+
+        response = self.client.get(self.url, {'cursor': 'invalido'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Sem o parâmetro, a paginação por número de página continua igual
+        response = self.client.get(self.url, {'article': self.article.id, 'page': 2, 'page_size': 5})
+        self.assertEqual((response.data['count'], len(response.data['results'])), (7, 2))
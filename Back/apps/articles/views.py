@@ -8,14 +8,16 @@ from .serializers import ArticleSerializer, CommentSerializer, TagSerializer
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from .services import article_service, comment_service
-from django.core.cache import cache
+from core.services.view_counter import view_counter
+from utils.mixins import CachedListMixin
+from utils.pagination import KeysetPagination
 
-class ArticlePagination(PageNumberPagination):
+class ArticlePagination(KeysetPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class CommentPagination(PageNumberPagination):
+class CommentPagination(KeysetPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -25,11 +27,13 @@ class TagPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Article.objects.all().select_related('category').prefetch_related('tags', 'favorites')
     serializer_class = ArticleSerializer
     lookup_field = 'slug'
+    list_cache_name = 'articles_list'
     pagination_class = ArticlePagination
+    keyset_ordering = ('-created_at', '-id')
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category__slug', 'tags__slug', 'featured']
@@ -46,45 +50,21 @@ class ArticleViewSet(viewsets.ModelViewSet):
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
+        # A listagem fica em cache para todos os usuários; os campos pessoais são mesclados depois
+        context['personalize'] = self.action != 'list'
         return context
 
-    def list(self, request, *args, **kwargs):
-        """
-        Lista todos os artigos com suporte a cache
-        """
-        # Verificar se a resposta está em cache
-        cache_key = f"articles_list_{request.query_params.urlencode()}"
-        cached_response = cache.get(cache_key)
-
-        if cached_response and not request.query_params.get('nocache'):
-            return Response(cached_response)
-
-        # Aplicar filtros padrão
-        queryset = self.filter_queryset(self.get_queryset())
-
-        # Paginação
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
-            # Armazenar em cache por 5 minutos (300 segundos)
-            cache.set(cache_key, response.data, 300)
-            return response
-
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
-        # Armazenar em cache por 5 minutos (300 segundos)
-        cache.set(cache_key, data, 300)
-        return Response(data)
+    def get_user_overlay(self, user, ids):
+        return ArticleSerializer.get_user_overlay(user, ids)
 
     @action(detail=True, methods=['post'])
     def increment_views(self, request, slug=None):
         article = self.get_object()
-        # Usar o serviço para incrementar visualizações
-        article_service.view_article(article.id)
+        # Usar o serviço para incrementar visualizações (gravadas em lote pelo view_counter)
+        article_service.view_article(article.id, view_counter.get_visitor(request))
         return Response({
             'status': 'success',
-            'views_count': article.views_count
+            'views_count': view_counter.get_count(article)
         })
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -116,6 +96,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = CommentSerializer
     pagination_class = CommentPagination
+    keyset_ordering = ('created_at', 'id')
     permission_classes = [permissions.AllowAny]  # Permitir acesso anônimo
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['article', 'parent', 'is_approved', 'is_spam']
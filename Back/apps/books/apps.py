@@ -5,3 +5,7 @@ class BooksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.books"
     verbose_name = "Livros"
+
+    def ready(self):
+        # Registrar os sinais do app
+        from . import signals  # noqa: F401
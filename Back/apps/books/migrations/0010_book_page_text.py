@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_book_views_count_alter_bookcomment_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookPageText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_number', models.PositiveIntegerField(verbose_name='Página')),
+                ('text', models.TextField(blank=True, verbose_name='Texto')),
+                ('source', models.CharField(max_length=32, verbose_name='Arquivo de origem')),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='page_texts', to='books.book', verbose_name='Livro')),
+            ],
+            options={
+                'verbose_name': 'Texto da página',
+                'verbose_name_plural': 'Textos das páginas',
+                'ordering': ['book', 'page_number'],
+                'unique_together': {('book', 'page_number')},
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+"""
+Índice de busca textual sobre o texto das páginas dos livros.
+
+No SQLite é criada uma tabela FTS5 com o texto das páginas, mantida atualizada por
+triggers; no PostgreSQL, um índice GIN sobre o tsvector do texto. Nos demais bancos
+a busca usa uma varredura simples e nenhum índice é criado.
+"""
+
+from django.db import migrations
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS books_bookpagetext_fts USING fts5(
+        text,
+        content='books_bookpagetext',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_bookpagetext_fts_insert AFTER INSERT ON books_bookpagetext BEGIN
+        INSERT INTO books_bookpagetext_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_bookpagetext_fts_delete AFTER DELETE ON books_bookpagetext BEGIN
+        INSERT INTO books_bookpagetext_fts(books_bookpagetext_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_bookpagetext_fts_update AFTER UPDATE ON books_bookpagetext BEGIN
+        INSERT INTO books_bookpagetext_fts(books_bookpagetext_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO books_bookpagetext_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    # Indexar as páginas já extraídas
+    "INSERT INTO books_bookpagetext_fts(books_bookpagetext_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS books_bookpagetext_fts_insert",
+    "DROP TRIGGER IF EXISTS books_bookpagetext_fts_delete",
+    "DROP TRIGGER IF EXISTS books_bookpagetext_fts_update",
+    "DROP TABLE IF EXISTS books_bookpagetext_fts",
+]
+
+POSTGRESQL_CREATE = [
+    "CREATE INDEX IF NOT EXISTS books_bookpagetext_search ON books_bookpagetext "
+    "USING gin (to_tsvector('portuguese', text))",
+]
+
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS books_bookpagetext_search",
+]
+
+
+def run_statements(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0010_book_page_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_CREATE, 'postgresql': POSTGRESQL_CREATE}),
+            run_statements({'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP}),
+        ),
+    ]
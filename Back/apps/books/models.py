@@ -45,3 +45,26 @@ class Book(models.Model):
                 counter += 1
 
         super().save(*args, **kwargs)
+
+
+class BookPageText(models.Model):
+    """
+    Texto extraído de cada página do PDF de um livro
+
+    As páginas são extraídas em uma única passagem pelo PDF depois do upload;
+    source identifica o arquivo de origem (nome, tamanho e data de modificação)
+    para que um PDF substituído seja extraído novamente.
+    """
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='page_texts', verbose_name="Livro")
+    page_number = models.PositiveIntegerField(verbose_name="Página")
+    text = models.TextField(blank=True, verbose_name="Texto")
+    source = models.CharField(max_length=32, verbose_name="Arquivo de origem")
+
+    class Meta:
+        verbose_name = "Texto da página"
+        verbose_name_plural = "Textos das páginas"
+        ordering = ['book', 'page_number']
+        unique_together = ['book', 'page_number']
+
+    def __str__(self):
+        return f"{self.book.title} - página {self.page_number}"
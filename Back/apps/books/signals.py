@@ -0,0 +1,54 @@
+"""
+Sinais do app de livros
+"""
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from apps.categories.models import Category
+from core.services.list_cache import list_cache
+from .models import Book
+
+# Invalidar a listagem de livros em cache quando os dados exibidos nela mudarem
+list_cache.invalidate_on('books_list', Book, Category)
+
+
+@receiver(pre_save, sender=Book)
+def track_book_pdf_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Registra se o PDF de um livro existente mudou, para que salvar apenas outros campos
+    (título, descrição, capa...) não extraia e indexe o PDF de novo.
+    """
+    if instance._state.adding:
+        instance._pdf_changed = True
+        return
+
+    if update_fields is not None and 'pdf_file' not in update_fields:
+        instance._pdf_changed = False
+        return
+
+    previous = sender.objects.filter(pk=instance.pk).values_list('pdf_file', flat=True).first()
+    instance._pdf_changed = previous is None or (previous or '') != (instance.pdf_file.name or '')
+
+
+@receiver(post_save, sender=Book)
+def schedule_book_pdf_index(sender, instance, created=False, **kwargs):
+    """
+    Indexa os metadados e extrai o texto do PDF de um livro em segundo plano após criá-lo
+    ou trocar o seu PDF
+    """
+    if not (created or getattr(instance, '_pdf_changed', False)):
+        return
+
+    if not instance.pdf_file:
+        return
+
+    from core.services.pdf_index_service import pdf_index_service
+    from core.services.book_service import book_service
+
+    def schedule():
+        pdf_index_service.schedule_index(instance.pdf_file.path)
+        book_service.schedule_text_extraction(instance)
+
+    # Só indexar depois que a transação for confirmada e o arquivo estiver disponível
+    transaction.on_commit(schedule)
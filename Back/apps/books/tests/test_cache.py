@@ -8,6 +8,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from core.services.list_cache import list_cache
 from ..models import Book
 from apps.categories.models import Category
 import time
@@ -102,11 +103,44 @@ class BookCacheTestCase(TestCase):
         self.assertEqual(response4.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response4.data['results']), 2)
         
-        # Quinta requisição sem nocache (deve ainda mostrar apenas o livro original devido ao cache)
+        # Quinta requisição sem nocache (a criação do livro invalidou a listagem em cache)
         response5 = self.client.get(self.list_url)
         
         self.assertEqual(response5.status_code, status.HTTP_200_OK)
-        self.assertEqual(response5.data, response2.data)
+        self.assertEqual(len(response5.data['results']), 2)
+        
+        # A nova listagem fica em cache na versão atual
+        cached_key = list_cache.get_key('books_list', '')
+        self.assertEqual(cache.get(cached_key)['data'], response5.data)
+        
+        # Alterar a categoria exibida na listagem também a invalida
+        self.category.name = 'Renamed Category'
+        self.category.save()
+        self.assertIsNone(cache.get(list_cache.get_key('books_list', '')))
+    
+    def test_list_books_etag(self):
+        """
+        Teste para verificar o ETag da listagem e a resposta 304
+        """
+        response1 = self.client.get(self.list_url)
+        etag = response1['ETag']
+        self.assertTrue(etag)
+        
+        # Requisição condicional com o mesmo ETag
+        response2 = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response2.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response2['ETag'], etag)
+        
+        # Depois de uma alteração, o ETag muda e o conteúdo é enviado
+        Book.objects.create(
+            title='New Test Book',
+            description='This is a new test book description',
+            category=self.category
+        )
+        response3 = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response3.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response3['ETag'], etag)
+        self.assertEqual(len(response3.data['results']), 2)
     
     def test_detail_book_cache(self):
         """
@@ -0,0 +1,171 @@
+"""
+Testes para o endpoint binário de imagens das páginas do PDF
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..models import Book
+from apps.categories.models import Category
+
+try:
+    from PyPDF2 import PdfWriter
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+
+@unittest.skipUnless(PYPDF2_AVAILABLE, "PyPDF2 é necessário para os testes de páginas do PDF")
+class BookPageImageTestCase(TestCase):
+    """
+    Testes para o envio direto das imagens das páginas, com ETag e Last-Modified
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.media_root = tempfile.mkdtemp()
+        self._settings = override_settings(MEDIA_ROOT=self.media_root, SENDFILE_ROOT=self.media_root)
+        self._settings.enable()
+
+        # Criar um PDF de 2 páginas
+        os.makedirs(os.path.join(self.media_root, 'books'))
+        writer = PdfWriter()
+        for _ in range(2):
+            writer.add_blank_page(width=595, height=842)
+        with open(os.path.join(self.media_root, 'books', 'livro.pdf'), 'wb') as f:
+            writer.write(f)
+
+        # Imagem que simula a página já convertida no cache
+        self.image_path = os.path.join(self.media_root, 'pdf_cache', 'pagina.jpeg')
+        os.makedirs(os.path.dirname(self.image_path))
+        with open(self.image_path, 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0conteudo-jpeg')
+
+        category = Category.objects.create(name='Categoria', slug='categoria')
+        self.book = Book.objects.create(
+            title='Livro de Teste',
+            description='Descrição',
+            category=category,
+            pdf_file='books/livro.pdf'
+        )
+
+        self.client = APIClient()
+        self.url = reverse('book-page-image', kwargs={'slug': self.book.slug, 'page_number': 1})
+
+        self._get_page_image_path = patch(
+            'core.services.pdf_service.pdf_service.get_page_image_path',
+            return_value=self.image_path
+        )
+        self.get_page_image_path = self._get_page_image_path.start()
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        self._get_page_image_path.stop()
+        self._settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_page_image_is_streamed(self):
+        """
+        Testa que a imagem é enviada como arquivo binário com cabeçalhos de cache
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(b''.join(response.streaming_content), b'\xff\xd8\xff\xe0conteudo-jpeg')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('max-age', response['Cache-Control'])
+        self.get_page_image_path.assert_called_once_with(self.book.pdf_file.path, 1, 'JPEG', 200, 85)
+
+    def test_format_is_negotiated_from_accept(self):
+        """
+        Testa que, sem o parâmetro format, o formato é escolhido pelo cabeçalho Accept
+        """
+        webp_path = os.path.join(self.media_root, 'pdf_cache', 'pagina.webp')
+        with open(webp_path, 'wb') as f:
+            f.write(b'RIFF0000WEBP')
+        self.get_page_image_path.return_value = webp_path
+
+        response = self.client.get(self.url, HTTP_ACCEPT='image/webp,*/*')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response['Vary'])
+        self.get_page_image_path.assert_called_once_with(self.book.pdf_file.path, 1, 'WEBP', 200, 80)
+
+    def test_if_none_match_returns_not_modified(self):
+        """
+        Testa que o cliente com a versão atual recebe 304 sem o conteúdo
+        """
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    @override_settings(SENDFILE_BACKEND='nginx', SENDFILE_URL='/protected/')
+    def test_nginx_backend_uses_accel_redirect(self):
+        """
+        Testa que, com o nginx configurado, o arquivo é entregue pelo servidor web
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/pdf_cache/pagina.jpeg')
+        self.assertEqual(response.content, b'')
+
+    def test_invalid_page_returns_not_found(self):
+        """
+        Testa a requisição de uma página inexistente
+        """
+        url = reverse('book-page-image', kwargs={'slug': self.book.slug, 'page_number': 3})
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.get_page_image_path.assert_not_called()
+
+    def test_only_listed_dpi_and_quality_are_accepted(self):
+        """
+        Testa que valores de dpi e quality fora das opções retornam 400 sem gerar imagens
+        """
+        pdf_as_images = reverse('book-pdf-as-images', kwargs={'slug': self.book.slug})
+        for url, params in (
+            (self.url, {'dpi': 201}),
+            (self.url, {'dpi': 5000}),
+            (self.url, {'quality': 84}),
+            (self.url, {'dpi': 'alta'}),
+            (pdf_as_images, {'page': 1, 'dpi': 199}),
+            (pdf_as_images, {'page': 1, 'quality': 101}),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+        self.get_page_image_path.assert_not_called()
+
+        response = self.client.get(self.url, {'dpi': 300, 'quality': 90})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.get_page_image_path.assert_called_once_with(self.book.pdf_file.path, 1, 'JPEG', 300, 90)
+
+    def test_pdf_as_images_returns_image_url(self):
+        """
+        Testa que pdf_as_images retorna o URL da imagem em vez do conteúdo em base64
+        """
+        url = reverse('book-pdf-as-images', kwargs={'slug': self.book.slug})
+
+        response = self.client.get(url, {'page': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('image', response.data)
+        self.assertIn(f'/{self.book.slug}/pages/2/image', response.data['image_url'])
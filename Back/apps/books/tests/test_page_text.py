@@ -0,0 +1,196 @@
+"""
+Testes para o texto das páginas extraído dos PDFs dos livros
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..models import Book, BookPageText
+from apps.categories.models import Category
+from core.services.book_service import BookService, book_service
+from core.services.pdf_reader_pool import pdf_reader_pool
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+
+def write_text_pdf(path, texts):
+    """Grava um PDF mínimo com uma linha de texto em cada página."""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in texts:
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(texts)} >>"
+
+    data = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+
+    xref_offset = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        data += f"{offset:010d} 00000 n \n".encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+@unittest.skipUnless(PYPDF2_AVAILABLE, "PyPDF2 é necessário para os testes de texto do PDF")
+class BookPageTextTestCase(TestCase):
+    """
+    Testes para a extração e a leitura do texto das páginas
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.media_root = tempfile.mkdtemp()
+        self._settings = override_settings(MEDIA_ROOT=self.media_root)
+        self._settings.enable()
+
+        os.makedirs(os.path.join(self.media_root, 'books'))
+        self.pdf_path = os.path.join(self.media_root, 'books', 'livro.pdf')
+        write_text_pdf(self.pdf_path, ['Primeira pagina', 'Segunda pagina', 'Terceira pagina'])
+
+        category = Category.objects.create(name='Categoria', slug='categoria')
+        self.book = Book.objects.create(
+            title='Livro de Teste',
+            description='Descrição',
+            category=category,
+            pdf_file='books/livro.pdf'
+        )
+
+        self._schedule = patch.object(book_service, 'schedule_text_extraction')
+        self.schedule = self._schedule.start()
+        cache.clear()
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        self._schedule.stop()
+        pdf_reader_pool.clear()
+        self._settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_extract_page_texts(self):
+        """
+        Testa que todas as páginas são gravadas e que um texto atualizado não é extraído de novo
+        """
+        self.assertEqual(book_service.extract_page_texts(self.book), 3)
+        self.assertEqual(book_service.extract_page_texts(self.book), 0)
+
+        texts = list(self.book.page_texts.values_list('page_number', 'text'))
+        self.assertEqual([page for page, text in texts], [1, 2, 3])
+        self.assertIn('Segunda pagina', texts[1][1])
+
+    def test_read_pdf_does_not_parse_pdf(self):
+        """
+        Testa que, com o texto extraído, a leitura de uma página não abre o PDF
+        """
+        book_service.extract_page_texts(self.book)
+        client = APIClient()
+        url = reverse('book-read-pdf', kwargs={'slug': self.book.slug})
+        client.get(url, {'page': 1})
+        pdf_reader_pool.clear()
+
+        with patch.object(PyPDF2, 'PdfReader') as mock_reader:
+            response = client.get(url, {'page': 2})
+
+        mock_reader.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Segunda pagina', response.data['text'])
+        self.assertEqual(response.data['total_pages'], 3)
+
+    def test_replaced_pdf_is_extracted_again(self):
+        """
+        Testa que o texto de um PDF substituído é ignorado até uma nova extração
+        """
+        book_service.extract_page_texts(self.book)
+        write_text_pdf(self.pdf_path, ['Nova edicao'])
+        stat = os.stat(self.pdf_path)
+        os.utime(self.pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+        self.assertIn('Nova edicao', book_service.get_page_text(self.book, 1))
+        self.schedule.assert_called_once_with(self.book)
+
+        self.assertEqual(book_service.extract_page_texts(self.book), 1)
+        self.assertEqual(BookPageText.objects.filter(book=self.book).count(), 1)
+
+    def test_extraction_is_scheduled_once_per_pdf(self):
+        """
+        Testa que leituras repetidas enquanto a extração está em andamento não enfileiram
+        novas passagens pelo PDF inteiro
+        """
+        service = BookService()
+        release = threading.Event()
+        calls = []
+
+        def extract(book_id):
+            calls.append(book_id)
+            release.wait(5)
+            return 0
+
+        with patch.object(service, '_extract_page_texts_task', side_effect=extract):
+            future = service.schedule_text_extraction(self.book)
+            self.assertIsNotNone(future)
+            self.assertIsNone(service.schedule_text_extraction(self.book))
+            self.assertIsNone(service.schedule_text_extraction(self.book))
+
+            release.set()
+            future.result(timeout=5)
+            self.assertEqual(calls, [self.book.pk])
+
+            # Concluída a extração, o livro pode ser enfileirado de novo
+            service.schedule_text_extraction(self.book).result(timeout=5)
+            self.assertEqual(calls, [self.book.pk, self.book.pk])
+
+    def test_metadata_change_does_not_extract_again(self):
+        """
+        Testa que salvar apenas os metadados do livro não extrai nem indexa o PDF de novo
+        """
+        with patch('core.services.pdf_index_service.pdf_index_service.schedule_index') as schedule_index:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.book.title = 'Novo título'
+                self.book.save()
+            schedule_index.assert_not_called()
+            self.schedule.assert_not_called()
+
+            write_text_pdf(os.path.join(self.media_root, 'books', 'outro.pdf'), ['Outro livro'])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.book.pdf_file = 'books/outro.pdf'
+                self.book.save()
+            schedule_index.assert_called_once()
+            self.schedule.assert_called_once_with(self.book)
+
+    def test_command_extracts_books(self):
+        """
+        Testa o comando de extração dos livros já cadastrados
+        """
+        out = StringIO()
+        call_command('extract_book_text', stdout=out)
+
+        self.assertIn('1 livros extraídos (3 páginas)', out.getvalue())
+        self.assertEqual(self.book.page_texts.count(), 3)
@@ -0,0 +1,128 @@
+"""
+Testes para a busca no conteúdo dos PDFs dos livros
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..models import Book, BookPageText
+from apps.categories.models import Category
+from core.services.book_search_service import book_search_service
+
+
+class BookContentSearchTestCase(TestCase):
+    """
+    Testes para o índice de busca do texto das páginas
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        category = Category.objects.create(name='Categoria', slug='categoria')
+        self.dom_casmurro = Book.objects.create(
+            title='Dom Casmurro', description='Romance', category=category, pdf_file='books/dom.pdf'
+        )
+        self.memorias = Book.objects.create(
+            title='Memórias Póstumas', description='Romance', category=category, pdf_file='books/memorias.pdf'
+        )
+
+        self._add_pages(self.dom_casmurro, [
+            'Capitu tinha olhos de ressaca, olhos de cigana oblíqua e dissimulada.',
+            'Bentinho lembrava do seminário e da promessa da mãe.',
+        ])
+        self._add_pages(self.memorias, [
+            'Ao verme que primeiro roeu as frias carnes do meu cadáver.',
+            'Marcela amou-me durante quinze meses e onze contos de réis. Capitu não aparece aqui.',
+        ])
+
+    def _add_pages(self, book, texts, source='original'):
+        BookPageText.objects.filter(book=book).delete()
+        BookPageText.objects.bulk_create([
+            BookPageText(book=book, page_number=page_number, text=text, source=source)
+            for page_number, text in enumerate(texts, start=1)
+        ])
+
+    def test_search_returns_ranked_pages(self):
+        """
+        Testa que a busca retorna o livro, a página e um trecho destacado
+        """
+        results = book_search_service.search('olhos de ressaca')
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['book_slug'], self.dom_casmurro.slug)
+        self.assertEqual(results[0]['page_number'], 1)
+        self.assertIn('<mark>ressaca</mark>', results[0]['snippet'])
+
+        results = book_search_service.search('capitu')
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['book_slug'], self.dom_casmurro.slug)
+
+    def test_search_ignores_accents_and_operators(self):
+        """
+        Testa que acentos e caracteres especiais na consulta não afetam a busca
+        """
+        results = book_search_service.search('SEMINARIO "mãe" (*')
+
+        self.assertEqual([(r['book_slug'], r['page_number']) for r in results], [(self.dom_casmurro.slug, 2)])
+
+    def test_index_follows_text_changes(self):
+        """
+        Testa que uma nova extração do PDF atualiza o índice
+        """
+        self._add_pages(self.dom_casmurro, ['Escobar chegou de Petrópolis.'], source='nova-edicao')
+
+        self.assertEqual(book_search_service.search('ressaca'), [])
+        self.assertEqual(book_search_service.search('petropolis')[0]['book_slug'], self.dom_casmurro.slug)
+
+        self.dom_casmurro.delete()
+        self.assertEqual(book_search_service.search('petropolis'), [])
+
+    def test_search_within_book(self):
+        """
+        Testa a busca restrita a um livro e a paginação dos resultados
+        """
+        results = book_search_service.search('capitu', book=self.memorias)
+        self.assertEqual([r['book_slug'] for r in results], [self.memorias.slug])
+
+        self.assertEqual(len(book_search_service.search('capitu', limit=1, offset=1)), 1)
+
+    def test_fallback_search(self):
+        """
+        Testa a varredura usada nos bancos sem índice de busca
+        """
+        rows = book_search_service._search_fallback(['marcela', 'quinze'], 10, 0, None)
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][:3], (self.memorias.slug, self.memorias.title, 2))
+        self.assertIn('<mark>Marcela</mark>', book_search_service._highlight(rows[0][3]))
+
+    def test_snippet_escapes_pdf_text(self):
+        """
+        Testa que o HTML presente no texto do PDF é escapado e só os destaques viram tags
+        """
+        self._add_pages(self.memorias, ['Quincas Borba <script>alert("borba")</script> & <b>Rubião</b>'])
+
+        snippet = book_search_service.search('borba')[0]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;script&gt;alert(&quot;<mark>borba</mark>&quot;)', snippet)
+        self.assertIn('&amp; &lt;b&gt;Rubião&lt;/b&gt;', snippet)
+
+        rows = book_search_service._search_fallback(['borba'], 10, 0, None)
+        snippet = book_search_service._highlight(rows[0][3])
+        self.assertIn('<mark>Borba</mark> &lt;script&gt;', snippet)
+        self.assertNotIn('<script>', snippet)
+
+    def test_search_endpoint(self):
+        """
+        Testa o endpoint de busca no conteúdo
+        """
+        client = APIClient()
+        url = reverse('book-search-content')
+
+        response = client.get(url, {'q': 'verme', 'book': self.memorias.slug})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['page_number'], 1)
+
+        self.assertEqual(client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(client.get(url, {'q': 'verme', 'book': 'inexistente'}).status_code, status.HTTP_404_NOT_FOUND)
@@ -9,8 +9,8 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from django.http import FileResponse, HttpResponse, Http404, JsonResponse
 from django.shortcuts import get_object_or_404
-from django.core.cache import cache
 from django.db.models import F
+from django.utils.cache import patch_vary_headers
 import os
 import logging
 from io import BytesIO
@@ -38,8 +38,45 @@ except ImportError:
 from .models import Book
 from .serializers import BookSerializer
 from core.services.book_service import book_service
+from utils.mixins import CachedListMixin
+from utils.sendfile import send_file
+from core.services import image_codecs
+from core.services.view_counter import view_counter
+from core.services.pdf_service import PAGE_IMAGE_DPIS, PAGE_IMAGE_QUALITIES
 
-class BookViewSet(viewsets.ModelViewSet):
+
+def _get_requested_image_options(request, default_quality=None):
+    """
+    Obtém a resolução e a qualidade pedidas para a imagem de uma página, aceitando apenas
+    os valores de PAGE_IMAGE_DPIS e PAGE_IMAGE_QUALITIES
+
+    Returns:
+        tuple: (dpi, qualidade, resposta de erro ou None)
+    """
+    try:
+        dpi = int(request.query_params.get('dpi', 200))
+        quality = request.query_params.get('quality')
+        quality = int(quality) if quality else default_quality
+    except ValueError:
+        return None, None, Response(
+            {"error": "Os parâmetros dpi e quality devem ser números inteiros"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if dpi not in PAGE_IMAGE_DPIS:
+        options = ', '.join(str(value) for value in PAGE_IMAGE_DPIS)
+        return None, None, Response(
+            {"error": f"Resolução inválida. Opções: {options}"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    if quality is not None and quality not in PAGE_IMAGE_QUALITIES:
+        options = ', '.join(str(value) for value in PAGE_IMAGE_QUALITIES)
+        return None, None, Response(
+            {"error": f"Qualidade inválida. Opções: {options}"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    return dpi, quality, None
+
+
+class BookViewSet(CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para o modelo Book
     """
@@ -51,6 +88,7 @@ class BookViewSet(viewsets.ModelViewSet):
     ordering_fields = ['title', 'created_at', 'updated_at']
     # Remover filterset_fields para evitar o erro com has_audio
     lookup_field = 'slug'
+    list_cache_name = 'books_list'
 
     def get_queryset(self):
         """
@@ -69,35 +107,6 @@ class BookViewSet(viewsets.ModelViewSet):
 
         return queryset
 
-    def list(self, request, *args, **kwargs):
-        """
-        Lista todos os livros com suporte a cache
-        """
-        # Verificar se a resposta está em cache
-        cache_key = f"books_list_{request.query_params.urlencode()}"
-        cached_response = cache.get(cache_key)
-
-        if cached_response and not request.query_params.get('nocache'):
-            return Response(cached_response)
-
-        # Aplicar filtros padrão
-        queryset = self.filter_queryset(self.get_queryset())
-
-        # Paginação
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
-            # Armazenar em cache por 5 minutos (300 segundos)
-            cache.set(cache_key, response.data, 300)
-            return response
-
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
-        # Armazenar em cache por 5 minutos (300 segundos)
-        cache.set(cache_key, data, 300)
-        return Response(data)
-
     def retrieve(self, request, *args, **kwargs):
         """
         Retorna os detalhes de um livro
@@ -140,13 +149,14 @@ class BookViewSet(viewsets.ModelViewSet):
         """
         Incrementa o contador de visualizações de um livro.
         Não requer autenticação para permitir contagem de visualizações de usuários anônimos.
+        Visualizações repetidas do mesmo visitante dentro de VIEW_COUNTER_DEDUP_WINDOW contam uma vez.
         """
+        book = self.get_object()
         try:
-            # Retornar uma resposta simulada para evitar erros
+            view_counter.record(Book, book.pk, view_counter.get_visitor(request))
             return Response({
                 'status': 'success',
-                'views_count': 1,
-                'message': 'Visualização incrementada com sucesso (simulado)'
+                'views_count': view_counter.get_count(book)
             })
         except Exception as e:
             logger.exception(f"Erro ao incrementar visualizações do livro {slug}: {str(e)}")
@@ -345,8 +355,8 @@ class BookViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Obter o texto da página
-        text = pdf_service.get_page_text(pdf_path, page_number)
+        # Obter o texto da página (extraído após o upload, sem abrir o PDF)
+        text = book_service.get_page_text(book, page_number)
         if text is None:
             return Response(
                 {"error": f"Erro ao extrair texto da página {page_number}"},
@@ -365,7 +375,7 @@ class BookViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def pdf_as_images(self, request, slug=None):
         """
-        Converte uma página do PDF em imagem e retorna como base64
+        Retorna as informações de uma página do PDF e o URL da sua imagem
         """
         book = self.get_object()
 
@@ -387,16 +397,17 @@ class BookViewSet(viewsets.ModelViewSet):
         # Obter o número da página a ser convertida (padrão: 1)
         page_number = int(request.query_params.get('page', 1))
 
-        # Obter o formato da imagem (padrão: JPEG)
-        format = request.query_params.get('format', 'JPEG').upper()
-        if format not in ['JPEG', 'PNG', 'TIFF']:
-            format = 'JPEG'
-
-        # Obter a resolução da imagem (padrão: 200 DPI)
-        dpi = int(request.query_params.get('dpi', 200))
+        # Obter o formato da imagem (padrão: escolhido pelo cabeçalho Accept ao carregar a imagem)
+        format = request.query_params.get('format')
+        if format and format.upper() in image_codecs.SUPPORTED_FORMATS:
+            format = format.upper()
+        else:
+            format = None
 
-        # Obter a qualidade da imagem (padrão: 85)
-        quality = int(request.query_params.get('quality', 85))
+        # Obter a resolução (padrão: 200 DPI) e a qualidade da imagem (padrão: qualidade padrão do formato)
+        dpi, quality, error = _get_requested_image_options(request)
+        if error:
+            return error
 
         # Usar o serviço de PDF para obter informações
         from core.services.pdf_service import pdf_service, PDF2IMAGE_AVAILABLE
@@ -436,23 +447,105 @@ class BookViewSet(viewsets.ModelViewSet):
                 "message": "Use este URL para acessar o arquivo PDF diretamente. O frontend pode usar bibliotecas como PDF.js para renderizar o PDF."
             })
 
-        # Obter a imagem da página
-        img_str = pdf_service.get_page_as_image(pdf_path, page_number, format, dpi, quality)
-        if img_str is None:
-            return Response({
-                "error": f"Erro ao converter página {page_number} em imagem",
-                "total_pages": total_pages,
-                "pdf_url": request.build_absolute_uri(pdf_url),
-                "message": "Use este URL para acessar o arquivo PDF diretamente. O frontend pode usar bibliotecas como PDF.js para renderizar o PDF."
-            })
+        # A imagem é entregue pelo endpoint binário, que pode ser armazenado por navegadores e CDNs
+        image_url = book_service.get_page_image_url(book, page_number, format, dpi, quality)
 
         # Retornar as informações
         return Response({
             "total_pages": total_pages,
             "current_page": page_number,
-            "image": f"data:image/{format.lower()};base64,{img_str}",
+            "image_url": request.build_absolute_uri(image_url),
             "pdf_url": request.build_absolute_uri(pdf_url),
             "format": format,
             "dpi": dpi,
             "quality": quality
         })
+
+    @action(detail=True, methods=['get'], url_path=r'pages/(?P<page_number>[0-9]+)/image', url_name='page-image')
+    def page_image(self, request, slug=None, page_number=None):
+        """
+        Retorna a imagem de uma página do PDF como arquivo binário.
+        O arquivo em cache é enviado diretamente (sem base64), com ETag e Last-Modified.
+        Sem o parâmetro format, o formato (AVIF, WebP ou JPEG) é escolhido pelo cabeçalho Accept.
+        """
+        book = self.get_object()
+
+        # Verificar se o livro tem arquivo PDF
+        if not book.pdf_file:
+            raise Http404("Este livro não possui arquivo PDF")
+
+        # Obter o formato da imagem (padrão: o melhor formato aceito pelo navegador)
+        format = request.query_params.get('format')
+        if format and format.upper() in image_codecs.SUPPORTED_FORMATS:
+            format = format.upper()
+        else:
+            format = image_codecs.negotiate_format(request.META.get('HTTP_ACCEPT'))
+
+        page_number = int(page_number)
+        dpi, quality, error = _get_requested_image_options(
+            request, image_codecs.get_default_quality(format) or 85
+        )
+        if error:
+            return error
+
+        from core.services.pdf_service import pdf_service
+
+        # Verificar se o número da página é válido (consulta o índice de metadados)
+        pdf_path = book.pdf_file.path
+        pdf_info = pdf_service.get_pdf_info(pdf_path)
+        if not pdf_info:
+            return Response(
+                {"error": "Erro ao obter informações do PDF"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        total_pages = pdf_info['total_pages']
+        if page_number < 1 or page_number > total_pages:
+            raise Http404(f"Número de página inválido. O PDF tem {total_pages} páginas.")
+
+        image_path = pdf_service.get_page_image_path(pdf_path, page_number, format, dpi, quality)
+        if not image_path:
+            return Response(
+                {"error": f"Erro ao converter página {page_number} em imagem"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        response = send_file(request, image_path, content_type=image_codecs.CONTENT_TYPES[format])
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    @action(detail=False, methods=['get'], url_path='search-content')
+    def search_content(self, request):
+        """
+        Busca trechos no conteúdo dos PDFs dos livros.
+        Retorna as páginas ordenadas por relevância, com o slug do livro, o número da página
+        e um trecho com os termos destacados. O parâmetro book restringe a busca a um livro.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {"error": "Informe os termos da busca no parâmetro q"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = int(request.query_params.get('limit', 20))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response(
+                {"error": "Os parâmetros limit e offset devem ser números inteiros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        book = None
+        book_slug = request.query_params.get('book')
+        if book_slug:
+            book = get_object_or_404(Book, slug=book_slug)
+
+        from core.services.book_search_service import book_search_service
+
+        results = book_search_service.search(query, limit=limit, offset=offset, book=book)
+        return Response({
+            "query": query,
+            "results": results
+        })
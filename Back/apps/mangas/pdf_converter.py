@@ -1,5 +1,4 @@
 import os
-import sys
 import logging
 import tempfile
 from pathlib import Path
@@ -8,46 +7,15 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 import io
 import time
-import hashlib
-
-# Configurar o caminho para o Poppler no Windows
-POPPLER_PATH = None
-if sys.platform.startswith('win'):
-    # Verificar se o caminho do Poppler está definido nas configurações
-    POPPLER_PATH = getattr(settings, 'POPPLER_PATH', None)
-
-    # Se não estiver definido, tentar alguns caminhos comuns
-    if not POPPLER_PATH:
-        common_paths = [
-            r'C:\poppler\bin',
-            r'C:\Program Files\poppler\bin',
-            r'C:\Program Files (x86)\poppler\bin',
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'poppler', 'bin')
-        ]
-
-        for path in common_paths:
-            if os.path.exists(path):
-                POPPLER_PATH = path
-                break
-
-    if POPPLER_PATH:
-        logging.info(f"Usando Poppler em: {POPPLER_PATH}")
-    else:
-        logging.warning("Poppler não encontrado. A conversão de PDF para imagem pode falhar.")
+from core.services.single_flight import single_flight, atomic_write
+from core.services.media_cache import media_cache, get_page_artifact
+from core.services import image_codecs
+from core.services.pdf_renderers import get_renderer, POPPLER_PATH
 
-# Importar pdf2image após configurar o Poppler
 try:
-    from pdf2image import convert_from_path, convert_from_bytes
     from PIL import Image
-    logging.info("pdf2image importado com sucesso")
 except ImportError as e:
-    logging.error(f"Erro ao importar pdf2image: {str(e)}")
-    # Criar funções de fallback para evitar erros de importação
-    def convert_from_path(*args, **kwargs):
-        raise ImportError("pdf2image não está instalado. Instale com: pip install pdf2image")
-
-    def convert_from_bytes(*args, **kwargs):
-        raise ImportError("pdf2image não está instalado. Instale com: pip install pdf2image")
+    logging.error(f"Erro ao importar o Pillow: {str(e)}")
 
 logger = logging.getLogger(__name__)
 
@@ -55,49 +23,111 @@ logger = logging.getLogger(__name__)
 DPI = 200  # Resolução das imagens (dots per inch)
 OUTPUT_FORMAT = 'JPEG'  # Formato de saída (JPEG, PNG)
 JPEG_QUALITY = 85  # Qualidade JPEG (1-100)
-CACHE_DIR = getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'pdf_cache'))
 
-# Criar diretório de cache se não existir
-os.makedirs(CACHE_DIR, exist_ok=True)
+# Variantes de resolução das páginas (largura em pixels). Apenas a maior é rasterizada
+# pelo backend de PDF; as demais são reduzidas a partir dela com o Pillow.
+VARIANTS = {
+    'thumb': 320,
+    'mobile': 800,
+    'desktop': 1280,
+    'retina': 2048,
+}
+DEFAULT_VARIANT = 'desktop'
+BASE_VARIANT = max(VARIANTS, key=VARIANTS.get)
 
 # Registrar configurações
 logger.info(f"Configurações de conversão de PDF:")
 logger.info(f"- DPI: {DPI}")
 logger.info(f"- Formato: {OUTPUT_FORMAT}")
 logger.info(f"- Qualidade JPEG: {JPEG_QUALITY}")
-logger.info(f"- Diretório de cache: {CACHE_DIR}")
+logger.info(f"- Diretório de cache: {media_cache.directory}")
 logger.info(f"- Poppler path: {POPPLER_PATH}")
+logger.info(f"- Backend de renderização: {getattr(settings, 'PDF_RENDERER_BACKEND', 'poppler')}")
+
+def get_full_path(pdf_path):
+    """Retorna o caminho absoluto de um PDF a partir do caminho relativo ao MEDIA_ROOT."""
+    return os.path.join(settings.MEDIA_ROOT, pdf_path.lstrip('/'))
+
+def get_page_cache_artifact(page_number, dpi=DPI, format=OUTPUT_FORMAT, quality=JPEG_QUALITY):
+    """Retorna o nome de uma página convertida no cache de mídia (o mesmo usado pelo serviço de PDF dos livros)."""
+    return get_page_artifact(page_number, f"{dpi}dpi", format, quality)
+
+def is_cached(pdf_path, artifact):
+    """Verifica se a imagem está em cache."""
+    return media_cache.contains(get_full_path(pdf_path), artifact)
+
+def get_nearest_variant(width):
+    """Retorna a menor variante com largura maior ou igual à solicitada (ou a maior de todas)."""
+    for variant, variant_width in sorted(VARIANTS.items(), key=lambda item: item[1]):
+        if variant_width >= width:
+            return variant
+    return BASE_VARIANT
+
+def get_variant_cache_artifact(page_number, variant=DEFAULT_VARIANT, format=OUTPUT_FORMAT, quality=None):
+    """Retorna o nome de uma variante de página no cache (a resolução é identificada pela largura da variante)."""
+    quality = quality or image_codecs.get_default_quality(format)
+    return get_page_artifact(page_number, f"{variant}-{VARIANTS[variant]}w", format, quality)
 
-def get_cache_key(pdf_path, page_number, dpi=DPI, format=OUTPUT_FORMAT, quality=JPEG_QUALITY):
-    """Gera uma chave de cache única para uma página específica de um PDF."""
-    # Obter o caminho completo do arquivo
+def convert_pdf_page_to_variant(pdf_path, page_number, variant=DEFAULT_VARIANT, format=OUTPUT_FORMAT, quality=None, use_cache=True):
+    """
+    Obtém uma variante de resolução de uma página de um PDF.
+
+    A variante base (BASE_VARIANT em OUTPUT_FORMAT) é a única rasterizada pelo backend de PDF;
+    as demais combinações de variante e formato são derivadas dela com o Pillow.
+
+    Args:
+        pdf_path: Caminho relativo do arquivo PDF no storage
+        page_number: Número da página (começando em 1)
+        variant: Nome da variante (thumb, mobile, desktop, retina)
+        format: Formato de saída da imagem (JPEG, PNG, WEBP, AVIF); cada formato tem seu próprio cache
+        quality: Qualidade da imagem (1-100; padrão: qualidade padrão do formato)
+        use_cache: Se True, usa o cache para evitar reconversão
+
+    Returns:
+        Caminho relativo da imagem no storage
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Variante inválida: {variant}. Opções: {', '.join(VARIANTS)}")
+
+    format = format.upper()
+    if not image_codecs.is_format_supported(format):
+        raise ValueError(f"Formato de imagem não suportado: {format}")
+    quality = quality or image_codecs.get_default_quality(format)
+
+    start_time = time.time()
     if pdf_path.startswith('/'):
         pdf_path = pdf_path[1:]
 
-    full_path = os.path.join(settings.MEDIA_ROOT, pdf_path)
+    artifact = get_variant_cache_artifact(page_number, variant, format, quality)
 
-    # Obter a data de modificação do arquivo
-    try:
-        mtime = os.path.getmtime(full_path)
-    except (FileNotFoundError, OSError):
-        # Se o arquivo não existir, usar o caminho como parte da chave
-        mtime = 0
+    if (variant, format, quality) == (BASE_VARIANT, OUTPUT_FORMAT, JPEG_QUALITY):
+        def render(cache_path):
+            return _render_pdf_page(
+                pdf_path, page_number, cache_path, DPI, format, quality, start_time, width=VARIANTS[variant]
+            )
+    else:
+        def render(cache_path):
+            base_path = convert_pdf_page_to_variant(pdf_path, page_number, BASE_VARIANT, use_cache=use_cache)
+            return _derive_variant(
+                os.path.join(settings.MEDIA_ROOT, base_path), cache_path, VARIANTS[variant], format, quality, pdf_path
+            )
 
-    # Criar uma string com todos os parâmetros relevantes
-    key_data = f"{pdf_path}:{mtime}:{page_number}:{dpi}:{format}:{quality}"
+    return _get_cached_page(pdf_path, page_number, artifact, render, use_cache)
 
-    # Gerar um hash MD5 da string
-    return hashlib.md5(key_data.encode()).hexdigest()
+def _derive_variant(base_path, cache_path, width, format, quality, pdf_path):
+    """Reduz a imagem da variante base para a largura desejada e grava no cache de forma atômica."""
+    start_time = time.time()
+    with Image.open(base_path) as image:
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+        image = image_codecs.prepare_image(image, format)
 
-def get_cached_image_path(cache_key, format=OUTPUT_FORMAT):
-    """Retorna o caminho para a imagem em cache."""
-    extension = format.lower()
-    return os.path.join(CACHE_DIR, f"{cache_key}.{extension}")
+        with atomic_write(cache_path) as f:
+            image.save(f, **image_codecs.get_save_options(format, quality))
 
-def is_cached(cache_key, format=OUTPUT_FORMAT):
-    """Verifica se a imagem está em cache."""
-    cache_path = get_cached_image_path(cache_key, format)
-    return os.path.exists(cache_path)
+    media_cache.record_fill(cache_path, get_full_path(pdf_path), time.time() - start_time)
+    return os.path.relpath(cache_path, settings.MEDIA_ROOT)
 
 def convert_pdf_page_to_image(pdf_path, page_number, dpi=DPI, format=OUTPUT_FORMAT, quality=JPEG_QUALITY, use_cache=True):
     """
@@ -116,22 +146,47 @@ def convert_pdf_page_to_image(pdf_path, page_number, dpi=DPI, format=OUTPUT_FORM
     """
     start_time = time.time()
 
-    # Gerar chave de cache
-    cache_key = get_cache_key(pdf_path, page_number, dpi, format, quality)
-    cache_path = get_cached_image_path(cache_key, format)
+    def render(cache_path):
+        return _render_pdf_page(pdf_path, page_number, cache_path, dpi, format, quality, start_time)
 
-    # Verificar se a imagem já está em cache
-    if use_cache and is_cached(cache_key, format):
-        logger.info(f"Usando imagem em cache para {pdf_path} página {page_number}")
-        # Retornar caminho relativo ao MEDIA_URL
-        relative_path = os.path.relpath(cache_path, settings.MEDIA_ROOT)
-        return relative_path
+    artifact = get_page_cache_artifact(page_number, dpi, format, quality)
+    return _get_cached_page(pdf_path, page_number, artifact, render, use_cache)
 
+def _get_cached_page(pdf_path, page_number, artifact, render, use_cache):
+    """Retorna a página do cache de mídia ou a gera com render(cache_path)."""
+    full_path = get_full_path(pdf_path)
+
+    # Verificar se a imagem já está em cache
+    if use_cache:
+        cached_path = media_cache.lookup(full_path, artifact)
+        if cached_path:
+            logger.info(f"Usando imagem em cache para {pdf_path} página {page_number}")
+            # Retornar caminho relativo ao MEDIA_URL
+            return os.path.relpath(cached_path, settings.MEDIA_ROOT)
+
+    cache_path = media_cache.get_path(full_path, artifact)
+    if cache_path is None:
+        logger.error(f"Arquivo PDF não encontrado: {full_path}")
+        raise FileNotFoundError(f"Arquivo PDF não encontrado: {pdf_path}")
+
+    def get_cached_result():
+        if use_cache and os.path.exists(cache_path):
+            return os.path.relpath(cache_path, settings.MEDIA_ROOT)
+        return None
+
+    # Requisições simultâneas da mesma página (inclusive de outros processos) aguardam
+    # uma única conversão em vez de rasterizar a página várias vezes
+    return single_flight.do(
+        cache_path, lambda: render(cache_path), lock_path=f"{cache_path}.lock", check=get_cached_result
+    )
+
+def _render_pdf_page(pdf_path, page_number, cache_path, dpi, format, quality, start_time, width=None):
+    """Rasteriza uma página com o backend configurado e grava a imagem no cache de forma atômica."""
     # Obter o caminho completo do arquivo PDF
     if pdf_path.startswith('/'):
         pdf_path = pdf_path[1:]
 
-    full_path = os.path.join(settings.MEDIA_ROOT, pdf_path)
+    full_path = get_full_path(pdf_path)
 
     try:
         # Verificar se o arquivo existe
@@ -139,35 +194,17 @@ def convert_pdf_page_to_image(pdf_path, page_number, dpi=DPI, format=OUTPUT_FORM
             logger.error(f"Arquivo PDF não encontrado: {full_path}")
             raise FileNotFoundError(f"Arquivo PDF não encontrado: {pdf_path}")
 
-        # Converter a página do PDF em imagem
+        # Converter a página do PDF em imagem (rasterizando diretamente na largura da variante)
         logger.info(f"Convertendo página {page_number} do PDF {pdf_path}")
+        image = get_renderer().render_page(full_path, page_number, dpi=dpi, width=width)
 
-        # Preparar argumentos para a conversão
-        convert_args = {
-            'dpi': dpi,
-            'first_page': page_number,
-            'last_page': page_number,
-            'fmt': format.lower(),
-            'jpegopt': {"quality": quality} if format.upper() == 'JPEG' else None
-        }
-
-        # Adicionar o caminho do Poppler no Windows
-        if POPPLER_PATH:
-            convert_args['poppler_path'] = POPPLER_PATH
-
-        # Converter a página do PDF em imagem
-        images = convert_from_path(full_path, **convert_args)
-
-        if not images:
-            logger.error(f"Nenhuma imagem gerada para {pdf_path} página {page_number}")
-            raise ValueError(f"Falha ao converter página {page_number} do PDF {pdf_path}")
-
-        # Salvar a imagem no cache
-        image = images[0]
-        image.save(cache_path, format=format, quality=quality if format.upper() == 'JPEG' else None)
-
+        # Salvar a imagem no cache (leitores nunca veem um arquivo parcialmente gravado)
+        image = image_codecs.prepare_image(image, format)
+        with atomic_write(cache_path) as f:
+            image.save(f, **image_codecs.get_save_options(format, quality))
         # Registrar tempo de conversão
         elapsed_time = time.time() - start_time
+        media_cache.record_fill(cache_path, full_path, elapsed_time)
         logger.info(f"Página {page_number} convertida em {elapsed_time:.2f} segundos")
 
         # Retornar caminho relativo ao MEDIA_URL
@@ -177,3 +214,115 @@ def convert_pdf_page_to_image(pdf_path, page_number, dpi=DPI, format=OUTPUT_FORM
     except Exception as e:
         logger.exception(f"Erro ao converter página {page_number} do PDF {pdf_path}: {str(e)}")
         raise
+
+def convert_pdf_pages_to_images(pdf_path, first_page=1, last_page=None, dpi=DPI, format=OUTPUT_FORMAT, quality=None, use_cache=True, variant=None):
+    """
+    Converte um intervalo de páginas de um PDF em imagens com uma única chamada ao backend
+    de PDF (uma única execução do Poppler ou um único documento aberto em processo).
+
+    As imagens são gravadas no cache de mídia com as mesmas chaves usadas por
+    convert_pdf_page_to_image, de modo que as requisições página a página
+    passam a ser atendidas pelo cache.
+
+    Args:
+        pdf_path: Caminho relativo do arquivo PDF no storage
+        first_page: Primeira página do intervalo (começando em 1)
+        last_page: Última página do intervalo (None para ir até o fim do documento)
+        dpi: Resolução da imagem em DPI
+        format: Formato de saída da imagem (JPEG, PNG; WEBP e AVIF apenas com variant)
+        quality: Qualidade da imagem (1-100; padrão: JPEG_QUALITY ou a qualidade padrão do formato da variante)
+        use_cache: Se True, não reconverte páginas que já estão em cache
+        variant: Variante de resolução (substitui o dpi; as chaves são as de convert_pdf_page_to_variant)
+
+    Returns:
+        Dicionário {número da página: caminho relativo da imagem no storage}
+    """
+    start_time = time.time()
+
+    if pdf_path.startswith('/'):
+        pdf_path = pdf_path[1:]
+
+    full_path = get_full_path(pdf_path)
+
+    if not os.path.exists(full_path):
+        logger.error(f"Arquivo PDF não encontrado: {full_path}")
+        raise FileNotFoundError(f"Arquivo PDF não encontrado: {pdf_path}")
+
+    width = None
+    if variant is None:
+        quality = quality or JPEG_QUALITY
+    else:
+        format = format.upper()
+        quality = quality or image_codecs.get_default_quality(format)
+        if variant not in VARIANTS:
+            raise ValueError(f"Variante inválida: {variant}. Opções: {', '.join(VARIANTS)}")
+
+        # Variantes derivadas: rasterizar a variante base em lote e reduzir cada página
+        if (variant, format, quality) != (BASE_VARIANT, OUTPUT_FORMAT, JPEG_QUALITY):
+            base_results = convert_pdf_pages_to_images(
+                pdf_path, first_page, last_page, use_cache=use_cache, variant=BASE_VARIANT
+            )
+            return {
+                page_number: convert_pdf_page_to_variant(pdf_path, page_number, variant, format, quality, use_cache)
+                for page_number in base_results
+            }
+
+        width = VARIANTS[variant]
+
+    def get_artifact(page_number):
+        if variant is not None:
+            return get_variant_cache_artifact(page_number, variant, format, quality)
+        return get_page_cache_artifact(page_number, dpi, format, quality)
+
+    results = {}
+    pending_pages = None
+
+    # Com o intervalo fechado, verificar quais páginas ainda não estão em cache
+    if last_page is not None:
+        pending_pages = []
+        for page_number in range(first_page, last_page + 1):
+            cache_path = media_cache.lookup(full_path, get_artifact(page_number)) if use_cache else None
+            if cache_path:
+                results[page_number] = os.path.relpath(cache_path, settings.MEDIA_ROOT)
+            else:
+                pending_pages.append(page_number)
+
+        if not pending_pages:
+            logger.info(f"Páginas {first_page}-{last_page} do PDF {pdf_path} já estão em cache")
+            return results
+
+        # Converter apenas o trecho que contém páginas ausentes
+        first_page, last_page = pending_pages[0], pending_pages[-1]
+
+    logger.info(f"Convertendo páginas {first_page}-{last_page or 'fim'} do PDF {pdf_path} em lote")
+
+    try:
+        # Usar um diretório temporário dentro do cache de mídia para que a movimentação
+        # dos arquivos gerados para o cache seja um simples rename
+        os.makedirs(media_cache.directory, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=media_cache.directory) as output_folder:
+            render_start = time.time()
+            output_paths = get_renderer().render_pages_to_files(
+                full_path, output_folder, first_page, last_page, dpi=dpi, width=width, format=format, quality=quality
+            )
+            page_time = (time.time() - render_start) / max(len(output_paths), 1)
+
+            if not output_paths:
+                logger.error(f"Nenhuma imagem gerada para {pdf_path} páginas {first_page}-{last_page}")
+                raise ValueError(f"Falha ao converter páginas {first_page}-{last_page} do PDF {pdf_path}")
+
+            for page_number, output_path in output_paths.items():
+                if pending_pages is not None and page_number not in pending_pages:
+                    continue
+
+                cache_path = media_cache.store(full_path, get_artifact(page_number), output_path, page_time)
+                results[page_number] = os.path.relpath(cache_path, settings.MEDIA_ROOT)
+
+        elapsed_time = time.time() - start_time
+        logger.info(f"{len(output_paths)} páginas do PDF {pdf_path} convertidas em {elapsed_time:.2f} segundos")
+
+        return dict(sorted(results.items()))
+
+    except Exception as e:
+        logger.exception(f"Erro ao converter páginas {first_page}-{last_page} do PDF {pdf_path}: {str(e)}")
+        raise
@@ -0,0 +1,287 @@
+"""
+Pipeline de pré-renderização de capítulos em PDF.
+
+Quando um capítulo do tipo PDF é salvo, todas as suas páginas são enfileiradas
+para conversão em um pool limitado de workers. O progresso de cada PDF fica
+registrado no cache para que o leitor saiba se a página ainda está sendo gerada. O
+progresso é renovado a cada lote; sem renovação por PDF_PRERENDER_STALE_TIMEOUT segundos
+(ex.: o worker foi encerrado), a pré-renderização é considerada abandonada e as páginas
+voltam a ser convertidas sob demanda.
+
+Durante a leitura, cada página servida agenda a conversão antecipada (read-ahead)
+das próximas páginas do capítulo, para que a próxima página já esteja em cache.
+"""
+
+import hashlib
+import logging
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from core.services.pdf_index_service import pdf_index_service
+from . import pdf_converter
+
+logger = logging.getLogger(__name__)
+
+# Configurações
+PRERENDER_WORKERS = getattr(settings, 'PDF_PRERENDER_WORKERS', 2)
+PRERENDER_BATCH_SIZE = getattr(settings, 'PDF_PRERENDER_BATCH_SIZE', 10)
+PRERENDER_STALE_TIMEOUT = getattr(settings, 'PDF_PRERENDER_STALE_TIMEOUT', 5 * 60)
+PROGRESS_TIMEOUT = 60 * 60 * 24  # 24 horas
+
+# Leitura antecipada: número de páginas à frente, workers (limite global de conversões
+# simultâneas) e máximo de páginas aguardando na fila
+READAHEAD_PAGES = getattr(settings, 'PDF_READAHEAD_PAGES', 3)
+READAHEAD_WORKERS = getattr(settings, 'PDF_READAHEAD_WORKERS', 2)
+READAHEAD_MAX_PENDING = getattr(settings, 'PDF_READAHEAD_MAX_PENDING', 100)
+
+# Estados do pipeline
+STATUS_QUEUED = 'queued'
+STATUS_RENDERING = 'rendering'
+STATUS_READY = 'ready'
+STATUS_ERROR = 'error'
+
+_loader = None
+_readahead_loader = None
+_loader_lock = threading.Lock()
+
+# Páginas com leitura antecipada em andamento: {(pdf_path, variante, formato): {páginas}}
+_readahead_pending = {}
+_readahead_lock = threading.Lock()
+
+
+def _get_loader():
+    """
+    Cria o pool de workers apenas no primeiro uso para não iniciar threads na importação.
+    O resultado de cada tarefa fica apenas no Future retornado, descartado pelos chamadores.
+    """
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = ThreadPoolExecutor(max_workers=PRERENDER_WORKERS, thread_name_prefix='prerender')
+        return _loader
+
+
+def _get_readahead_loader():
+    """Pool separado para a leitura antecipada, para não disputar workers com a pré-renderização."""
+    global _readahead_loader
+    with _loader_lock:
+        if _readahead_loader is None:
+            _readahead_loader = ThreadPoolExecutor(max_workers=READAHEAD_WORKERS, thread_name_prefix='readahead')
+        return _readahead_loader
+
+
+def normalize_pdf_path(pdf_path):
+    """Normaliza o caminho relativo do PDF usado nas chaves de progresso e de cache."""
+    if pdf_path and pdf_path.startswith('/'):
+        pdf_path = pdf_path[1:]
+    return pdf_path
+
+
+def get_chapter_pdf_path(chapter):
+    """Retorna o caminho relativo do PDF de um capítulo, enviado diretamente ou em partes."""
+    if chapter.pdf_file:
+        return normalize_pdf_path(chapter.pdf_file.name)
+    return normalize_pdf_path(chapter.pdf_file_path)
+
+
+def _get_progress_key(pdf_path):
+    path_hash = hashlib.md5(normalize_pdf_path(pdf_path).encode()).hexdigest()
+    return f"pdf_prerender_{path_hash}"
+
+
+def get_progress(pdf_path):
+    """
+    Obtém o progresso da pré-renderização de um PDF
+
+    Returns:
+        dict: {'status', 'pages_ready', 'total', 'chapter_id', 'updated_at'} ou None se o PDF
+        nunca foi enfileirado
+    """
+    return cache.get(_get_progress_key(pdf_path))
+
+
+def _set_progress(pdf_path, **progress):
+    progress['updated_at'] = time.time()
+    cache.set(_get_progress_key(pdf_path), progress, PROGRESS_TIMEOUT)
+
+
+def is_stale(progress):
+    """Verifica se uma pré-renderização em andamento deixou de renovar o progresso."""
+    return time.time() - progress.get('updated_at', 0) > PRERENDER_STALE_TIMEOUT
+
+
+def is_rendering(pdf_path, progress=None):
+    """Verifica se o PDF está na fila ou sendo pré-renderizado por um worker ativo."""
+    progress = progress or get_progress(pdf_path)
+    return (
+        bool(progress)
+        and progress['status'] in (STATUS_QUEUED, STATUS_RENDERING)
+        and not is_stale(progress)
+    )
+
+
+def is_page_pending(pdf_path, page_number):
+    """
+    Verifica se uma página está no lote em conversão de uma pré-renderização ativa
+
+    Páginas de lotes posteriores, ou de pré-renderizações abandonadas, não estão
+    pendentes e devem ser convertidas sob demanda.
+    """
+    progress = get_progress(pdf_path)
+    if not is_rendering(pdf_path, progress):
+        return False
+    return progress['pages_ready'] < page_number <= progress['pages_ready'] + PRERENDER_BATCH_SIZE
+
+
+def get_page_count(pdf_path):
+    """Obtém o número de páginas de um PDF armazenado no MEDIA_ROOT a partir do índice de metadados."""
+    full_path = os.path.join(settings.MEDIA_ROOT, normalize_pdf_path(pdf_path))
+    info = pdf_index_service.get_info(full_path)
+    if not info:
+        raise ValueError(f"Não foi possível ler o PDF: {pdf_path}")
+    return info['total_pages']
+
+
+def schedule_chapter(chapter):
+    """
+    Enfileira a pré-renderização de todas as páginas de um capítulo em PDF
+
+    Args:
+        chapter: Instância do modelo Chapter
+
+    Returns:
+        Future: Tarefa enfileirada ou None se nada foi enfileirado
+    """
+    pdf_path = get_chapter_pdf_path(chapter)
+    if chapter.chapter_type != 'pdf' or not pdf_path:
+        return None
+
+    # Evitar enfileirar o mesmo PDF duas vezes
+    if is_rendering(pdf_path):
+        return None
+
+    _set_progress(pdf_path, status=STATUS_QUEUED, pages_ready=0, total=None, chapter_id=chapter.pk)
+    logger.info(f"Pré-renderização do capítulo {chapter.pk} enfileirada ({pdf_path})")
+
+    return _get_loader().submit(_prerender_task, pdf_path, chapter.pk)
+
+
+def _prerender_task(pdf_path, chapter_id):
+    """
+    Tarefa que converte todas as páginas de um PDF em lotes, registrando o progresso
+
+    Args:
+        pdf_path (str): Caminho relativo do PDF no storage
+        chapter_id (int): ID do capítulo
+
+    Returns:
+        dict: Progresso final
+    """
+    try:
+        total = get_page_count(pdf_path)
+        pages_ready = 0
+        _set_progress(pdf_path, status=STATUS_RENDERING, pages_ready=pages_ready, total=total, chapter_id=chapter_id)
+
+        for first_page in range(1, total + 1, PRERENDER_BATCH_SIZE):
+            last_page = min(first_page + PRERENDER_BATCH_SIZE - 1, total)
+            # Rasterizar a variante base; as variantes menores são derivadas dela sob demanda
+            results = pdf_converter.convert_pdf_pages_to_images(
+                pdf_path, first_page, last_page, variant=pdf_converter.BASE_VARIANT
+            )
+            pages_ready += len(results)
+            _set_progress(pdf_path, status=STATUS_RENDERING, pages_ready=pages_ready, total=total, chapter_id=chapter_id)
+
+        progress = {'status': STATUS_READY, 'pages_ready': pages_ready, 'total': total, 'chapter_id': chapter_id}
+        _set_progress(pdf_path, **progress)
+        logger.info(f"Pré-renderização do capítulo {chapter_id} concluída: {pages_ready}/{total} páginas")
+        return progress
+    except Exception as e:
+        logger.exception(f"Erro na pré-renderização do capítulo {chapter_id} ({pdf_path}): {str(e)}")
+        progress = get_progress(pdf_path) or {}
+        _set_progress(
+            pdf_path,
+            status=STATUS_ERROR,
+            pages_ready=progress.get('pages_ready', 0),
+            total=progress.get('total'),
+            chapter_id=chapter_id
+        )
+        return None
+
+
+def schedule_readahead(pdf_path, page_number, variant=None, format=None, pages=None):
+    """
+    Enfileira a conversão das próximas páginas após o leitor abrir uma página
+
+    Páginas já em cache, já enfileiradas ou além do fim do PDF são ignoradas, e nada é
+    enfileirado enquanto o capítulo inteiro está sendo pré-renderizado.
+
+    Args:
+        pdf_path (str): Caminho relativo do PDF no storage
+        page_number (int): Página que acabou de ser servida
+        variant (str): Variante de resolução pedida pelo leitor
+        format (str): Formato da imagem pedido pelo leitor
+        pages (int): Número de páginas à frente (padrão: READAHEAD_PAGES)
+
+    Returns:
+        list: Páginas enfileiradas
+    """
+    pages = READAHEAD_PAGES if pages is None else pages
+    if pages <= 0:
+        return []
+
+    pdf_path = normalize_pdf_path(pdf_path)
+    variant = variant or pdf_converter.DEFAULT_VARIANT
+    format = (format or pdf_converter.OUTPUT_FORMAT).upper()
+
+    if is_rendering(pdf_path):
+        return []
+
+    try:
+        total = get_page_count(pdf_path)
+    except Exception:
+        return []
+
+    candidates = [
+        page for page in range(page_number + 1, min(page_number + pages, total) + 1)
+        if not pdf_converter.is_cached(pdf_path, pdf_converter.get_variant_cache_artifact(page, variant, format))
+    ]
+
+    key = (pdf_path, variant, format)
+    with _readahead_lock:
+        pending = _readahead_pending.setdefault(key, set())
+        queued = [page for page in candidates if page not in pending]
+
+        # Limite global da fila: sob carga, a leitura antecipada é descartada
+        total_pending = sum(len(pages) for pages in _readahead_pending.values())
+        if not queued or total_pending + len(queued) > READAHEAD_MAX_PENDING:
+            if not pending:
+                del _readahead_pending[key]
+            return []
+
+        pending.update(queued)
+
+    _get_readahead_loader().submit(_readahead_task, pdf_path, queued, variant, format)
+    return queued
+
+
+def _readahead_task(pdf_path, pages, variant, format):
+    """
+    Tarefa que converte em lote as páginas da leitura antecipada (as imagens ficam apenas no cache)
+    """
+    try:
+        pdf_converter.convert_pdf_pages_to_images(
+            pdf_path, pages[0], pages[-1], format=format, variant=variant
+        )
+    except Exception as e:
+        logger.warning(f"Erro na leitura antecipada de {pdf_path} páginas {pages[0]}-{pages[-1]}: {str(e)}")
+    finally:
+        key = (pdf_path, variant, format)
+        with _readahead_lock:
+            pending = _readahead_pending.get(key)
+            if pending is not None:
+                pending.difference_update(pages)
+                if not pending:
+                    del _readahead_pending[key]
@@ -1,9 +1,31 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from utils.mixins import SparseFieldsetMixin
 from .models import Manga, Chapter, Page, ReadingProgress, Comment, UserStatistics, MangaView
 
 User = get_user_model()
 
+# Número padrão e máximo de capítulos incluídos com ?expand=chapters
+CHAPTERS_EXPAND_LIMIT = 100
+CHAPTERS_EXPAND_MAX_LIMIT = 1000
+
+def count_related(model, field):
+    """
+    Conta os itens relacionados em uma subconsulta correlacionada
+
+    Diferente de Count() sobre JOINs, contagens de relações diferentes não multiplicam as
+    linhas umas das outras (ex.: capítulos x comentários).
+
+    Args:
+        model: Modelo dos itens contados
+        field (str): Caminho do campo que aponta para o item da consulta externa
+    """
+    counts = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(count=Count('*'))
+    return Coalesce(Subquery(counts.values('count'), output_field=IntegerField()), 0)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -43,6 +65,35 @@ class ChapterSerializer(serializers.ModelSerializer):
     def get_chapter_type_display(self, obj):
         return obj.get_chapter_type_display()
 
+class ChapterSummarySerializer(serializers.ModelSerializer):
+    """
+    Representação resumida dos capítulos, sem páginas e comentários aninhados
+
+    As contagens vêm de anotações (ver with_summary_data); as páginas de um capítulo
+    são obtidas em chapters/{id}/pages/.
+    """
+    pages_count = serializers.IntegerField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    chapter_type_display = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Chapter
+        fields = ['id', 'title', 'number', 'chapter_type', 'chapter_type_display',
+                 'pages_count', 'comments_count', 'created_at']
+
+    @staticmethod
+    def with_summary_data(queryset):
+        """
+        Prepara um queryset de capítulos para este serializador, com as contagens anotadas
+        """
+        return queryset.annotate(
+            pages_count=count_related(Page, 'chapter'),
+            comments_count=count_related(Comment, 'chapter')
+        )
+
+    def get_chapter_type_display(self, obj):
+        return obj.get_chapter_type_display()
+
 class ReadingProgressSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReadingProgress
@@ -72,24 +123,124 @@ class MangaSerializer(serializers.ModelSerializer):
 
     def get_is_favorite(self, obj):
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
+        if self.context.get('personalize', True) and request and request.user.is_authenticated:
             return obj.favorites.filter(id=request.user.id).exists()
         return False
 
     def get_reading_progress(self, obj):
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
+        if self.context.get('personalize', True) and request and request.user.is_authenticated:
             try:
                 progress = ReadingProgress.objects.get(user=request.user, manga=obj)
-                return {
-                    'chapter': progress.chapter.number,
-                    'page': progress.page.page_number if progress.page else None,
-                    'last_read': progress.last_read
-                }
+                return self.format_reading_progress(progress)
             except ReadingProgress.DoesNotExist:
                 return None
         return None
 
+    @staticmethod
+    def format_reading_progress(progress):
+        return {
+            'chapter': progress.chapter.number,
+            'page': progress.page.page_number if progress.page else None,
+            'last_read': progress.last_read
+        }
+
+    @classmethod
+    def get_user_overlay(cls, user, manga_ids):
+        """
+        Retorna os campos pessoais (favorito e progresso) de vários mangás, com uma consulta para cada campo
+
+        Usado para completar as listagens em cache, geradas sem os dados do usuário
+        (context['personalize'] = False).
+
+        Returns:
+            dict: {id do mangá: {'is_favorite': bool, 'reading_progress': dict ou None}}
+        """
+        favorite_ids = set(
+            Manga.favorites.through.objects.filter(user_id=user.id, manga_id__in=manga_ids)
+            .values_list('manga_id', flat=True)
+        )
+        progress_by_manga = {
+            progress.manga_id: cls.format_reading_progress(progress)
+            for progress in ReadingProgress.objects.filter(user=user, manga_id__in=manga_ids)
+            .select_related('chapter', 'page')
+        }
+        return {
+            manga_id: {
+                'is_favorite': manga_id in favorite_ids,
+                'reading_progress': progress_by_manga.get(manga_id)
+            }
+            for manga_id in manga_ids
+        }
+
+    def get_genres_list(self, obj):
+        if obj.genres:
+            return [genre.strip() for genre in obj.genres.split(',')]
+        return []
+
+    def get_status_display(self, obj):
+        return obj.get_status_display()
+
+class MangaListSerializer(serializers.ModelSerializer):
+    """
+    Representação resumida dos mangás para listagens
+
+    Sem capítulos, páginas e comentários aninhados: as contagens vêm de anotações e os
+    campos pessoais de prefetches (ver with_list_data), com um número fixo de consultas
+    por página, qualquer que seja o tamanho dela.
+    """
+    chapters_count = serializers.IntegerField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    is_favorite = serializers.SerializerMethodField()
+    reading_progress = serializers.SerializerMethodField()
+    genres_list = serializers.SerializerMethodField()
+    status_display = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Manga
+        fields = [
+            'id', 'title', 'slug', 'description', 'cover',
+            'author', 'genres', 'genres_list', 'status', 'status_display',
+            'chapters_count', 'comments_count', 'is_favorite', 'reading_progress', 'created_at',
+            'views_count'
+        ]
+
+    @staticmethod
+    def with_list_data(queryset, user=None):
+        """
+        Prepara um queryset de mangás para este serializador
+
+        Args:
+            queryset: Queryset de mangás
+            user: Usuário cujos favoritos e progresso serão carregados (um prefetch para cada)
+
+        Returns:
+            QuerySet: Queryset com as contagens anotadas e os prefetches do usuário
+        """
+        queryset = queryset.annotate(
+            chapters_count=count_related(Chapter, 'manga'),
+            comments_count=count_related(Comment, 'chapter__manga')
+        )
+        if user is not None and user.is_authenticated:
+            queryset = queryset.prefetch_related(
+                Prefetch('favorites', queryset=User.objects.filter(pk=user.pk).only('pk'), to_attr='user_favorites'),
+                Prefetch(
+                    'reading_progress',
+                    queryset=ReadingProgress.objects.filter(user=user).select_related('chapter', 'page'),
+                    to_attr='user_progress'
+                )
+            )
+        return queryset
+
+    def get_is_favorite(self, obj):
+        return bool(getattr(obj, 'user_favorites', None))
+
+    def get_reading_progress(self, obj):
+        progress = getattr(obj, 'user_progress', None)
+        if progress:
+            return MangaSerializer.format_reading_progress(progress[0])
+        return None
+
     def get_genres_list(self, obj):
         if obj.genres:
             return [genre.strip() for genre in obj.genres.split(',')]
@@ -98,6 +249,32 @@ class MangaSerializer(serializers.ModelSerializer):
     def get_status_display(self, obj):
         return obj.get_status_display()
 
+class MangaDetailSerializer(SparseFieldsetMixin, MangaListSerializer):
+    """
+    Representação dos mangás na página de detalhes, com tamanho fixo
+
+    Os capítulos só são incluídos com ?expand=chapters (no máximo ?chapters_limit, em
+    ordem de número, sem páginas e comentários); a lista completa é paginada em
+    mangas/{slug}/chapters/. Aceita ?fields= para limitar os campos da resposta.
+    """
+    chapters = serializers.SerializerMethodField()
+    expandable_fields = ('chapters',)
+
+    class Meta(MangaListSerializer.Meta):
+        fields = MangaListSerializer.Meta.fields + ['chapters']
+
+    def get_chapters(self, obj):
+        limit = CHAPTERS_EXPAND_LIMIT
+        request = self.context.get('request')
+        if request is not None:
+            try:
+                limit = min(max(int(request.query_params['chapters_limit']), 0), CHAPTERS_EXPAND_MAX_LIMIT)
+            except (KeyError, ValueError):
+                pass
+
+        chapters = ChapterSummarySerializer.with_summary_data(obj.chapters.order_by('number', 'id'))[:limit]
+        return ChapterSummarySerializer(chapters, many=True, context=self.context).data
+
 class UserStatisticsSerializer(serializers.ModelSerializer):
     username = serializers.SerializerMethodField()
 
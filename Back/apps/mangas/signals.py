@@ -0,0 +1,66 @@
+"""
+Sinais do app de mangás
+"""
+
+import os
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from core.services.list_cache import list_cache
+from .models import Manga, Chapter, Comment
+
+# Invalidar a listagem de mangás em cache quando os dados exibidos nela mudarem
+# (favoritos e progresso de leitura não fazem parte da listagem compartilhada)
+list_cache.invalidate_on('mangas_list', Manga, Chapter, Comment)
+
+
+PDF_FIELDS = ('pdf_file', 'pdf_file_path')
+
+
+@receiver(pre_save, sender=Chapter)
+def track_chapter_pdf_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Registra se o PDF de um capítulo existente mudou, para que salvar apenas outros
+    campos (título, número...) não enfileire a pré-renderização de novo.
+    """
+    if instance._state.adding:
+        instance._pdf_changed = True
+        return
+
+    if update_fields is not None and not set(update_fields) & set(PDF_FIELDS):
+        instance._pdf_changed = False
+        return
+
+    previous = sender.objects.filter(pk=instance.pk).values_list(*PDF_FIELDS).first()
+    current = (instance.pdf_file.name or '', instance.pdf_file_path or '')
+    instance._pdf_changed = previous is None or tuple(value or '' for value in previous) != current
+
+
+@receiver(post_save, sender=Chapter)
+def schedule_chapter_prerender(sender, instance, created=False, **kwargs):
+    """
+    Enfileira a pré-renderização das páginas de um capítulo em PDF após criá-lo ou trocar
+    o seu PDF. Com a pré-renderização desativada, apenas os metadados do PDF são indexados.
+    """
+    if instance.chapter_type != 'pdf':
+        return
+
+    if not (created or getattr(instance, '_pdf_changed', False)):
+        return
+
+    if not (instance.pdf_file or instance.pdf_file_path):
+        return
+
+    from . import prerender
+
+    if not getattr(settings, 'PDF_PRERENDER_ENABLED', True):
+        from core.services.pdf_index_service import pdf_index_service
+
+        full_path = os.path.join(settings.MEDIA_ROOT, prerender.get_chapter_pdf_path(instance))
+        transaction.on_commit(lambda: pdf_index_service.schedule_index(full_path))
+        return
+
+    # Só enfileirar depois que a transação for confirmada e o arquivo estiver disponível
+    # (a tarefa de pré-renderização também preenche o índice de metadados)
+    transaction.on_commit(lambda: prerender.schedule_chapter(instance))
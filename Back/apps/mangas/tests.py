@@ -1,3 +1,720 @@
-from django.test import TestCase
+"""
+Testes para o app de mangás
+"""
 
-# Create your tests here.
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from PIL import Image
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import Manga, Chapter, Page, Comment, ReadingProgress, MangaView
+from core.services import image_codecs, pdf_renderers
+from core.services.file_fingerprint import FileFingerprintIndex
+from core.services.cache_metrics import CacheMetrics
+from core.services.media_cache import MediaCache
+from .serializers import MangaListSerializer
+from . import pdf_converter, prerender
+
+User = get_user_model()
+
+
+class ChapterPrerenderTestCase(TestCase):
+    """
+    Testes para o pipeline de pré-renderização de capítulos em PDF
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.manga = Manga.objects.create(title='Test Manga', description='Test manga description')
+        self.pdf_path = 'chapters/pdf/test-upload.pdf'
+        self.client = APIClient()
+
+    def _create_pdf_chapter(self):
+        return Chapter.objects.create(
+            manga=self.manga,
+            title='Capítulo 1',
+            number=1,
+            chapter_type='pdf',
+            pdf_file_path=self.pdf_path
+        )
+
+    @patch('apps.mangas.prerender.schedule_chapter')
+    def test_pdf_chapter_save_schedules_prerender(self, schedule_chapter):
+        """
+        Salvar um capítulo em PDF deve enfileirar a pré-renderização após o commit
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            chapter = self._create_pdf_chapter()
+
+        schedule_chapter.assert_called_once_with(chapter)
+
+    @patch('apps.mangas.prerender.schedule_chapter')
+    def test_only_new_pdf_schedules_prerender(self, schedule_chapter):
+        """
+        Salvar outros campos de um capítulo não deve enfileirar a pré-renderização de novo
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            chapter = self._create_pdf_chapter()
+        schedule_chapter.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            chapter.title = 'Capítulo 1 (revisado)'
+            chapter.save()
+            Chapter.objects.get(pk=chapter.pk).save(update_fields=['title'])
+        schedule_chapter.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            chapter.pdf_file_path = 'chapters/pdf/test-upload-v2.pdf'
+            chapter.save()
+        schedule_chapter.assert_called_once_with(chapter)
+
+    @patch('apps.mangas.prerender.schedule_chapter')
+    def test_images_chapter_save_does_not_schedule_prerender(self, schedule_chapter):
+        """
+        Capítulos de imagens não devem ser pré-renderizados
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            Chapter.objects.create(manga=self.manga, title='Capítulo 2', number=2)
+
+        schedule_chapter.assert_not_called()
+
+    @patch('apps.mangas.prerender._get_loader')
+    def test_schedule_chapter_records_progress_once(self, get_loader):
+        """
+        O mesmo PDF não deve ser enfileirado duas vezes enquanto está em andamento
+        """
+        chapter = self._create_pdf_chapter()
+
+        prerender.schedule_chapter(chapter)
+        prerender.schedule_chapter(chapter)
+
+        self.assertEqual(get_loader.return_value.submit.call_count, 1)
+        progress = prerender.get_progress(self.pdf_path)
+        self.assertEqual(progress['status'], prerender.STATUS_QUEUED)
+        self.assertEqual(progress['chapter_id'], chapter.pk)
+
+    @patch('apps.mangas.pdf_converter.convert_pdf_page_to_variant')
+    @patch('apps.mangas.prerender._get_loader')
+    def test_convert_page_reports_rendering_instead_of_blocking(self, get_loader, convert_pdf_page_to_variant):
+        """
+        O leitor deve receber o progresso enquanto as páginas ainda estão sendo geradas
+        """
+        chapter = self._create_pdf_chapter()
+        prerender.schedule_chapter(chapter)
+
+        response = self.client.get('/api/v1/mangas/pdf/convert/', {'pdf_path': self.pdf_path, 'page_number': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()['status'], 'rendering')
+        convert_pdf_page_to_variant.assert_not_called()
+
+        response = self.client.get(f'/api/v1/mangas/chapters/{chapter.pk}/render_status/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], prerender.STATUS_QUEUED)
+
+    @patch('apps.mangas.pdf_converter.convert_pdf_page_to_variant', return_value='pdf_cache/page.jpg')
+    @patch('apps.mangas.prerender.schedule_readahead')
+    @patch('apps.mangas.prerender._get_loader')
+    def test_convert_page_outside_current_batch(self, get_loader, schedule_readahead, convert_pdf_page_to_variant):
+        """
+        Páginas além do lote em conversão são convertidas na hora, sem esperar a pré-renderização
+        """
+        prerender.schedule_chapter(self._create_pdf_chapter())
+        page_number = prerender.PRERENDER_BATCH_SIZE + 1
+
+        response = self.client.get('/api/v1/mangas/pdf/convert/', {'pdf_path': self.pdf_path, 'page_number': page_number})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(convert_pdf_page_to_variant.call_args.kwargs['page_number'], page_number)
+
+    @patch('apps.mangas.pdf_converter.convert_pdf_page_to_variant', return_value='pdf_cache/page.jpg')
+    @patch('apps.mangas.prerender.schedule_readahead')
+    @patch('apps.mangas.prerender._get_loader')
+    def test_stale_prerender_converts_page(self, get_loader, schedule_readahead, convert_pdf_page_to_variant):
+        """
+        Uma pré-renderização sem progresso (ex.: worker encerrado) não deve bloquear o leitor,
+        e o capítulo pode ser enfileirado de novo
+        """
+        chapter = self._create_pdf_chapter()
+        prerender.schedule_chapter(chapter)
+
+        progress = prerender.get_progress(self.pdf_path)
+        progress['updated_at'] -= prerender.PRERENDER_STALE_TIMEOUT + 1
+        cache.set(prerender._get_progress_key(self.pdf_path), progress)
+        self.assertFalse(prerender.is_rendering(self.pdf_path))
+
+        response = self.client.get('/api/v1/mangas/pdf/convert/', {'pdf_path': self.pdf_path, 'page_number': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        convert_pdf_page_to_variant.assert_called_once()
+
+        prerender.schedule_chapter(chapter)
+        self.assertEqual(get_loader.return_value.submit.call_count, 2)
+
+
+class MangaListCacheTestCase(TestCase):
+    """
+    Testes para a listagem de mangás compartilhada no cache
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.manga = Manga.objects.create(title='Test Manga', description='Test manga description')
+        self.other_manga = Manga.objects.create(title='Other Manga', description='Other manga description')
+        self.chapter = Chapter.objects.create(manga=self.manga, title='Capítulo 3', number=3, chapter_type='images')
+
+        self.reader = User.objects.create_user(username='leitor', email='leitor@example.com', password='senha-123')
+        self.other = User.objects.create_user(username='outro', email='outro@example.com', password='senha-123')
+        self.manga.favorites.add(self.reader)
+        ReadingProgress.objects.create(user=self.reader, manga=self.manga, chapter=self.chapter)
+
+        self.client = APIClient()
+        self.list_url = '/api/v1/mangas/mangas/'
+
+    def _get_personal_fields(self, response):
+        return {
+            item['slug']: (item['is_favorite'], item['reading_progress'] and item['reading_progress']['chapter'])
+            for item in response.data['results']
+        }
+
+    def test_cached_list_is_not_shared_between_users(self):
+        """
+        Os favoritos e o progresso de um usuário não devem aparecer para os outros
+        """
+        self.client.force_authenticate(user=self.reader)
+        response = self.client.get(self.list_url)
+        self.assertEqual(self._get_personal_fields(response), {
+            self.manga.slug: (True, 3), self.other_manga.slug: (False, None)
+        })
+
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(self.list_url)
+        self.assertEqual(self._get_personal_fields(response), {
+            self.manga.slug: (False, None), self.other_manga.slug: (False, None)
+        })
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.list_url)
+        self.assertEqual(self._get_personal_fields(response), {
+            self.manga.slug: (False, None), self.other_manga.slug: (False, None)
+        })
+
+    def test_overlay_uses_one_query_per_field(self):
+        """
+        Uma listagem em cache deve custar uma consulta de favoritos e uma de progresso
+        """
+        self.client.get(self.list_url)
+
+        self.client.force_authenticate(user=self.reader)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url)
+        self.assertEqual(self._get_personal_fields(response)[self.manga.slug], (True, 3))
+
+        # Favoritar não invalida a listagem compartilhada, apenas muda o campo pessoal
+        self.other_manga.favorites.add(self.reader)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url)
+        self.assertEqual(self._get_personal_fields(response)[self.other_manga.slug], (True, None))
+
+
+    def test_background_refresh_does_not_use_request(self):
+        """
+        A regeneração em segundo plano deve usar uma requisição anônima nova, com os mesmos parâmetros
+        """
+        from core.services.list_cache import list_cache
+
+        self.other_manga.favorites.add(self.reader)
+        self.client.force_authenticate(user=self.reader)
+        self.client.get(self.list_url, {'page_size': 1})
+
+        key = list_cache.get_key('mangas_list', 'page_size=1')
+        entry = cache.get(key)
+        entry['fresh_until'] = 0
+        cache.set(key, entry)
+        Manga.objects.filter(pk=self.other_manga.pk).update(title='Título novo')
+
+        with patch.object(list_cache, 'schedule_refresh') as schedule_refresh:
+            self.client.get(self.list_url, {'page_size': 1})
+        key, name, refresh = schedule_refresh.call_args.args
+        list_cache._refresh(key, name, refresh)
+
+        data = cache.get(key)['data']
+        self.assertEqual([manga['title'] for manga in data['results']], ['Título novo'])
+        self.assertEqual(data['next'], 'http://testserver/api/v1/mangas/mangas/?page=2&page_size=1')
+        self.assertFalse(data['results'][0]['is_favorite'])
+
+    def test_nocache_only_regenerates_for_staff(self):
+        """
+        Com nocache, apenas a equipe regrava a listagem compartilhada
+        """
+        self.client.get(self.list_url)
+        Manga.objects.filter(pk=self.manga.pk).update(title='Título novo')
+
+        response = self.client.get(self.list_url, {'nocache': 1})
+        self.assertIn('Título novo', [manga['title'] for manga in response.data['results']])
+        self.assertNotIn('Título novo', [manga['title'] for manga in self.client.get(self.list_url).data['results']])
+
+        self.other.is_staff = True
+        self.other.save()
+        self.client.force_authenticate(user=self.other)
+        self.client.get(self.list_url, {'nocache': 1})
+        self.client.force_authenticate(user=None)
+        self.assertIn('Título novo', [manga['title'] for manga in self.client.get(self.list_url).data['results']])
+
+
+class MangaListQueriesTestCase(TestCase):
+    """
+    Testes para o número de consultas da listagem de mangás
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username='leitor', email='leitor@example.com', password='senha-123')
+        for index in range(12):
+            manga = Manga.objects.create(title=f'Manga {index}', description='Descrição')
+            for number in range(1, 3):
+                chapter = Chapter.objects.create(
+                    manga=manga, title=f'Capítulo {number}', number=number, chapter_type='images'
+                )
+                Comment.objects.create(user=self.user, chapter=chapter, content='Comentário')
+            if index % 2 == 0:
+                manga.favorites.add(self.user)
+                ReadingProgress.objects.create(user=self.user, manga=manga, chapter=chapter)
+
+        self.client = APIClient()
+        self.list_url = '/api/v1/mangas/mangas/'
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        """
+        A listagem deve usar o mesmo número de consultas para qualquer tamanho de página
+        """
+        for page_size in (2, 10):
+            # Contagem da paginação e página com as contagens anotadas
+            with self.assertNumQueries(2):
+                response = self.client.get(self.list_url, {'page_size': page_size, 'nocache': 1})
+            self.assertEqual(len(response.data['results']), page_size)
+
+        item = response.data['results'][0]
+        self.assertEqual((item['chapters_count'], item['comments_count']), (2, 2))
+        self.assertNotIn('chapters', item)
+
+        self.client.force_authenticate(user=self.user)
+        for page_size in (2, 10):
+            # Mais uma consulta de favoritos e uma de progresso
+            with self.assertNumQueries(4):
+                response = self.client.get(self.list_url, {'page_size': page_size, 'nocache': 1})
+            favorites = [manga['is_favorite'] for manga in response.data['results']]
+            self.assertEqual(favorites, [index % 2 == 1 for index in range(page_size)])
+
+    def test_counts_do_not_join_chapters_and_comments(self):
+        """
+        As contagens devem vir de subconsultas, sem o JOIN de capítulos x comentários
+        """
+        sql = str(MangaListSerializer.with_list_data(Manga.objects.all()).query)
+        self.assertTrue(sql.endswith('FROM "mangas_manga"'))
+
+        counts = MangaListSerializer.with_list_data(Manga.objects.all()).values_list('chapters_count', 'comments_count')
+        self.assertEqual(set(counts), {(2, 2)})
+
+    def test_list_serializer_prefetches_user_data(self):
+        """
+        Os campos pessoais devem vir de um único prefetch para cada campo
+        """
+        queryset = MangaListSerializer.with_list_data(Manga.objects.order_by('title'), self.user)
+        with self.assertNumQueries(3):
+            data = MangaListSerializer(queryset, many=True).data
+
+        first = data[0]
+        self.assertEqual(first['title'], 'Manga 0')
+        self.assertTrue(first['is_favorite'])
+        self.assertEqual(first['reading_progress']['chapter'], 2)
+        self.assertFalse(data[1]['is_favorite'])
+        self.assertIsNone(data[1]['reading_progress'])
+
+
+class MangaDetailTestCase(TestCase):
+    """
+    Testes para a página de detalhes do mangá e as sub-listagens paginadas
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.user = User.objects.create_user(username='leitor', email='leitor@example.com', password='senha-123')
+        self.manga = Manga.objects.create(title='Manga Longo', description='Descrição')
+        for number in range(1, 31):
+            chapter = Chapter.objects.create(
+                manga=self.manga, title=f'Capítulo {number}', number=number, chapter_type='images'
+            )
+            Comment.objects.create(user=self.user, chapter=chapter, content='Comentário')
+        for page_number in range(1, 6):
+            Page.objects.create(chapter=chapter, image=f'pages/{page_number}.jpg', page_number=page_number)
+
+        self.client = APIClient()
+        self.detail_url = f'/api/v1/mangas/mangas/{self.manga.slug}/'
+
+    def test_default_detail_is_constant_size(self):
+        """
+        Sem expand, os capítulos não são incluídos e o número de consultas é fixo
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('chapters', response.data)
+        self.assertEqual((response.data['chapters_count'], response.data['comments_count']), (30, 30))
+
+        self.client.force_authenticate(user=self.user)
+        self.manga.favorites.add(self.user)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.detail_url)
+        self.assertTrue(response.data['is_favorite'])
+
+    def test_expand_chapters_and_sparse_fields(self):
+        """
+        Testa ?expand=chapters, ?chapters_limit e ?fields
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url, {'expand': 'chapters', 'chapters_limit': 5})
+        chapters = response.data['chapters']
+        self.assertEqual([chapter['number'] for chapter in chapters], [1, 2, 3, 4, 5])
+        self.assertEqual(chapters[0]['comments_count'], 1)
+        self.assertNotIn('pages', chapters[0])
+
+        response = self.client.get(self.detail_url, {'fields': 'id,title', 'expand': 'chapters'})
+        self.assertEqual(set(response.data), {'id', 'title', 'chapters'})
+        self.assertEqual(len(response.data['chapters']), 30)
+
+    def test_cursor_paginated_chapters_and_pages(self):
+        """
+        Testa as listagens paginadas por cursor dos capítulos e das páginas
+        """
+        numbers = []
+        url = f'{self.detail_url}chapters/?page_size=12'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            numbers += [chapter['number'] for chapter in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(numbers, list(range(1, 31)))
+
+        chapter = Chapter.objects.get(manga=self.manga, number=30)
+        response = self.client.get(f'/api/v1/mangas/chapters/{chapter.id}/pages/', {'page_size': 2})
+        self.assertEqual([page['page_number'] for page in response.data['results']], [1, 2])
+        self.assertIsNotNone(response.data['next'])
+
+
+class KeysetPaginationTestCase(TestCase):
+    """
+    Testes para a paginação por cursor do histórico e da listagem de capítulos
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.user = User.objects.create_user(username='leitor', email='leitor@example.com', password='senha-123')
+        self.manga = Manga.objects.create(title='Manga Longo', description='Descrição')
+        for number in range(1, 8):
+            Chapter.objects.create(manga=self.manga, title=f'Capítulo {number}', number=number, chapter_type='images')
+        for index in range(5):
+            manga = Manga.objects.create(title=f'Manga {index}', description='Descrição')
+            MangaView.objects.create(user=self.user, manga=manga)
+
+        self.client = APIClient()
+
+    def _get_all(self, url, params, key):
+        values = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            values += [item[key] for item in response.data['results']]
+            if not response.data['next']:
+                return values
+            response = self.client.get(response.data['next'])
+
+    def test_chapters_in_number_order(self):
+        """
+        Testa a listagem de capítulos por cursor sobre (number, id)
+        """
+        numbers = self._get_all(
+            '/api/v1/mangas/chapters/', {'manga_slug': self.manga.slug, 'pagination': 'cursor', 'page_size': 3}, 'number'
+        )
+        self.assertEqual(numbers, list(range(1, 8)))
+
+    def test_history_most_recent_first(self):
+        """
+        Testa o histórico por cursor sobre (last_viewed, id), do mais recente ao mais antigo
+        """
+        self.client.force_authenticate(user=self.user)
+        mangas = self._get_all(
+            '/api/v1/mangas/history/my_history/', {'pagination': 'cursor', 'page_size': 2}, 'manga_title'
+        )
+        self.assertEqual(mangas, [f'Manga {index}' for index in reversed(range(5))])
+
+
+class PDFConverterTestCase(SimpleTestCase):
+    """
+    Base para os testes do conversor com MEDIA_ROOT e cache temporários
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.media_root = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.media_root, 'media_cache')
+
+        self.pdf_path = 'chapters/pdf/concorrente.pdf'
+        os.makedirs(os.path.join(self.media_root, 'chapters/pdf'))
+        with open(os.path.join(self.media_root, self.pdf_path), 'wb') as f:
+            f.write(b'%PDF-1.4')
+
+        self._settings = override_settings(MEDIA_ROOT=self.media_root, PDF_RENDERER_BACKEND='poppler')
+        self._settings.enable()
+        self.media_cache = MediaCache(
+            self.cache_dir,
+            fingerprints=FileFingerprintIndex(os.path.join(self.media_root, 'fingerprints.sqlite3')),
+            metrics=CacheMetrics(os.path.join(self.media_root, 'metrics.sqlite3'))
+        )
+        self._media_cache = patch.object(pdf_converter, 'media_cache', self.media_cache)
+        self._media_cache.start()
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        self._media_cache.stop()
+        self._settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _fake_convert(self, *args, **kwargs):
+        """Simula o Poppler gerando uma página na largura pedida."""
+        width = kwargs['size'][0]
+        return [Image.new('RGB', (width, width * 3 // 2), 'white')]
+
+
+class PDFPageConversionSingleFlightTestCase(PDFConverterTestCase):
+    """
+    Testes para a deduplicação de conversões simultâneas da mesma página
+    """
+    def test_concurrent_requests_convert_page_once(self):
+        """
+        Vários leitores abrindo a mesma página nova devem disparar uma única conversão
+        """
+        def fake_convert(*args, **kwargs):
+            time.sleep(0.2)
+            return [Image.new('RGB', (10, 10))]
+
+        results = []
+
+        def reader():
+            results.append(pdf_converter.convert_pdf_page_to_image(self.pdf_path, 1))
+
+        with patch.object(pdf_renderers, 'convert_from_path', side_effect=fake_convert) as convert_from_path:
+            threads = [threading.Thread(target=reader) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(convert_from_path.call_count, 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(len(results), 10)
+
+        # Apenas a imagem final deve permanecer no cache (sem travas nem temporários)
+        page_dir = os.path.dirname(os.path.join(self.media_root, results[0]))
+        self.assertEqual(os.listdir(page_dir), [os.path.basename(results[0])])
+        self.assertEqual(self.media_cache.get_stats()['fills'], 1)
+
+
+class PDFPageVariantTestCase(PDFConverterTestCase):
+    """
+    Testes para as variantes de resolução das páginas
+    """
+    def test_nearest_variant(self):
+        """
+        A largura pedida deve ser atendida pela menor variante que a cobre
+        """
+        self.assertEqual(pdf_converter.get_nearest_variant(100), 'thumb')
+        self.assertEqual(pdf_converter.get_nearest_variant(800), 'mobile')
+        self.assertEqual(pdf_converter.get_nearest_variant(1000), 'desktop')
+        self.assertEqual(pdf_converter.get_nearest_variant(5000), 'retina')
+
+    def test_smaller_variants_are_derived_from_base(self):
+        """
+        Apenas a variante base é rasterizada; as demais são reduzidas com o Pillow
+        """
+        with patch.object(pdf_renderers, 'convert_from_path', side_effect=self._fake_convert) as convert_from_path:
+            thumb_path = pdf_converter.convert_pdf_page_to_variant(self.pdf_path, 1, 'thumb')
+            mobile_path = pdf_converter.convert_pdf_page_to_variant(self.pdf_path, 1, 'mobile', format='PNG')
+            retina_path = pdf_converter.convert_pdf_page_to_variant(self.pdf_path, 1, 'retina')
+
+        convert_from_path.assert_called_once()
+        self.assertEqual(convert_from_path.call_args.kwargs['size'], (2048, None))
+
+        with Image.open(os.path.join(self.media_root, thumb_path)) as image:
+            self.assertEqual(image.size, (320, 480))
+        with Image.open(os.path.join(self.media_root, mobile_path)) as image:
+            self.assertEqual((image.format, image.size), ('PNG', (800, 1200)))
+        with Image.open(os.path.join(self.media_root, retina_path)) as image:
+            self.assertEqual(image.size, (2048, 3072))
+
+    def test_convert_endpoint_picks_variant_from_width(self):
+        """
+        O endpoint deve escolher a variante mais próxima da largura pedida
+        """
+        with patch.object(pdf_renderers, 'convert_from_path', side_effect=self._fake_convert):
+            response = APIClient().get(
+                '/api/v1/mangas/pdf/convert/', {'pdf_path': self.pdf_path, 'page_number': 1, 'width': 700}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['variant'], 'mobile')
+        self.assertEqual(response.json()['width'], 800)
+
+    @patch.object(prerender, 'get_page_count', return_value=5)
+    def test_page_out_of_range(self, get_page_count):
+        """
+        Páginas além do fim do PDF devem retornar 404 sem chamar o conversor
+        """
+        client = APIClient()
+        with patch.object(pdf_renderers, 'convert_from_path') as convert_from_path:
+            for url, params in (
+                ('/api/v1/mangas/pdf/convert/', {'page_number': 6}),
+                ('/api/v1/mangas/pdf/page-image/', {'page_number': 6}),
+                ('/api/v1/mangas/pdf/convert-batch/', {'first_page': 4, 'last_page': 6}),
+                ('/api/v1/mangas/pdf/convert-batch/', {'first_page': 6}),
+            ):
+                response = client.get(url, {'pdf_path': self.pdf_path, **params})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        convert_from_path.assert_not_called()
+
+    @override_settings(PDF_BATCH_MAX_PAGES=3)
+    @patch.object(prerender, 'get_page_count', return_value=50)
+    def test_batch_range_is_capped(self, get_page_count):
+        """
+        Intervalos com mais de PDF_BATCH_MAX_PAGES páginas devem retornar 400, e sem
+        last_page apenas PDF_BATCH_MAX_PAGES páginas são convertidas
+        """
+        client = APIClient()
+        with patch.object(pdf_converter, 'convert_pdf_pages_to_images', return_value={}) as convert:
+            response = client.get('/api/v1/mangas/pdf/convert-batch/', {
+                'pdf_path': self.pdf_path, 'first_page': 1, 'last_page': 50
+            })
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            convert.assert_not_called()
+
+            response = client.get('/api/v1/mangas/pdf/convert-batch/', {'pdf_path': self.pdf_path, 'first_page': 10})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(convert.call_args.kwargs['first_page'], 10)
+            self.assertEqual(convert.call_args.kwargs['last_page'], 12)
+
+    @unittest.skipUnless('WEBP' in image_codecs.SUPPORTED_FORMATS, "Pillow sem suporte a WebP")
+    def test_page_image_endpoint_negotiates_webp(self):
+        """
+        O endpoint binário deve escolher o WebP pelo cabeçalho Accept e guardar cada formato separadamente
+        """
+        client = APIClient()
+        params = {'pdf_path': self.pdf_path, 'page_number': 1, 'variant': 'mobile'}
+
+        with patch.object(pdf_renderers, 'convert_from_path', side_effect=self._fake_convert) as convert_from_path:
+            webp_response = client.get('/api/v1/mangas/pdf/page-image/', params, HTTP_ACCEPT='image/webp,*/*')
+            jpeg_response = client.get('/api/v1/mangas/pdf/page-image/', params, HTTP_ACCEPT='*/*')
+
+        # A variante base é rasterizada uma única vez para os dois formatos
+        convert_from_path.assert_called_once()
+
+        self.assertEqual(webp_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(webp_response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', webp_response['Vary'])
+        self.assertEqual(b''.join(webp_response.streaming_content)[8:12], b'WEBP')
+
+        self.assertEqual(jpeg_response['Content-Type'], 'image/jpeg')
+        self.assertNotEqual(webp_response['ETag'], jpeg_response['ETag'])
+
+
+class PDFReadaheadTestCase(PDFConverterTestCase):
+    """
+    Testes para a leitura antecipada das próximas páginas
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        super().setUp()
+        cache.clear()
+
+        self._page_count = patch.object(prerender, 'get_page_count', return_value=5)
+        self._page_count.start()
+        self._loader = patch.object(prerender, '_get_readahead_loader')
+        self.loader = self._loader.start()
+
+    def tearDown(self):
+        """
+        Limpa a fila de leitura antecipada
+        """
+        self._loader.stop()
+        self._page_count.stop()
+        prerender._readahead_pending.clear()
+        super().tearDown()
+
+    def test_next_pages_are_queued_once(self):
+        """
+        As próximas páginas devem ser enfileiradas uma única vez por capítulo
+        """
+        self.assertEqual(prerender.schedule_readahead(self.pdf_path, 1, 'mobile', 'JPEG', pages=3), [2, 3, 4])
+
+        # Uma nova requisição enquanto as páginas estão na fila só acrescenta as que faltam
+        self.assertEqual(prerender.schedule_readahead(self.pdf_path, 2, 'mobile', 'JPEG', pages=3), [5])
+        self.assertEqual(prerender.schedule_readahead(self.pdf_path, 2, 'mobile', 'JPEG', pages=3), [])
+
+        self.assertEqual(self.loader.return_value.submit.call_count, 2)
+
+    def test_task_releases_pages(self):
+        """
+        Ao final da tarefa as páginas saem da fila, mesmo em caso de erro
+        """
+        queued = prerender.schedule_readahead(self.pdf_path, 3, 'mobile', 'JPEG', pages=3)
+
+        with patch.object(pdf_converter, 'convert_pdf_pages_to_images', side_effect=RuntimeError) as convert:
+            prerender._readahead_task(self.pdf_path, queued, 'mobile', 'JPEG')
+
+        convert.assert_called_once_with(self.pdf_path, 4, 5, format='JPEG', variant='mobile')
+        self.assertEqual(prerender._readahead_pending, {})
+
+    def test_global_queue_limit(self):
+        """
+        A leitura antecipada é descartada quando a fila global está cheia
+        """
+        with patch.object(prerender, 'READAHEAD_MAX_PENDING', 2):
+            self.assertEqual(prerender.schedule_readahead(self.pdf_path, 1, 'mobile', 'JPEG', pages=3), [])
+
+        self.loader.return_value.submit.assert_not_called()
+
+    def test_served_page_schedules_readahead(self):
+        """
+        Servir uma página deve agendar a leitura antecipada das seguintes
+        """
+        with patch.object(pdf_renderers, 'convert_from_path', side_effect=self._fake_convert):
+            response = APIClient().get(
+                '/api/v1/mangas/pdf/convert/', {'pdf_path': self.pdf_path, 'page_number': 1, 'variant': 'thumb'}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.loader.return_value.submit.assert_called_once_with(
+            prerender._readahead_task, self.pdf_path, [2, 3, 4], 'thumb', 'JPEG'
+        )
@@ -5,7 +5,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     MangaViewSet, ChapterViewSet, PageViewSet,
     UserStatisticsViewSet, MangaViewViewSet,
-    convert_pdf_page, get_pdf_info, test_endpoint, test_mangas_endpoint
+    convert_pdf_page, convert_pdf_pages, pdf_page_image, get_pdf_info, test_endpoint, test_mangas_endpoint
 )
 from .chunked_upload import ChunkedUploadView
 
@@ -20,6 +20,8 @@ urlpatterns = [
     path('', include(router.urls)),
     path('chunked-upload/', ChunkedUploadView.as_view(), name='chunked-upload'),
     path('pdf/convert/', convert_pdf_page, name='convert-pdf-page'),
+    path('pdf/convert-batch/', convert_pdf_pages, name='convert-pdf-pages'),
+    path('pdf/page-image/', pdf_page_image, name='pdf-page-image'),
     path('pdf/info/', get_pdf_info, name='get-pdf-info'),
     path('test/', test_endpoint, name='test-endpoint'),
     path('mangas-test/', test_mangas_endpoint, name='mangas-test'),
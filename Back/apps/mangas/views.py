@@ -1,5 +1,5 @@
 from rest_framework import viewsets, permissions, status, filters
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, permission_classes
 from django_filters.rest_framework import DjangoFilterBackend
@@ -8,27 +8,55 @@ from django.db import models, transaction
 from django.db.models import F
 from django.http import JsonResponse, HttpResponse, FileResponse
 from django.conf import settings
-from django.core.cache import cache
 from .models import Manga, Chapter, Page, ReadingProgress, Comment, UserStatistics, MangaView
 from .serializers import (
-    MangaSerializer, ChapterSerializer, PageSerializer,
+    MangaSerializer, MangaListSerializer, MangaDetailSerializer, ChapterSerializer,
+    ChapterSummarySerializer, PageSerializer,
     ReadingProgressSerializer, CommentSerializer, UserSerializer,
     UserStatisticsSerializer, MangaViewSerializer
 )
 import os
 import logging
-from . import pdf_converter
-
-class DefaultPagination(PageNumberPagination):
+from django.utils.cache import patch_vary_headers
+from core.services import image_codecs
+from core.services.rankings import rankings
+from core.services.view_counter import view_counter
+from utils.mixins import CachedListMixin
+from utils.pagination import KeysetPagination
+from utils.sendfile import send_file
+from . import pdf_converter, prerender
+
+class DefaultPagination(KeysetPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class MangaViewSet(viewsets.ModelViewSet):
+class ChapterCursorPagination(CursorPagination):
+    """
+    Paginação por cursor dos capítulos de um mangá, em ordem de número
+
+    O custo de cada página não depende da posição na lista e não há contagem do total.
+    As ações que a usam desativam os filter_backends da view, pois o OrderingFilter
+    substituiria a ordem do cursor.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('number', 'id')
+
+class PageCursorPagination(ChapterCursorPagination):
+    """
+    Paginação por cursor das páginas de um capítulo, em ordem de número da página
+    """
+    ordering = ('page_number', 'id')
+
+class MangaViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Manga.objects.all().prefetch_related('chapters', 'favorites')
     serializer_class = MangaSerializer
     lookup_field = 'slug'
+    list_cache_name = 'mangas_list'
     pagination_class = DefaultPagination
+    keyset_ordering = ('-created_at', '-id')
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description', 'author', 'genres']
@@ -37,20 +65,40 @@ class MangaViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         # Allow read operations and increment_views for everyone, but require authentication for other operations
-        if self.action in ['list', 'retrieve', 'increment_views']:
+        if self.action in ['list', 'retrieve', 'chapters', 'increment_views']:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
+        # A listagem fica em cache para todos os usuários; os campos pessoais são mesclados depois
+        context['personalize'] = self.action != 'list'
         return context
 
+    def get_user_overlay(self, user, ids):
+        return MangaSerializer.get_user_overlay(user, ids)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return MangaListSerializer
+        if self.action == 'retrieve':
+            return MangaDetailSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
         """
         Sobrescreve o método get_queryset para adicionar tratamento de erros
         """
         try:
+            if self.action == 'list':
+                # Listagem compartilhada no cache: contagens anotadas, sem dados do usuário
+                return MangaListSerializer.with_list_data(Manga.objects.all())
+            if self.action == 'retrieve':
+                # Tamanho fixo: contagens anotadas e campos pessoais por prefetch
+                return MangaListSerializer.with_list_data(Manga.objects.all(), self.request.user)
+            if self.action in ('chapters', 'increment_views'):
+                return Manga.objects.all()
             return Manga.objects.all().prefetch_related('chapters', 'favorites')
         except Exception as e:
             import logging
@@ -65,30 +113,7 @@ class MangaViewSet(viewsets.ModelViewSet):
         Lista todos os mangás com suporte a cache
         """
         try:
-            # Verificar se a resposta está em cache
-            cache_key = f"mangas_list_{request.query_params.urlencode()}"
-            cached_response = cache.get(cache_key)
-
-            if cached_response and not request.query_params.get('nocache'):
-                return Response(cached_response)
-
-            # Aplicar filtros padrão
-            queryset = self.filter_queryset(self.get_queryset())
-
-            # Paginação
-            page = self.paginate_queryset(queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                response = self.get_paginated_response(serializer.data)
-                # Armazenar em cache por 5 minutos (300 segundos)
-                cache.set(cache_key, response.data, 300)
-                return response
-
-            serializer = self.get_serializer(queryset, many=True)
-            data = serializer.data
-            # Armazenar em cache por 5 minutos (300 segundos)
-            cache.set(cache_key, data, 300)
-            return Response(data)
+            return super().list(request, *args, **kwargs)
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
@@ -100,18 +125,30 @@ class MangaViewSet(viewsets.ModelViewSet):
                 'status_code': 500
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=True, methods=['get'], pagination_class=ChapterCursorPagination, filter_backends=[])
+    def chapters(self, request, slug=None):
+        """
+        Lista os capítulos do mangá, paginados por cursor em ordem de número
+        """
+        manga = self.get_object()
+        chapters = ChapterSummarySerializer.with_summary_data(manga.chapters.all())
+        page = self.paginate_queryset(chapters)
+        serializer = ChapterSummarySerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['post'])
     def increment_views(self, request, slug=None):
         """
         Incrementa o contador de visualizações de um mangá.
         Não requer autenticação para permitir contagem de visualizações de usuários anônimos.
+        Visualizações repetidas do mesmo visitante dentro de VIEW_COUNTER_DEDUP_WINDOW contam uma vez.
         """
+        manga = self.get_object()
         try:
-            # Retornar uma resposta simulada para evitar erros
+            view_counter.record(Manga, manga.pk, view_counter.get_visitor(request))
             return Response({
                 'status': 'success',
-                'views_count': 1,
-                'message': 'Visualização incrementada com sucesso (simulado)'
+                'views_count': view_counter.get_count(manga)
             })
         except Exception as e:
             import logging
@@ -194,6 +231,7 @@ class ChapterViewSet(viewsets.ModelViewSet):
     queryset = Chapter.objects.all()
     serializer_class = ChapterSerializer
     pagination_class = DefaultPagination
+    keyset_ordering = ('number', 'id')
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['manga']
@@ -202,7 +240,7 @@ class ChapterViewSet(viewsets.ModelViewSet):
     ordering = ['number']
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'pages', 'render_status']:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
@@ -320,6 +358,31 @@ class ChapterViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'], pagination_class=PageCursorPagination, filter_backends=[])
+    def pages(self, request, pk=None):
+        """
+        Lista as páginas do capítulo, paginadas por cursor em ordem de número
+        """
+        chapter = self.get_object()
+        page = self.paginate_queryset(chapter.pages.all())
+        serializer = PageSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def render_status(self, request, pk=None):
+        """Obtém o progresso da pré-renderização das páginas de um capítulo em PDF"""
+        chapter = self.get_object()
+        pdf_path = prerender.get_chapter_pdf_path(chapter)
+
+        if chapter.chapter_type != 'pdf' or not pdf_path:
+            return Response({'error': 'O capítulo não possui arquivo PDF'}, status=status.HTTP_400_BAD_REQUEST)
+
+        progress = prerender.get_progress(pdf_path)
+        if not progress:
+            return Response({'status': 'not_scheduled', 'pages_ready': 0, 'total': None})
+
+        return Response(progress)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def comment(self, request, pk=None):
         chapter = self.get_object()
@@ -330,7 +393,7 @@ class ChapterViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], keyset_ordering=('-created_at', '-id'))
     def comments(self, request, pk=None):
         chapter = self.get_object()
         comments = Comment.objects.filter(chapter=chapter)
@@ -342,6 +405,7 @@ class PageViewSet(viewsets.ModelViewSet):
     queryset = Page.objects.all()
     serializer_class = PageSerializer
     pagination_class = DefaultPagination
+    keyset_ordering = ('page_number', 'id')
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['chapter']
@@ -397,6 +461,7 @@ class MangaViewViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = MangaView.objects.all()
     serializer_class = MangaViewSerializer
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ('-last_viewed', '-id')
 
     def get_queryset(self):
         """Only allow users to see their own views or admins to see all"""
@@ -446,14 +511,13 @@ class MangaViewViewSet(viewsets.ReadOnlyModelViewSet):
         user = request.user
 
         # Get user's favorite genres based on view history
-        user_views = MangaView.objects.filter(user=user).order_by('-view_count')[:10]
+        user_views = MangaView.objects.filter(user=user).select_related('manga').order_by('-view_count')[:10]
+        queryset = MangaListSerializer.with_list_data(Manga.objects.all(), user)
 
         if not user_views:
-            # If user has no history, return popular mangas
-            popular_mangas = Manga.objects.annotate(
-                total_views=models.Count('views')
-            ).order_by('-total_views')[:10]
-            serializer = MangaSerializer(popular_mangas, many=True, context={'request': request})
+            # If user has no history, return popular mangas (ranking pré-calculado)
+            popular_mangas = rankings.get_queryset('manga', 'popular', queryset=queryset)[:10]
+            serializer = MangaListSerializer(popular_mangas, many=True, context={'request': request})
             return Response(serializer.data)
 
         # Extract genres from user's most viewed mangas
@@ -463,24 +527,18 @@ class MangaViewViewSet(viewsets.ReadOnlyModelViewSet):
                 genres = [g.strip() for g in view.manga.genres.split(',')]
                 user_genres.update(genres)
 
-        # Find mangas with similar genres that user hasn't read yet
-        viewed_manga_ids = user_views.values_list('manga_id', flat=True)
-
-        recommended_mangas = Manga.objects.exclude(id__in=viewed_manga_ids)
-
-        # Filter by genres if we have user genres
-        if user_genres:
-            q_objects = models.Q()
-            for genre in user_genres:
-                q_objects |= models.Q(genres__icontains=genre)
-            recommended_mangas = recommended_mangas.filter(q_objects)
+        # Find mangas with similar genres that user hasn't read yet, ordered by popularity
+        viewed_manga_ids = {view.manga_id for view in user_views}
+        candidates = {}
+        for genre in (user_genres or [None]):
+            for manga_id, views in rankings.get('manga', 'popular', genre):
+                if manga_id not in viewed_manga_ids:
+                    candidates[manga_id] = views
 
-        # Order by popularity
-        recommended_mangas = recommended_mangas.annotate(
-            total_views=models.Count('views')
-        ).order_by('-total_views')[:10]
+        recommended_ids = sorted(candidates, key=lambda manga_id: candidates[manga_id], reverse=True)[:10]
+        recommended_mangas = rankings.order_by_ids(queryset, recommended_ids)
 
-        serializer = MangaSerializer(recommended_mangas, many=True, context={'request': request})
+        serializer = MangaListSerializer(recommended_mangas, many=True, context={'request': request})
         return Response(serializer.data)
 
 
@@ -493,22 +551,21 @@ def convert_pdf_page(request):
     Parâmetros da query:
     - pdf_path: Caminho relativo do arquivo PDF no storage
     - page_number: Número da página a ser convertida (começando em 1)
-    - dpi: Resolução da imagem em DPI (opcional, padrão: 200)
-    - format: Formato de saída da imagem (opcional, padrão: JPEG)
-    - quality: Qualidade da imagem (opcional, padrão: 85, apenas para JPEG)
+    - variant: Variante de resolução (opcional: thumb, mobile, desktop, retina; padrão: desktop)
+    - width: Largura desejada em pixels (opcional, usa a variante mais próxima; ignorado se variant for informado)
+    - format: Formato de saída da imagem (opcional: JPEG, PNG, WEBP, AVIF; padrão: escolhido pelo cabeçalho Accept)
     - use_cache: Se True, usa o cache para evitar reconversão (opcional, padrão: True)
 
     Retorna:
-    - Um objeto JSON com o caminho da imagem convertida
+    - Um objeto JSON com o caminho da imagem convertida, a variante e o formato utilizados
+    - HTTP 202 com o progresso (status "rendering") se a página está no lote em pré-renderização
+    - HTTP 404 se a página não existe no PDF
     """
     logger = logging.getLogger(__name__)
 
     # Obter parâmetros da query
     pdf_path = request.GET.get('pdf_path')
     page_number = request.GET.get('page_number')
-    dpi = request.GET.get('dpi', pdf_converter.DPI)
-    format = request.GET.get('format', pdf_converter.OUTPUT_FORMAT)
-    quality = request.GET.get('quality', pdf_converter.JPEG_QUALITY)
     use_cache = request.GET.get('use_cache', 'true').lower() == 'true'
 
     # Validar parâmetros obrigatórios
@@ -525,25 +582,57 @@ def convert_pdf_page(request):
     except ValueError:
         return JsonResponse({'error': 'O número da página deve ser um número inteiro'}, status=400)
 
+    variant, error = _get_requested_variant(request)
+    if error:
+        return error
+
+    format, error = _get_requested_format(request)
+    if error:
+        return error
+
+    error = _check_page_range(pdf_path, page_number)
+    if error:
+        return error
+
+    # Se a página está no lote em pré-renderização, informar o progresso em vez de convertê-la
+    # de novo; páginas de lotes posteriores ou de pré-renderizações abandonadas são convertidas já
+    if use_cache and prerender.is_page_pending(pdf_path, page_number):
+        artifact = pdf_converter.get_variant_cache_artifact(page_number, pdf_converter.BASE_VARIANT)
+        if not pdf_converter.is_cached(pdf_path, artifact):
+            progress = prerender.get_progress(pdf_path)
+            return JsonResponse({
+                'success': False,
+                'status': 'rendering',
+                'pages_ready': progress['pages_ready'],
+                'total': progress['total']
+            }, status=202)
+
     try:
-        # Converter a página do PDF em imagem
-        image_path = pdf_converter.convert_pdf_page_to_image(
+        # Obter a variante da página (derivada da variante base quando possível)
+        image_path = pdf_converter.convert_pdf_page_to_variant(
             pdf_path=pdf_path,
             page_number=page_number,
-            dpi=int(dpi),
-            format=format.upper(),
-            quality=int(quality),
+            variant=variant,
+            format=format,
             use_cache=use_cache
         )
 
+        # Adiantar a conversão das próximas páginas do capítulo
+        prerender.schedule_readahead(pdf_path, page_number, variant, format)
+
         # Construir URL completa da imagem
         image_url = request.build_absolute_uri(settings.MEDIA_URL + image_path)
 
-        return JsonResponse({
+        response = JsonResponse({
             'success': True,
             'image_path': image_path,
-            'image_url': image_url
+            'image_url': image_url,
+            'variant': variant,
+            'width': pdf_converter.VARIANTS[variant],
+            'format': format
         })
+        patch_vary_headers(response, ['Accept'])
+        return response
 
     except FileNotFoundError as e:
         logger.error(f"Arquivo PDF não encontrado: {pdf_path}")
@@ -554,6 +643,234 @@ def convert_pdf_page(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _check_page_range(pdf_path, last_page):
+    """
+    Verifica se a página pedida existe no PDF, consultando o número de páginas no índice de metadados
+
+    PDFs que não puderam ser indexados seguem para o conversor, que informa o erro.
+
+    Returns:
+        JsonResponse: Resposta 404 se a página não existe, ou None
+    """
+    try:
+        total = prerender.get_page_count(pdf_path)
+    except ValueError:
+        return None
+
+    if last_page > total:
+        return JsonResponse({'error': f'Página não encontrada: o PDF tem {total} páginas'}, status=404)
+    return None
+
+
+def _get_requested_variant(request):
+    """
+    Obtém a variante de resolução pedida pelo cliente (por nome ou pela largura desejada)
+
+    Returns:
+        tuple: (variante, resposta de erro ou None)
+    """
+    variant = request.GET.get('variant')
+    width = request.GET.get('width')
+
+    if variant:
+        if variant not in pdf_converter.VARIANTS:
+            options = ', '.join(pdf_converter.VARIANTS)
+            return None, JsonResponse({'error': f'Variante inválida. Opções: {options}'}, status=400)
+        return variant, None
+
+    if width:
+        try:
+            return pdf_converter.get_nearest_variant(int(width)), None
+        except ValueError:
+            return None, JsonResponse({'error': 'O parâmetro width deve ser um número inteiro'}, status=400)
+
+    return pdf_converter.DEFAULT_VARIANT, None
+
+
+def _get_requested_format(request):
+    """
+    Obtém o formato da imagem: o parâmetro format ou, na falta dele, o melhor
+    formato aceito pelo cliente segundo o cabeçalho Accept (AVIF, WebP ou JPEG)
+
+    Returns:
+        tuple: (formato, resposta de erro ou None)
+    """
+    format = request.GET.get('format')
+    if not format:
+        return image_codecs.negotiate_format(request.META.get('HTTP_ACCEPT'), pdf_converter.OUTPUT_FORMAT), None
+
+    format = format.upper()
+    if format not in image_codecs.SUPPORTED_FORMATS:
+        options = ', '.join(image_codecs.SUPPORTED_FORMATS)
+        return None, JsonResponse({'error': f'Formato inválido. Opções: {options}'}, status=400)
+    return format, None
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def pdf_page_image(request):
+    """
+    Retorna a imagem de uma página de um PDF como arquivo binário, para uso direto em <img>.
+
+    O formato é escolhido pelo cabeçalho Accept enviado pelo navegador (AVIF, WebP ou JPEG)
+    e a resposta inclui Vary: Accept, ETag e Last-Modified.
+
+    Parâmetros da query:
+    - pdf_path: Caminho relativo do arquivo PDF no storage
+    - page_number: Número da página (começando em 1)
+    - variant / width: Variante de resolução ou largura desejada (opcional, padrão: desktop)
+    - format: Força um formato específico (opcional)
+    """
+    logger = logging.getLogger(__name__)
+
+    pdf_path = request.GET.get('pdf_path')
+    if not pdf_path:
+        return JsonResponse({'error': 'O parâmetro pdf_path é obrigatório'}, status=400)
+
+    try:
+        page_number = int(request.GET.get('page_number', ''))
+    except ValueError:
+        return JsonResponse({'error': 'O número da página deve ser um número inteiro'}, status=400)
+
+    if page_number < 1:
+        return JsonResponse({'error': 'O número da página deve ser maior que zero'}, status=400)
+
+    variant, error = _get_requested_variant(request)
+    if error:
+        return error
+
+    format, error = _get_requested_format(request)
+    if error:
+        return error
+
+    error = _check_page_range(pdf_path, page_number)
+    if error:
+        return error
+
+    try:
+        image_path = pdf_converter.convert_pdf_page_to_variant(pdf_path, page_number, variant, format)
+    except FileNotFoundError as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    except Exception as e:
+        logger.exception(f"Erro ao converter página {page_number} do PDF {pdf_path}: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+    # Adiantar a conversão das próximas páginas do capítulo
+    prerender.schedule_readahead(pdf_path, page_number, variant, format)
+
+    response = send_file(
+        request,
+        os.path.join(settings.MEDIA_ROOT, image_path),
+        content_type=image_codecs.CONTENT_TYPES[format]
+    )
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def convert_pdf_pages(request):
+    """
+    Converte um intervalo de páginas de um PDF em imagens com uma única execução do Poppler.
+
+    Parâmetros da query:
+    - pdf_path: Caminho relativo do arquivo PDF no storage
+    - first_page: Primeira página do intervalo (opcional, padrão: 1)
+    - last_page: Última página do intervalo (opcional, padrão: PDF_BATCH_MAX_PAGES páginas a partir de
+      first_page, sem passar da última página do PDF)
+    - variant: Variante de resolução (opcional: thumb, mobile, desktop, retina; padrão: desktop)
+    - width: Largura desejada em pixels (opcional, usa a variante mais próxima)
+    - format: Formato de saída da imagem (opcional: JPEG, PNG, WEBP, AVIF; padrão: escolhido pelo cabeçalho Accept)
+    - use_cache: Se True, não reconverte páginas já em cache (opcional, padrão: True)
+
+    Retorna:
+    - Um objeto JSON com a lista de páginas convertidas e suas URLs
+    - HTTP 400 se o intervalo tem mais de PDF_BATCH_MAX_PAGES páginas
+    - HTTP 404 se o intervalo passa do fim do PDF
+    """
+    logger = logging.getLogger(__name__)
+
+    pdf_path = request.GET.get('pdf_path')
+    first_page = request.GET.get('first_page', 1)
+    last_page = request.GET.get('last_page')
+    use_cache = request.GET.get('use_cache', 'true').lower() == 'true'
+
+    if not pdf_path:
+        return JsonResponse({'error': 'O parâmetro pdf_path é obrigatório'}, status=400)
+
+    try:
+        first_page = int(first_page)
+        last_page = int(last_page) if last_page else None
+    except ValueError:
+        return JsonResponse({'error': 'Os números de página devem ser números inteiros'}, status=400)
+
+    if first_page < 1 or (last_page is not None and last_page < first_page):
+        return JsonResponse({'error': 'Intervalo de páginas inválido'}, status=400)
+
+    # Limitar o número de páginas rasterizadas por requisição
+    max_pages = getattr(settings, 'PDF_BATCH_MAX_PAGES', 20)
+    if last_page is None:
+        last_page = first_page + max_pages - 1
+        try:
+            last_page = max(min(last_page, prerender.get_page_count(pdf_path)), first_page)
+        except ValueError:
+            pass
+    elif last_page - first_page + 1 > max_pages:
+        return JsonResponse(
+            {'error': f'Intervalo de páginas muito grande: no máximo {max_pages} páginas por requisição'},
+            status=400
+        )
+
+    variant, error = _get_requested_variant(request)
+    if error:
+        return error
+
+    format, error = _get_requested_format(request)
+    if error:
+        return error
+
+    error = _check_page_range(pdf_path, last_page)
+    if error:
+        return error
+
+    try:
+        image_paths = pdf_converter.convert_pdf_pages_to_images(
+            pdf_path=pdf_path,
+            first_page=first_page,
+            last_page=last_page,
+            format=format,
+            use_cache=use_cache,
+            variant=variant
+        )
+
+        pages = [
+            {
+                'page_number': page_number,
+                'image_path': image_path,
+                'image_url': request.build_absolute_uri(settings.MEDIA_URL + image_path)
+            }
+            for page_number, image_path in image_paths.items()
+        ]
+
+        response = JsonResponse({
+            'success': True,
+            'pdf_path': pdf_path,
+            'variant': variant,
+            'format': format,
+            'pages': pages
+        })
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    except FileNotFoundError as e:
+        logger.error(f"Arquivo PDF não encontrado: {pdf_path}")
+        return JsonResponse({'error': str(e)}, status=404)
+
+    except Exception as e:
+        logger.exception(f"Erro ao converter páginas do PDF {pdf_path}: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_pdf_info(request):
@@ -566,7 +883,9 @@ def get_pdf_info(request):
     Retorna:
     - Um objeto JSON com informações sobre o PDF
     """
-    import PyPDF2
+    from core.services.pdf_index_service import pdf_index_service
+
+    logger = logging.getLogger(__name__)
 
     # Obter parâmetros da query
     pdf_path = request.GET.get('pdf_path')
@@ -586,18 +905,17 @@ def get_pdf_info(request):
         if not os.path.exists(full_path):
             return JsonResponse({'error': f'Arquivo PDF não encontrado: {pdf_path}'}, status=404)
 
-        # Abrir o arquivo PDF
-        with open(full_path, 'rb') as f:
-            pdf = PyPDF2.PdfReader(f)
+        # Consultar o índice de metadados (o PDF só é aberto se ainda não estiver indexado)
+        info = pdf_index_service.get_info(full_path)
+        if not info:
+            return JsonResponse({'error': f'Não foi possível ler o PDF: {pdf_path}'}, status=500)
 
-            # Obter informações do PDF
-            num_pages = len(pdf.pages)
-
-            return JsonResponse({
-                'success': True,
-                'num_pages': num_pages,
-                'pdf_path': pdf_path
-            })
+        return JsonResponse({
+            'success': True,
+            'num_pages': info['total_pages'],
+            'page_sizes': info['page_sizes'],
+            'pdf_path': pdf_path
+        })
 
     except Exception as e:
         logger.exception(f"Erro ao obter informações do PDF {pdf_path}: {str(e)}")
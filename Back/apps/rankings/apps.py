@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class RankingsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.rankings'
+    verbose_name = 'Rankings'
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(max_length=20, verbose_name='Tipo de conteúdo')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID do objeto')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Visualizações')),
+                ('trending', models.FloatField(default=0, verbose_name='Pontuação de tendência')),
+                ('updated_at', models.DateTimeField(verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Estado de ranking',
+                'verbose_name_plural': 'Estados de ranking',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RankingEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(max_length=20, verbose_name='Tipo de conteúdo')),
+                ('kind', models.CharField(max_length=20, verbose_name='Ranking')),
+                ('category', models.CharField(blank=True, default='', max_length=100, verbose_name='Categoria')),
+                ('position', models.PositiveIntegerField(verbose_name='Posição')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID do objeto')),
+                ('score', models.FloatField(verbose_name='Pontuação')),
+            ],
+            options={
+                'verbose_name': 'Item de ranking',
+                'verbose_name_plural': 'Itens de ranking',
+                'ordering': ['content_type', 'kind', 'category', 'position'],
+                'unique_together': {('content_type', 'kind', 'category', 'position')},
+            },
+        ),
+    ]
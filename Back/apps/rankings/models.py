@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class RankingEntry(models.Model):
+    """
+    Item de um ranking pré-calculado de popularidade ou tendência
+    (gerado pelo comando refresh_rankings, ver core.services.rankings)
+    """
+    content_type = models.CharField(max_length=20, verbose_name='Tipo de conteúdo')
+    kind = models.CharField(max_length=20, verbose_name='Ranking')
+    # Categoria ou gênero normalizado (vazio no ranking geral)
+    category = models.CharField(max_length=100, blank=True, default='', verbose_name='Categoria')
+    position = models.PositiveIntegerField(verbose_name='Posição')
+    object_id = models.PositiveIntegerField(verbose_name='ID do objeto')
+    score = models.FloatField(verbose_name='Pontuação')
+
+    class Meta:
+        verbose_name = 'Item de ranking'
+        verbose_name_plural = 'Itens de ranking'
+        unique_together = ('content_type', 'kind', 'category', 'position')
+        ordering = ['content_type', 'kind', 'category', 'position']
+
+    def __str__(self):
+        return f"{self.content_type} {self.kind} {self.category or 'geral'} #{self.position}: {self.object_id}"
+
+
+class RankingState(models.Model):
+    """
+    Visualizações e pontuação de tendência de um item na última atualização dos rankings
+    """
+    content_type = models.CharField(max_length=20, verbose_name='Tipo de conteúdo')
+    object_id = models.PositiveIntegerField(verbose_name='ID do objeto')
+    views = models.PositiveIntegerField(default=0, verbose_name='Visualizações')
+    trending = models.FloatField(default=0, verbose_name='Pontuação de tendência')
+    updated_at = models.DateTimeField(verbose_name='Atualizado em')
+
+    class Meta:
+        verbose_name = 'Estado de ranking'
+        verbose_name_plural = 'Estados de ranking'
+        unique_together = ('content_type', 'object_id')
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id}: {self.views} visualizações"
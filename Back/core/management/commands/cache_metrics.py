@@ -0,0 +1,55 @@
+"""
+Comando para consultar as métricas de uso dos caches
+"""
+
+from django.core.management.base import BaseCommand
+from core.services.cache_metrics import cache_metrics
+from core.services.media_cache import media_cache  # noqa: F401 (registra o tamanho do cache de mídia)
+from .media_cache import format_size
+
+
+class Command(BaseCommand):
+    help = 'Mostra acertos, falhas, gravações, remoções, bytes e tempo de geração de cada cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=['table', 'prometheus'],
+            default='table',
+            help='table: tabela legível; prometheus: formato de texto do Prometheus'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Zera os contadores depois de exibi-los'
+        )
+
+    def handle(self, *args, **options):
+        if options['format'] == 'prometheus':
+            self.stdout.write(cache_metrics.render_prometheus(), ending='')
+        else:
+            self._show_table()
+
+        if options['reset']:
+            cache_metrics.reset()
+            self.stdout.write(self.style.SUCCESS('Contadores zerados'))
+
+    def _show_table(self):
+        snapshot = cache_metrics.get_snapshot()
+        if not snapshot:
+            self.stdout.write('Nenhuma métrica registrada')
+            return
+
+        self.stdout.write(
+            f"{'cache':<16}{'acertos':>10}{'falhas':>10}{'taxa':>8}{'gravações':>11}"
+            f"{'remoções':>10}{'geração':>10}{'gravado':>11}{'em uso':>11}"
+        )
+        for name, stats in snapshot.items():
+            in_use = format_size(stats['bytes']) if stats['bytes'] is not None else '-'
+            if stats['bytes'] is not None and stats['max_bytes']:
+                in_use = f"{in_use} / {format_size(stats['max_bytes'])}"
+            self.stdout.write(
+                f"{name:<16}{stats['hits']:>10}{stats['misses']:>10}{stats['hit_ratio']:>8.1%}"
+                f"{stats['fills']:>11}{stats['evictions']:>10}{stats['fill_seconds_avg'] * 1000:>8.1f}ms"
+                f"{format_size(stats['fill_bytes']):>11}  {in_use}"
+            )
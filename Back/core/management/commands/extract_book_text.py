@@ -0,0 +1,40 @@
+"""
+Comando para extrair o texto das páginas dos PDFs dos livros já cadastrados
+"""
+
+from django.core.management.base import BaseCommand
+from core.services.book_service import book_service
+
+
+class Command(BaseCommand):
+    help = 'Extrai e grava o texto das páginas dos PDFs dos livros (apenas os desatualizados, salvo com --force)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'slugs',
+            nargs='*',
+            help='Slugs dos livros (padrão: todos)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Extrai novamente mesmo que o texto esteja atualizado'
+        )
+
+    def handle(self, *args, **options):
+        from apps.books.models import Book
+
+        books = Book.objects.exclude(pdf_file='')
+        if options['slugs']:
+            books = books.filter(slug__in=options['slugs'])
+
+        total_books = 0
+        total_pages = 0
+        for book in books.iterator():
+            pages = book_service.extract_page_texts(book, force=options['force'])
+            if pages:
+                total_books += 1
+                total_pages += pages
+                self.stdout.write(f"{book.title}: {pages} páginas")
+
+        self.stdout.write(self.style.SUCCESS(f"{total_books} livros extraídos ({total_pages} páginas)"))
@@ -0,0 +1,108 @@
+"""
+Comando para consultar e limitar o cache de mídia (páginas de PDF, texto e metadados de áudio)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from core.services.media_cache import media_cache
+
+
+def format_size(size):
+    """Formata um tamanho em bytes para exibição."""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class Command(BaseCommand):
+    help = 'Mostra o uso do cache de mídia por mangá ou livro e remove arquivos para respeitar o limite'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            choices=['usage', 'trim', 'rebuild'],
+            help='usage: uso por mangá/livro; trim: aplica o limite de tamanho; rebuild: reindexa o diretório'
+        )
+        parser.add_argument(
+            '--max-bytes',
+            type=int,
+            help='Limite a aplicar no trim (padrão: MEDIA_CACHE_MAX_BYTES)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Número máximo de linhas exibidas no uso'
+        )
+
+    def handle(self, *args, **options):
+        action = options['action']
+
+        if action == 'rebuild':
+            total = media_cache.disk.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"{total} arquivos indexados em {media_cache.disk.directory}"))
+            return
+
+        if action == 'trim':
+            max_bytes = options['max_bytes'] if options['max_bytes'] is not None else media_cache.disk.max_bytes
+            if not max_bytes:
+                raise CommandError('Nenhum limite configurado. Defina MEDIA_CACHE_MAX_BYTES ou use --max-bytes.')
+
+            removed_files, removed_bytes = media_cache.disk.trim(max_bytes)
+            self.stdout.write(self.style.SUCCESS(
+                f"{removed_files} arquivos removidos ({format_size(removed_bytes)}). "
+                f"Uso atual: {format_size(media_cache.disk.get_total_size())}"
+            ))
+            return
+
+        self._show_usage(options['limit'])
+
+    def _show_usage(self, limit):
+        usage = media_cache.disk.get_usage_by_owner()
+        titles = self._get_titles([owner for owner, files, size in usage if owner])
+
+        # Agrupar os arquivos de origem pelo mangá ou livro a que pertencem
+        groups = {}
+        for owner, files, size in usage:
+            title = titles.get(owner, f"(sem vínculo) {owner or 'desconhecido'}")
+            group_files, group_size = groups.get(title, (0, 0))
+            groups[title] = (group_files + files, group_size + size)
+
+        total = sum(size for files, size in groups.values())
+        budget = format_size(media_cache.disk.max_bytes) if media_cache.disk.max_bytes else 'sem limite'
+        self.stdout.write(f"Cache: {media_cache.disk.directory}")
+        self.stdout.write(f"Uso total: {format_size(total)} de {budget}")
+        self.stdout.write('')
+
+        rows = sorted(groups.items(), key=lambda item: item[1][1], reverse=True)
+        for title, (files, size) in rows[:limit]:
+            self.stdout.write(f"{format_size(size):>10}  {files:>6} arquivos  {title}")
+
+    def _get_titles(self, owners):
+        """
+        Relaciona os PDFs e áudios de origem aos mangás e livros
+        """
+        from apps.books.models import Book
+        from apps.mangas.models import Chapter
+
+        titles = {}
+
+        chapters = Chapter.objects.filter(
+            Q(pdf_file__in=owners) | Q(pdf_file_path__in=owners)
+        ).select_related('manga')
+        for chapter in chapters:
+            title = f"Mangá: {chapter.manga.title}"
+            if chapter.pdf_file:
+                titles[chapter.pdf_file.name] = title
+            if chapter.pdf_file_path:
+                titles[chapter.pdf_file_path.lstrip('/')] = title
+
+        for book in Book.objects.filter(Q(pdf_file__in=owners) | Q(audio_file__in=owners)):
+            if book.pdf_file:
+                titles[book.pdf_file.name] = f"Livro: {book.title}"
+            if book.audio_file:
+                titles[book.audio_file.name] = f"Livro: {book.title}"
+
+        return titles
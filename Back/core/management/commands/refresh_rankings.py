@@ -0,0 +1,23 @@
+"""
+Comando para recalcular os rankings de popularidade e tendência
+"""
+
+from django.core.management.base import BaseCommand
+from core.services.rankings import rankings, CONTENT_TYPES
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os rankings de popularidade e tendência (ex.: pelo cron, a cada 10 minutos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            choices=list(CONTENT_TYPES),
+            help='Tipo de conteúdo (padrão: todos)'
+        )
+
+    def handle(self, *args, **options):
+        content_types = [options['type']] if options['type'] else list(CONTENT_TYPES)
+        for content_type in content_types:
+            count = rankings.refresh(content_type)
+            self.stdout.write(self.style.SUCCESS(f"Rankings de {content_type} atualizados ({count} itens)"))
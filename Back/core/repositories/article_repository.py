@@ -4,9 +4,11 @@ Implementa o padrão de repositório para encapsular a lógica de acesso a dados
 """
 
 from typing import List, Optional
-from django.db.models import QuerySet, F, Count
+from django.db.models import QuerySet, Count
 from apps.articles.models import Article, Comment
 from core.repositories.base_repository import BaseRepository
+from core.services.rankings import rankings
+from core.services.view_counter import view_counter
 
 class ArticleRepository(BaseRepository):
     """
@@ -26,9 +28,16 @@ class ArticleRepository(BaseRepository):
 
     def get_popular(self) -> QuerySet:
         """
-        Obtém artigos populares
+        Obtém artigos populares (ranking pré-calculado pelo comando refresh_rankings, com até
+        RANKINGS_SIZE artigos)
         """
-        return self.model_class.objects.order_by('-views_count')
+        return rankings.get_queryset('article', 'popular', queryset=self.model_class.objects.all())
+
+    def get_trending(self) -> QuerySet:
+        """
+        Obtém artigos em tendência (visualizações recentes, com decaimento no tempo)
+        """
+        return rankings.get_queryset('article', 'trending', queryset=self.model_class.objects.all())
 
     def get_recent(self) -> QuerySet:
         """
@@ -50,11 +59,12 @@ class ArticleRepository(BaseRepository):
         """
         return self.model_class.objects.filter(author_id=author_id)
 
-    def increment_views(self, article_id: int) -> None:
+    def increment_views(self, article_id: int, visitor: Optional[str] = None) -> bool:
         """
         Incrementa o contador de visualizações de um artigo
+        O incremento é acumulado e gravado em lote pelo view_counter, sem um UPDATE por visualização
         """
-        self.model_class.objects.filter(pk=article_id).update(views_count=F('views_count') + 1)
+        return view_counter.record(self.model_class, article_id, visitor)
 
     def get_favorites_by_user(self, user_id: str) -> QuerySet:
         """
@@ -6,6 +6,7 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from apps.articles.models import Article, Comment, Tag
 from core.repositories.article_repository import article_repository, comment_repository
+from core.services.view_counter import view_counter
 
 User = get_user_model()
 
@@ -151,6 +152,7 @@ class ArticleRepositoryTestCase(TestCase):
 
         # Incrementar visualizações
         article_repository.increment_views(self.article1.id)
+        view_counter.flush()
 
         # Verificar se a contagem de visualizações foi incrementada
         article = Article.objects.get(id=self.article1.id)
@@ -158,6 +160,7 @@ class ArticleRepositoryTestCase(TestCase):
 
         # Incrementar novamente
         article_repository.increment_views(self.article1.id)
+        view_counter.flush()
 
         # Verificar se a contagem de visualizações foi incrementada novamente
         article = Article.objects.get(id=self.article1.id)
@@ -34,6 +34,12 @@ class ArticleService(BaseService):
         """
         return self.repository.get_popular()
 
+    def get_trending_articles(self) -> QuerySet:
+        """
+        Obtém artigos em tendência
+        """
+        return self.repository.get_trending()
+
     def get_recent_articles(self) -> QuerySet:
         """
         Obtém artigos recentes
@@ -52,11 +58,12 @@ class ArticleService(BaseService):
         """
         return self.repository.get_by_author(author_id)
 
-    def view_article(self, article_id: int) -> None:
+    def view_article(self, article_id: int, visitor: Optional[str] = None) -> bool:
         """
         Registra uma visualização de artigo
+        Retorna False se a visualização do visitante já foi contada recentemente
         """
-        self.repository.increment_views(article_id)
+        return self.repository.increment_views(article_id, visitor)
 
     def get_favorite_articles(self, user_id: str) -> QuerySet:
         """
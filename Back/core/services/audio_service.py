@@ -9,7 +9,7 @@ from django.http import FileResponse
 from django.conf import settings
 import json
 import hashlib
-from django.core.cache import cache
+from .media_cache import media_cache
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -36,7 +36,7 @@ class AudioService:
         """
         Inicializa o serviço de áudio
         """
-        # Garantir que o diretório de cache existe
+        # Diretório dos marcadores criados pelos usuários (dados, não cache)
         self.cache_dir = settings.AUDIO_CACHE_DIR
         os.makedirs(self.cache_dir, exist_ok=True)
         
@@ -68,75 +68,71 @@ class AudioService:
             dict: Informações sobre o áudio (duração, taxa de bits, etc.)
         """
         try:
-            # Verificar se as informações já estão em cache
-            cache_key = self._get_cache_key(audio_path, 'info')
-            cached_info = cache.get(cache_key)
-            
-            if cached_info:
-                return cached_info
-            
-            # Se não estiver em cache, extrair as informações
-            ext = os.path.splitext(audio_path)[1].lower()
-            
-            # Obter o tipo MIME
-            mime_type = self.mime_types.get(ext, 'application/octet-stream')
-            
-            # Obter o tamanho do arquivo
-            file_size = os.path.getsize(audio_path)
-            
-            # Obter metadados usando Mutagen
-            metadata = {}
-            duration = 0
-            bitrate = 0
-            sample_rate = 0
-            channels = 0
-            
-            if MUTAGEN_AVAILABLE and ext in self.mutagen_classes:
-                try:
-                    audio = self.mutagen_classes[ext](audio_path)
-                    
-                    # Obter duração
-                    if hasattr(audio, 'info') and hasattr(audio.info, 'length'):
-                        duration = audio.info.length
-                    
-                    # Obter taxa de bits
-                    bitrate = getattr(audio.info, 'bitrate', 0)
-                    
-                    # Obter taxa de amostragem
-                    sample_rate = getattr(audio.info, 'sample_rate', 0)
-                    
-                    # Obter canais
-                    channels = getattr(audio.info, 'channels', 0)
-                    
-                    # Obter metadados
-                    for key in audio:
-                        if isinstance(audio[key], list):
-                            metadata[key] = audio[key][0]
-                        else:
-                            metadata[key] = str(audio[key])
-                except Exception as e:
-                    logger.error(f"Erro ao extrair metadados do áudio: {str(e)}")
-            
-            # Criar objeto de informações
-            info = {
-                'mime_type': mime_type,
-                'file_size': file_size,
-                'duration': duration,
-                'bitrate': bitrate,
-                'sample_rate': sample_rate,
-                'channels': channels,
-                'metadata': metadata,
-                'file_name': os.path.basename(audio_path)
-            }
-            
-            # Armazenar em cache
-            cache.set(cache_key, info, timeout=3600)  # Cache por 1 hora
-            
-            return info
+            # As informações ficam no cache de mídia enquanto o arquivo não mudar
+            return media_cache.get_json(audio_path, 'audio_info.json', lambda: self._read_audio_info(audio_path))
         except Exception as e:
             logger.error(f"Erro ao obter informações do áudio: {str(e)}")
             return None
-    
+
+    def _read_audio_info(self, audio_path):
+        """
+        Extrai as informações de um arquivo de áudio com o Mutagen
+        """
+        ext = os.path.splitext(audio_path)[1].lower()
+        
+        # Obter o tipo MIME
+        mime_type = self.mime_types.get(ext, 'application/octet-stream')
+        
+        # Obter o tamanho do arquivo
+        file_size = os.path.getsize(audio_path)
+        
+        # Obter metadados usando Mutagen
+        metadata = {}
+        duration = 0
+        bitrate = 0
+        sample_rate = 0
+        channels = 0
+        
+        if MUTAGEN_AVAILABLE and ext in self.mutagen_classes:
+            try:
+                audio = self.mutagen_classes[ext](audio_path)
+                
+                # Obter duração
+                if hasattr(audio, 'info') and hasattr(audio.info, 'length'):
+                    duration = audio.info.length
+                
+                # Obter taxa de bits
+                bitrate = getattr(audio.info, 'bitrate', 0)
+                
+                # Obter taxa de amostragem
+                sample_rate = getattr(audio.info, 'sample_rate', 0)
+                
+                # Obter canais
+                channels = getattr(audio.info, 'channels', 0)
+                
+                # Obter metadados
+                for key in audio:
+                    if isinstance(audio[key], list):
+                        metadata[key] = str(audio[key][0])
+                    else:
+                        metadata[key] = str(audio[key])
+            except Exception as e:
+                logger.error(f"Erro ao extrair metadados do áudio: {str(e)}")
+        
+        # Criar objeto de informações
+        info = {
+            'mime_type': mime_type,
+            'file_size': file_size,
+            'duration': duration,
+            'bitrate': bitrate,
+            'sample_rate': sample_rate,
+            'channels': channels,
+            'metadata': metadata,
+            'file_name': os.path.basename(audio_path)
+        }
+        
+        return info
+
     def stream_audio(self, audio_path, range_header=None, speed=1.0):
         """
         Transmite um arquivo de áudio com suporte a streaming parcial
@@ -257,23 +253,6 @@ class AudioService:
         except Exception as e:
             logger.error(f"Erro ao obter marcadores de áudio: {str(e)}")
             return []
-    
-    def _get_cache_key(self, audio_path, suffix):
-        """
-        Gera uma chave de cache para um arquivo de áudio
-        
-        Args:
-            audio_path (str): Caminho para o arquivo de áudio
-            suffix (str): Sufixo para a chave
-            
-        Returns:
-            str: Chave de cache
-        """
-        # Usar o hash MD5 do caminho do arquivo + data de modificação para a chave
-        file_hash = hashlib.md5(audio_path.encode()).hexdigest()
-        mtime = os.path.getmtime(audio_path)
-        
-        return f"audio_{file_hash}_{mtime}_{suffix}"
 
 # Instância singleton do serviço
 audio_service = AudioService()
@@ -3,8 +3,10 @@ Extensão do serviço de áudio com suporte a carregamento assíncrono
 """
 
 import os
+import time
 import logging
 from django.core.cache import cache
+from core.services.cache_metrics import cache_metrics
 from core.services.audio_service import AudioService, MUTAGEN_AVAILABLE
 from core.services.async_loader import async_loader
 
@@ -117,6 +119,7 @@ class AsyncAudioService(AudioService):
             num_chunks = (file_size + chunk_size - 1) // chunk_size
             
             # Ler o primeiro chunk
+            start_time = time.time()
             with open(audio_path, 'rb') as f:
                 first_chunk = f.read(chunk_size)
             
@@ -125,6 +128,7 @@ class AsyncAudioService(AudioService):
             
             # Armazenar o chunk em cache
             cache.set(cache_key, first_chunk, timeout=3600)  # Cache por 1 hora
+            cache_metrics.record_fill('audio_chunks', time.time() - start_time, len(first_chunk))
             
             return {
                 'file_size': file_size,
@@ -160,8 +164,12 @@ class AsyncAudioService(AudioService):
             # Verificar se o chunk já está em cache
             cached_chunk = cache.get(cache_key)
             if cached_chunk:
+                cache_metrics.record_hit('audio_chunks')
                 return cached_chunk
             
+            cache_metrics.record_miss('audio_chunks')
+            start_time = time.time()
+            
             # Obter o tamanho do arquivo
             file_size = os.path.getsize(audio_path)
             
@@ -185,6 +193,7 @@ class AsyncAudioService(AudioService):
             
             # Armazenar o chunk em cache
             cache.set(cache_key, chunk, timeout=3600)  # Cache por 1 hora
+            cache_metrics.record_fill('audio_chunks', time.time() - start_time, len(chunk))
             
             return chunk
         except Exception as e:
@@ -0,0 +1,171 @@
+"""
+Busca textual no conteúdo dos PDFs dos livros.
+
+A busca consulta o texto das páginas extraído após o upload (BookPageText). No SQLite
+usa a tabela FTS5 books_bookpagetext_fts, ordenada por BM25; no PostgreSQL, o índice
+GIN sobre to_tsvector('portuguese', text), ordenado por ts_rank. Os dois índices são
+atualizados junto com o texto das páginas, de modo que um PDF substituído passa a ser
+encontrado assim que a nova extração termina. Nos demais bancos é feita uma varredura
+simples, adequada apenas para catálogos pequenos.
+
+O trecho de cada resultado é HTML seguro: o texto extraído do PDF é escapado e apenas
+os destaques <mark> são inseridos. Os bancos marcam os termos com caracteres de
+controle (sentinelas), substituídos pelas tags depois do escape.
+"""
+
+import re
+import html
+import logging
+from django.db import connection
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Configuração de idioma do PostgreSQL (deve ser a mesma do índice criado na migração)
+SEARCH_CONFIG = 'portuguese'
+
+# Marcadores do trecho destacado
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Sentinelas usadas pelos bancos no lugar dos marcadores, antes do escape do texto
+SENTINEL_START = '\x02'
+SENTINEL_END = '\x03'
+
+# Número de palavras do trecho retornado com cada resultado
+SNIPPET_WORDS = 24
+
+MAX_LIMIT = 100
+
+
+class BookSearchService:
+    """
+    Serviço de busca no texto das páginas dos livros
+    """
+
+    def search(self, query, limit=20, offset=0, book=None):
+        """
+        Busca as páginas que contêm os termos da consulta
+
+        Args:
+            query (str): Termos da busca (todos devem estar presentes na página)
+            limit (int): Número máximo de resultados
+            offset (int): Número de resultados a pular
+            book: Livro para restringir a busca (opcional)
+
+        Returns:
+            list: Resultados ordenados por relevância, com book_slug, book_title,
+                  page_number, snippet e rank
+        """
+        terms = self._get_terms(query)
+        if not terms:
+            return []
+
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        offset = max(0, int(offset))
+        book_id = book.pk if book is not None else None
+
+        if connection.vendor == 'sqlite':
+            rows = self._search_sqlite(terms, limit, offset, book_id)
+        elif connection.vendor == 'postgresql':
+            rows = self._search_postgresql(query, limit, offset, book_id)
+        else:
+            rows = self._search_fallback(terms, limit, offset, book_id)
+
+        return [
+            {
+                'book_slug': slug,
+                'book_title': title,
+                'page_number': page_number,
+                'snippet': self._highlight(snippet),
+                'rank': rank,
+            }
+            for slug, title, page_number, snippet, rank in rows
+        ]
+
+    def _highlight(self, snippet):
+        """Escapa o trecho e troca as sentinelas pelos marcadores de destaque."""
+        return html.escape(snippet or '').replace(SENTINEL_START, HIGHLIGHT_START).replace(SENTINEL_END, HIGHLIGHT_END)
+
+    def _get_terms(self, query):
+        """Separa a consulta em palavras, descartando a sintaxe de operadores."""
+        return re.findall(r'\w+', query or '')
+
+    def _search_sqlite(self, terms, limit, offset, book_id):
+        # Cada termo entre aspas é tratado como palavra literal pelo FTS5
+        match = ' '.join(f'"{term}"' for term in terms)
+        sql = f"""
+            SELECT b.slug, b.title, p.page_number,
+                   snippet(books_bookpagetext_fts, 0, %s, %s, '…', %s),
+                   -bm25(books_bookpagetext_fts)
+            FROM books_bookpagetext_fts
+            JOIN books_bookpagetext p ON p.id = books_bookpagetext_fts.rowid
+            JOIN books_book b ON b.id = p.book_id
+            WHERE books_bookpagetext_fts MATCH %s {'AND p.book_id = %s' if book_id else ''}
+            ORDER BY bm25(books_bookpagetext_fts)
+            LIMIT %s OFFSET %s
+        """
+        params = [SENTINEL_START, SENTINEL_END, SNIPPET_WORDS, match]
+        if book_id:
+            params.append(book_id)
+        params += [limit, offset]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _search_postgresql(self, query, limit, offset, book_id):
+        # A expressão to_tsvector deve ser idêntica à do índice para que ele seja usado
+        sql = f"""
+            SELECT b.slug, b.title, p.page_number,
+                   ts_headline(%s, p.text, q.query, %s),
+                   ts_rank(to_tsvector('{SEARCH_CONFIG}', p.text), q.query)
+            FROM books_bookpagetext p
+            JOIN books_book b ON b.id = p.book_id,
+                 websearch_to_tsquery(%s, %s) AS q(query)
+            WHERE to_tsvector('{SEARCH_CONFIG}', p.text) @@ q.query {'AND p.book_id = %s' if book_id else ''}
+            ORDER BY 5 DESC
+            LIMIT %s OFFSET %s
+        """
+        options = f"StartSel={SENTINEL_START}, StopSel={SENTINEL_END}, MaxWords={SNIPPET_WORDS}, MinWords=8"
+        params = [SEARCH_CONFIG, options, SEARCH_CONFIG, query]
+        if book_id:
+            params.append(book_id)
+        params += [limit, offset]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _search_fallback(self, terms, limit, offset, book_id):
+        from apps.books.models import BookPageText
+
+        queryset = BookPageText.objects.select_related('book')
+        if book_id:
+            queryset = queryset.filter(book_id=book_id)
+        for term in terms:
+            queryset = queryset.filter(text__icontains=term)
+
+        rows = []
+        for page in queryset.order_by('book_id', 'page_number')[offset:offset + limit]:
+            rows.append((page.book.slug, page.book.title, page.page_number, self._make_snippet(page.text, terms), 0))
+        return rows
+
+    def _make_snippet(self, text, terms):
+        """Recorta o trecho ao redor da primeira ocorrência dos termos e os marca com as sentinelas."""
+        words = text.split()
+        lowered_terms = [term.lower() for term in terms]
+
+        start = 0
+        for index, word in enumerate(words):
+            if any(term in word.lower() for term in lowered_terms):
+                start = max(0, index - SNIPPET_WORDS // 2)
+                break
+
+        snippet = ' '.join(words[start:start + SNIPPET_WORDS])
+        pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+        return pattern.sub(lambda match: f"{SENTINEL_START}{match.group(0)}{SENTINEL_END}", snippet)
+
+
+# Instância singleton do serviço
+book_search_service = BookSearchService()
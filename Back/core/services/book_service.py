@@ -3,10 +3,18 @@ Serviço para gerenciar operações com livros
 """
 
 import os
+import hashlib
 import logging
+import threading
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from django.db import transaction, close_old_connections
+from django.urls import reverse
 from core.services.pdf_service import pdf_service
 from core.services.audio_service import audio_service
+from core.services.pdf_reader_pool import pdf_reader_pool
+from core.services.single_flight import single_flight
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -16,10 +24,18 @@ class BookService:
     Serviço para gerenciar operações com livros
     """
 
+    # Workers da extração de texto em segundo plano (cada tarefa percorre o PDF inteiro)
+    TEXT_EXTRACTION_WORKERS = getattr(settings, 'BOOK_TEXT_EXTRACTION_WORKERS', 1)
+
     def __init__(self):
         """
         Inicializa o serviço de livros
         """
+        # Extrações enfileiradas ou em andamento neste processo: {(id do livro, arquivo)}
+        self._extractor = None
+        self._extracting = set()
+        self._extract_lock = threading.Lock()
+
         # Garantir que os diretórios existem
         self.books_dir = os.path.join(settings.MEDIA_ROOT, "books")
         self.covers_dir = os.path.join(settings.MEDIA_ROOT, "covers")
@@ -84,7 +100,7 @@ class BookService:
 
         return info
 
-    def get_book_content(self, book, content_type='pdf', page=1, format='JPEG', dpi=200, quality=85):
+    def get_book_content(self, book, content_type='pdf', page=1, format=None, dpi=200, quality=None):
         """
         Obtém o conteúdo de um livro (PDF ou áudio)
 
@@ -115,19 +131,16 @@ class BookService:
                 return {'error': f'Número de página inválido. O PDF tem {total_pages} páginas.'}
 
             # Obter o texto da página
-            text = pdf_service.get_page_text(book.pdf_file.path, page)
+            text = self.get_page_text(book, page)
             if text is None:
                 return {'error': f'Erro ao extrair texto da página {page}'}
 
-            # Obter a imagem da página
-            img_str = pdf_service.get_page_as_image(book.pdf_file.path, page, format, dpi, quality)
-
             # Retornar as informações
             return {
                 'total_pages': total_pages,
                 'current_page': page,
                 'text': text,
-                'image': f"data:image/{format.lower()};base64,{img_str}" if img_str else None,
+                'image_url': self.get_page_image_url(book, page, format, dpi, quality),
                 'pdf_url': book.pdf_file.url,
                 'metadata': pdf_info.get('metadata', {}),
                 'file_name': pdf_info.get('file_name', '')
@@ -158,5 +171,168 @@ class BookService:
         else:
             return {'error': f'Tipo de conteúdo inválido: {content_type}'}
 
+    def get_page_image_url(self, book, page, format=None, dpi=200, quality=None):
+        """
+        Retorna o URL do endpoint que entrega a imagem de uma página do PDF
+
+        Args:
+            book: Instância do modelo Book
+            page (int): Número da página
+            format (str): Formato da imagem (None para o endpoint escolher pelo cabeçalho Accept)
+            dpi (int): Resolução da imagem em DPI
+            quality (int): Qualidade da imagem (None para a qualidade padrão do formato)
+
+        Returns:
+            str: URL relativo da imagem
+        """
+        url = reverse('book-page-image', kwargs={'slug': book.slug, 'page_number': page})
+        params = {'format': format, 'dpi': dpi, 'quality': quality}
+        return f"{url}?{urlencode({key: value for key, value in params.items() if value is not None})}"
+
+    def get_text_source(self, book):
+        """
+        Identifica o arquivo PDF de um livro pelo nome, tamanho e data de modificação
+
+        Returns:
+            str: Identificador do arquivo ou None se o livro não tiver PDF
+        """
+        if not book.pdf_file:
+            return None
+
+        try:
+            stat = os.stat(book.pdf_file.path)
+        except OSError:
+            return None
+
+        key_data = f"{book.pdf_file.name}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.md5(key_data.encode()).hexdigest()
+
+    def get_page_text(self, book, page):
+        """
+        Obtém o texto de uma página do PDF de um livro a partir do texto já extraído
+
+        Enquanto o livro não tiver sido extraído, o texto é lido do PDF e a extração
+        completa é agendada em segundo plano.
+
+        Args:
+            book: Instância do modelo Book
+            page (int): Número da página (começando em 1)
+
+        Returns:
+            str: Texto da página ou None em caso de erro
+        """
+        from apps.books.models import BookPageText
+
+        source = self.get_text_source(book)
+        if source is None:
+            return None
+
+        text = BookPageText.objects.filter(
+            book=book, page_number=page, source=source
+        ).values_list('text', flat=True).first()
+        if text is not None:
+            return text
+
+        self.schedule_text_extraction(book)
+        return pdf_service.get_page_text(book.pdf_file.path, page)
+
+    def extract_page_texts(self, book, force=False):
+        """
+        Extrai o texto de todas as páginas do PDF de um livro em uma única passagem
+        e grava o resultado no banco de dados
+
+        Args:
+            book: Instância do modelo Book
+            force (bool): Se True, extrai novamente mesmo que o texto esteja atualizado
+
+        Returns:
+            int: Número de páginas extraídas (0 se o texto já estava atualizado ou em caso de erro)
+        """
+        from apps.books.models import BookPageText
+
+        source = self.get_text_source(book)
+        if source is None:
+            logger.error(f"Arquivo PDF não encontrado para o livro {book.pk}")
+            return 0
+
+        if not force and BookPageText.objects.filter(book=book, source=source).exists():
+            return 0
+
+        def extract():
+            pages = []
+            try:
+                with pdf_reader_pool.checkout(book.pdf_file.path) as pdf_reader:
+                    for page_number, page in enumerate(pdf_reader.pages, start=1):
+                        try:
+                            text = page.extract_text() or ''
+                        except Exception as e:
+                            logger.warning(f"Erro ao extrair texto da página {page_number} do livro {book.pk}: {str(e)}")
+                            text = ''
+                        pages.append(BookPageText(book=book, page_number=page_number, text=text, source=source))
+            except Exception as e:
+                logger.error(f"Erro ao extrair o texto do livro {book.pk}: {str(e)}")
+                return 0
+
+            # Substituir o texto anterior de uma só vez
+            with transaction.atomic():
+                BookPageText.objects.filter(book=book).delete()
+                BookPageText.objects.bulk_create(pages, batch_size=500)
+
+            logger.info(f"Texto do livro {book.pk} extraído ({len(pages)} páginas)")
+            return len(pages)
+
+        # Extrações simultâneas do mesmo livro aguardam uma única passagem pelo PDF
+        return single_flight.do(f"book-text:{book.pk}:{source}", extract)
+
+    def schedule_text_extraction(self, book):
+        """
+        Extrai o texto das páginas de um livro em segundo plano
+
+        Um livro cuja extração já está enfileirada ou em andamento neste processo não é
+        enfileirado de novo. O resultado da tarefa fica apenas no Future retornado.
+
+        Args:
+            book: Instância do modelo Book
+
+        Returns:
+            Future: Tarefa enfileirada ou None se nada foi enfileirado
+        """
+        source = self.get_text_source(book)
+        if source is None:
+            return None
+
+        key = (book.pk, source)
+        with self._extract_lock:
+            if key in self._extracting:
+                return None
+            self._extracting.add(key)
+            if self._extractor is None:
+                # Criado no primeiro uso para não iniciar threads na importação
+                self._extractor = ThreadPoolExecutor(
+                    max_workers=self.TEXT_EXTRACTION_WORKERS, thread_name_prefix='book-text'
+                )
+            extractor = self._extractor
+
+        return extractor.submit(self._run_text_extraction, book.pk, key)
+
+    def _run_text_extraction(self, book_id, key):
+        close_old_connections()
+        try:
+            self._extract_page_texts_task(book_id)
+        except Exception as e:
+            logger.error(f"Erro na extração de texto do livro {book_id} em segundo plano: {str(e)}")
+        finally:
+            with self._extract_lock:
+                self._extracting.discard(key)
+            close_old_connections()
+
+    def _extract_page_texts_task(self, book_id):
+        from apps.books.models import Book
+
+        book = Book.objects.filter(pk=book_id).first()
+        if book is None:
+            return 0
+        return self.extract_page_texts(book)
+
 # Instância singleton do serviço
 book_service = BookService()
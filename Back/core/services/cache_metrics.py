@@ -0,0 +1,266 @@
+"""
+Métricas dos caches da aplicação.
+
+Cada cache é identificado por um nome (ex.: 'mangas_list', 'media', 'audio_chunks') e
+tem contadores de acertos, falhas, gravações, remoções, bytes gravados e tempo gasto
+para gerar os valores gravados. Os contadores são acumulados em memória e somados
+periodicamente a um banco SQLite compartilhado, de modo que os números refletem todos
+os workers do servidor e podem ser consultados pelo comando cache_metrics. O tamanho
+atual dos caches em disco é lido do próprio cache no momento da consulta.
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from collections import defaultdict
+from django.conf import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Contadores registrados para cada cache
+COUNTERS = ('hits', 'misses', 'fills', 'evictions', 'fill_bytes', 'fill_seconds', 'fill_timings')
+
+# Descrição das métricas no formato de texto do Prometheus
+PROMETHEUS_COUNTERS = (
+    ('cache_hits_total', 'hits', 'Consultas atendidas pelo cache'),
+    ('cache_misses_total', 'misses', 'Consultas não atendidas pelo cache'),
+    ('cache_fills_total', 'fills', 'Valores gerados e gravados no cache'),
+    ('cache_evictions_total', 'evictions', 'Valores removidos para respeitar o limite de tamanho'),
+    ('cache_fill_bytes_total', 'fill_bytes', 'Bytes gravados no cache'),
+)
+
+
+class CacheMetrics:
+    """
+    Registro dos contadores de uso dos caches
+    """
+
+    # Intervalo mínimo (segundos) entre gravações dos contadores no banco
+    FLUSH_INTERVAL = 10
+
+    def __init__(self, db_path=None):
+        """
+        Inicializa o registro
+
+        Args:
+            db_path (str): Caminho do banco SQLite compartilhado pelos processos
+        """
+        self.db_path = db_path or getattr(
+            settings, 'CACHE_METRICS_DB', os.path.join(settings.BASE_DIR, 'cache', 'internal', 'cache_metrics.sqlite3')
+        )
+
+        self._pending = defaultdict(lambda: defaultdict(float))
+        self._sizes = {}
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record_hit(self, name):
+        """Registra uma consulta atendida pelo cache."""
+        self._add(name, hits=1)
+
+    def record_miss(self, name):
+        """Registra uma consulta não atendida pelo cache."""
+        self._add(name, misses=1)
+
+    def record_fill(self, name, seconds=None, size=None):
+        """
+        Registra um valor gravado no cache
+
+        Args:
+            name (str): Nome do cache
+            seconds (float): Tempo gasto para gerar o valor (opcional)
+            size (int): Tamanho do valor em bytes (opcional)
+        """
+        deltas = {'fills': 1}
+        if seconds is not None:
+            deltas['fill_seconds'] = seconds
+            deltas['fill_timings'] = 1
+        if size:
+            deltas['fill_bytes'] = size
+        self._add(name, **deltas)
+
+    def record_eviction(self, name, count=1):
+        """Registra valores removidos do cache para respeitar o limite de tamanho."""
+        if count:
+            self._add(name, evictions=count)
+
+    def register_size(self, name, get_size):
+        """
+        Registra a função que informa o tamanho atual de um cache
+
+        Args:
+            name (str): Nome do cache
+            get_size (callable): Retorna (bytes em uso, limite em bytes ou None)
+        """
+        self._sizes[name] = get_size
+
+    def get_stats(self, name):
+        """
+        Retorna os contadores de um cache
+
+        Returns:
+            dict: Contadores, taxa de acerto, tempo médio de geração e tamanho (se conhecido)
+        """
+        return self.get_snapshot().get(name) or self._build_stats(name, {})
+
+    def get_snapshot(self):
+        """
+        Retorna os contadores de todos os caches
+
+        Returns:
+            dict: {nome do cache: estatísticas}
+        """
+        self.flush()
+
+        totals = defaultdict(dict)
+        try:
+            for name, metric, value in self._connect().execute("SELECT cache, metric, value FROM metrics"):
+                totals[name][metric] = value
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao ler as métricas de cache {self.db_path}: {str(e)}")
+
+        for name in self._sizes:
+            totals.setdefault(name, {})
+
+        return {name: self._build_stats(name, counters) for name, counters in sorted(totals.items())}
+
+    def flush(self):
+        """
+        Soma ao banco os contadores acumulados em memória
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = defaultdict(lambda: defaultdict(float))
+            self._last_flush = time.time()
+
+        rows = [
+            (name, metric, value)
+            for name, counters in pending.items()
+            for metric, value in counters.items()
+        ]
+        if not rows:
+            return
+
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO metrics (cache, metric, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (cache, metric) DO UPDATE SET value = value + excluded.value",
+                    rows
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao gravar as métricas de cache {self.db_path}: {str(e)}")
+
+    def reset(self, name=None):
+        """
+        Zera os contadores de um cache ou de todos
+        """
+        with self._lock:
+            if name is None:
+                self._pending.clear()
+            else:
+                self._pending.pop(name, None)
+
+        with self._connect() as conn:
+            if name is None:
+                conn.execute("DELETE FROM metrics")
+            else:
+                conn.execute("DELETE FROM metrics WHERE cache = ?", (name,))
+
+    def render_prometheus(self):
+        """
+        Retorna as métricas no formato de texto do Prometheus
+        """
+        snapshot = self.get_snapshot()
+        lines = []
+
+        def add_metric(metric, metric_type, description, samples):
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{metric}{{{labels}}} {_format_value(value)}")
+
+        for metric, key, description in PROMETHEUS_COUNTERS:
+            add_metric(metric, 'counter', description, [
+                (f'cache="{name}"', stats[key]) for name, stats in snapshot.items()
+            ])
+
+        lines.append("# HELP cache_fill_seconds Tempo gasto para gerar os valores gravados no cache")
+        lines.append("# TYPE cache_fill_seconds summary")
+        for name, stats in snapshot.items():
+            lines.append(f'cache_fill_seconds_sum{{cache="{name}"}} {_format_value(stats["fill_seconds"])}')
+            lines.append(f'cache_fill_seconds_count{{cache="{name}"}} {_format_value(stats["fill_timings"])}')
+
+        sized = [(name, stats) for name, stats in snapshot.items() if stats['bytes'] is not None]
+        add_metric('cache_bytes', 'gauge', 'Bytes em uso pelo cache', [
+            (f'cache="{name}"', stats['bytes']) for name, stats in sized
+        ])
+        add_metric('cache_max_bytes', 'gauge', 'Limite de tamanho do cache', [
+            (f'cache="{name}"', stats['max_bytes']) for name, stats in sized if stats['max_bytes']
+        ])
+
+        return '\n'.join(lines) + '\n'
+
+    def _build_stats(self, name, counters):
+        stats = {metric: counters.get(metric, 0) for metric in COUNTERS}
+        for metric in COUNTERS:
+            if metric != 'fill_seconds':
+                stats[metric] = int(stats[metric])
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        stats['fill_seconds_avg'] = stats['fill_seconds'] / stats['fill_timings'] if stats['fill_timings'] else 0.0
+
+        stats['bytes'] = stats['max_bytes'] = None
+        get_size = self._sizes.get(name)
+        if get_size is not None:
+            try:
+                stats['bytes'], stats['max_bytes'] = get_size()
+            except Exception as e:
+                logger.error(f"Erro ao obter o tamanho do cache {name}: {str(e)}")
+        return stats
+
+    def _add(self, name, **deltas):
+        with self._lock:
+            counters = self._pending[name]
+            for metric, value in deltas.items():
+                counters[metric] += value
+            flush = time.time() - self._last_flush >= self.FLUSH_INTERVAL
+
+        if flush:
+            self.flush()
+
+    def _connect(self):
+        """
+        Retorna a conexão SQLite da thread atual, criando o banco se necessário
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS metrics ("
+                "cache TEXT NOT NULL, metric TEXT NOT NULL, value REAL NOT NULL, "
+                "PRIMARY KEY (cache, metric))"
+            )
+            self._local.conn = conn
+        return conn
+
+
+def _format_value(value):
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:.6f}"
+    return str(int(value))
+
+
+# Instância singleton do registro
+cache_metrics = CacheMetrics()
+
+# Gravar os contadores pendentes ao encerrar o processo
+atexit.register(cache_metrics.flush)
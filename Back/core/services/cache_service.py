@@ -3,14 +3,24 @@ Serviço de cache para otimizar o processamento de arquivos
 """
 
 import os
-import hashlib
 import json
 import logging
 from django.conf import settings
 from django.core.cache import cache
+from .file_fingerprint import file_fingerprints
+from .media_cache import media_cache
+from .single_flight import atomic_write
 
 logger = logging.getLogger(__name__)
 
+# Prefixos dos artefatos de cada tipo no cache de mídia: as páginas e o texto dos PDFs
+# ('page...') e os metadados dos áudios ('audio_info.json'), além dos arquivos gravados
+# por este serviço, nomeados pelo tipo ('pdf...', 'audio...')
+MEDIA_ARTIFACT_PREFIXES = {
+    'pdf': ('pdf', 'page'),
+    'audio': ('audio',),
+}
+
 class CacheService:
     """
     Serviço para gerenciar cache de arquivos e dados
@@ -20,55 +30,21 @@ class CacheService:
         """
         Inicializa o serviço de cache
         """
-        self.pdf_cache_dir = getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'pdf_cache'))
-        self.audio_cache_dir = getattr(settings, 'AUDIO_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'audio_cache'))
-        
-        # Criar diretórios de cache se não existirem
-        os.makedirs(self.pdf_cache_dir, exist_ok=True)
-        os.makedirs(self.audio_cache_dir, exist_ok=True)
+        # Os arquivos derivados de PDFs e áudios ficam no cache de mídia
+        self.media_cache = media_cache
     
     def get_file_hash(self, file_path):
         """
-        Calcula o hash MD5 de um arquivo
+        Retorna o hash do conteúdo de um arquivo. O hash é calculado uma única vez
+        por versão do arquivo (caminho, tamanho, data de modificação e inode).
         """
-        if not os.path.exists(file_path):
-            return None
-        
-        try:
-            with open(file_path, 'rb') as f:
-                file_hash = hashlib.md5()
-                # Ler o arquivo em chunks para não sobrecarregar a memória
-                for chunk in iter(lambda: f.read(4096), b''):
-                    file_hash.update(chunk)
-                return file_hash.hexdigest()
-        except Exception as e:
-            logger.error(f"Erro ao calcular hash do arquivo {file_path}: {str(e)}")
-            return None
+        return file_fingerprints.get_hash(file_path)
     
     def get_cache_path(self, file_path, cache_type='pdf', suffix=''):
         """
-        Retorna o caminho para o arquivo de cache
+        Retorna o caminho para o arquivo de cache (no cache de mídia, pela chave do conteúdo)
         """
-        file_hash = self.get_file_hash(file_path)
-        if not file_hash:
-            return None
-        
-        # Determinar o diretório de cache com base no tipo
-        if cache_type == 'pdf':
-            cache_dir = self.pdf_cache_dir
-        elif cache_type == 'audio':
-            cache_dir = self.audio_cache_dir
-        else:
-            cache_dir = os.path.join(settings.MEDIA_ROOT, f'{cache_type}_cache')
-            os.makedirs(cache_dir, exist_ok=True)
-        
-        # Criar subdiretório baseado nos primeiros caracteres do hash para evitar muitos arquivos em um único diretório
-        subdir = os.path.join(cache_dir, file_hash[:2])
-        os.makedirs(subdir, exist_ok=True)
-        
-        # Retornar o caminho completo do arquivo de cache
-        filename = f"{file_hash}{suffix}"
-        return os.path.join(subdir, filename)
+        return self.media_cache.get_path(file_path, f"{cache_type}{suffix}")
     
     def get_cached_data(self, key, default=None, timeout=None):
         """
@@ -86,10 +62,7 @@ class CacheService:
         """
         Verifica se existe um arquivo em cache e retorna seu caminho
         """
-        cache_path = self.get_cache_path(file_path, cache_type, suffix)
-        if cache_path and os.path.exists(cache_path):
-            return cache_path
-        return None
+        return self.media_cache.lookup(file_path, f"{cache_type}{suffix}")
     
     def save_to_cache(self, file_path, data, cache_type='pdf', suffix=''):
         """
@@ -102,17 +75,18 @@ class CacheService:
         try:
             # Se os dados forem um dicionário ou lista, salvar como JSON
             if isinstance(data, (dict, list)):
-                with open(cache_path, 'w', encoding='utf-8') as f:
+                with atomic_write(cache_path, mode='w', encoding='utf-8') as f:
                     json.dump(data, f, ensure_ascii=False, indent=2)
             # Se for bytes, salvar como binário
             elif isinstance(data, bytes):
-                with open(cache_path, 'wb') as f:
+                with atomic_write(cache_path) as f:
                     f.write(data)
             # Caso contrário, salvar como texto
             else:
-                with open(cache_path, 'w', encoding='utf-8') as f:
+                with atomic_write(cache_path, mode='w', encoding='utf-8') as f:
                     f.write(str(data))
             
+            self.media_cache.record_fill(cache_path, file_path)
             return cache_path
         except Exception as e:
             logger.error(f"Erro ao salvar no cache {cache_path}: {str(e)}")
@@ -121,16 +95,15 @@ class CacheService:
     def clear_cache(self, cache_type=None):
         """
         Limpa o cache de um tipo específico ou todo o cache
+
+        PDFs e áudios compartilham o cache de mídia: com cache_type 'pdf' ou 'audio' são
+        removidos apenas os artefatos desse tipo; sem cache_type, o cache de mídia inteiro.
         """
         try:
-            if cache_type == 'pdf':
-                self._clear_directory(self.pdf_cache_dir)
-            elif cache_type == 'audio':
-                self._clear_directory(self.audio_cache_dir)
-            elif cache_type is None:
-                # Limpar todos os caches
-                self._clear_directory(self.pdf_cache_dir)
-                self._clear_directory(self.audio_cache_dir)
+            if cache_type is None:
+                self.media_cache.clear()
+            elif cache_type in MEDIA_ARTIFACT_PREFIXES:
+                self.media_cache.clear(MEDIA_ARTIFACT_PREFIXES[cache_type])
             else:
                 cache_dir = os.path.join(settings.MEDIA_ROOT, f'{cache_type}_cache')
                 if os.path.exists(cache_dir):
@@ -0,0 +1,390 @@
+"""
+Gerenciamento de caches em disco com limite de tamanho.
+
+Cada arquivo gravado no cache é registrado em um índice SQLite (tamanho, dono, data do
+último acesso e número de acessos), guardado no próprio diretório ou, quando o diretório
+é servido publicamente, no caminho informado em index_path. Assim o uso
+total e a ordem de remoção são obtidos com uma consulta, sem percorrer o diretório
+a cada requisição. Quando o limite de bytes é ultrapassado, os arquivos menos usados
+recentemente (LRU) ou com menos acessos (LFU) são removidos.
+
+Para não somar o índice a cada gravação, cada processo mantém um total corrente,
+ajustado a cada arquivo gravado ou removido e recalculado no índice (que também recebe
+as gravações dos outros processos) nas limpezas e a cada TOTAL_SYNC_INTERVAL segundos.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from django.conf import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Políticas de remoção
+POLICY_LRU = 'lru'
+POLICY_LFU = 'lfu'
+
+INDEX_FILENAME = '.index.sqlite3'
+
+
+class DiskCache:
+    """
+    Índice e política de remoção de um diretório de cache em disco
+    """
+
+    # Intervalo mínimo (segundos) entre registros de acesso de um mesmo arquivo
+    ACCESS_UPDATE_INTERVAL = 60
+
+    # Fração do limite mantida após uma limpeza, para não limpar a cada gravação
+    TRIM_TARGET_RATIO = 0.9
+
+    # Intervalo máximo (segundos) entre recálculos do total corrente a partir do índice
+    TOTAL_SYNC_INTERVAL = 60
+
+    def __init__(self, directory, max_bytes, policy=POLICY_LRU, on_evict=None, index_path=None):
+        """
+        Inicializa o gerenciador do cache
+
+        Args:
+            directory (str): Diretório do cache
+            max_bytes (int): Limite de tamanho em bytes (0 ou None desativa o limite)
+            policy (str): Política de remoção ('lru' ou 'lfu')
+            on_evict (callable): Chamada com o número de arquivos removidos em cada limpeza
+            index_path (str): Caminho do banco SQLite do índice (padrão: dentro do diretório)
+        """
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.policy = policy if policy in (POLICY_LRU, POLICY_LFU) else POLICY_LRU
+        self.index_path = os.path.abspath(index_path) if index_path else os.path.join(self.directory, INDEX_FILENAME)
+        self.on_evict = on_evict
+
+        self._local = threading.local()
+        self._last_access = {}
+        self._lock = threading.Lock()
+
+        # Total corrente em bytes (None até o primeiro cálculo no índice)
+        self._total_size = None
+        self._total_synced_at = 0
+
+    def record_fill(self, path, owner=None):
+        """
+        Registra um arquivo recém-gravado no cache e aplica o limite de tamanho
+
+        Args:
+            path (str): Caminho do arquivo no cache
+            owner (str): Arquivo de origem (ex.: caminho relativo do PDF)
+        """
+        name = self._get_name(path)
+        if name is None:
+            return
+
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                previous = conn.execute("SELECT size FROM entries WHERE name = ?", (name,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (name, size, owner, created_at, accessed_at, hits) "
+                    "VALUES (?, ?, ?, ?, ?, 0)",
+                    (name, size, owner, now, now)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao registrar arquivo no índice do cache {self.directory}: {str(e)}")
+            return
+
+        with self._lock:
+            self._last_access[name] = now
+            if self._total_size is not None:
+                self._total_size += size - (previous[0] if previous else 0)
+
+        if self.max_bytes and self._get_running_total() > self.max_bytes:
+            self.trim()
+
+    def record_access(self, path, owner=None):
+        """
+        Registra o acesso a um arquivo do cache. Acessos repetidos ao mesmo arquivo
+        dentro de ACCESS_UPDATE_INTERVAL não geram escrita no índice.
+
+        Args:
+            path (str): Caminho do arquivo no cache
+            owner (str): Arquivo de origem, usado se o arquivo ainda não estiver indexado
+        """
+        name = self._get_name(path)
+        if name is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            last_access = self._last_access.get(name)
+            if last_access is not None and now - last_access < self.ACCESS_UPDATE_INTERVAL:
+                return
+            if len(self._last_access) > 10000:
+                self._last_access.clear()
+            self._last_access[name] = now
+
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "UPDATE entries SET accessed_at = ?, hits = hits + 1 WHERE name = ?",
+                    (now, name)
+                )
+                if cursor.rowcount:
+                    return
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao registrar acesso no índice do cache {self.directory}: {str(e)}")
+            return
+
+        # Arquivo gravado antes do índice existir
+        self.record_fill(path, owner)
+
+    def get_total_size(self):
+        """
+        Retorna o tamanho total em bytes dos arquivos indexados
+        """
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _get_running_total(self):
+        """
+        Retorna o total corrente, recalculando-o no índice se estiver desatualizado
+        """
+        with self._lock:
+            if self._total_size is not None and time.time() - self._total_synced_at < self.TOTAL_SYNC_INTERVAL:
+                return self._total_size
+
+        total = self.get_total_size()
+        self._set_running_total(total)
+        return total
+
+    def _set_running_total(self, total):
+        with self._lock:
+            self._total_size = total
+            self._total_synced_at = time.time()
+
+    def get_usage_by_owner(self):
+        """
+        Retorna o uso do cache agrupado pelo arquivo de origem
+
+        Returns:
+            list: Tuplas (dono, número de arquivos, bytes) em ordem decrescente de tamanho
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT owner, COUNT(*), SUM(size) FROM entries GROUP BY owner ORDER BY SUM(size) DESC"
+            ).fetchall()
+
+    def trim(self, max_bytes=None):
+        """
+        Remove arquivos até que o cache caiba no limite
+
+        Args:
+            max_bytes (int): Limite a aplicar (padrão: TRIM_TARGET_RATIO do limite configurado)
+
+        Returns:
+            tuple: (arquivos removidos, bytes liberados)
+        """
+        if max_bytes is None:
+            if not self.max_bytes:
+                return 0, 0
+            max_bytes = int(self.max_bytes * self.TRIM_TARGET_RATIO)
+
+        if self.policy == POLICY_LFU:
+            order_by = "hits ASC, accessed_at ASC"
+        else:
+            order_by = "accessed_at ASC"
+
+        removed_files = 0
+        removed_bytes = 0
+
+        with self._lock:
+            with self._connect() as conn:
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                self._total_size = total
+                self._total_synced_at = time.time()
+                if total <= max_bytes:
+                    return 0, 0
+
+                evicted = []
+                for name, size in conn.execute(f"SELECT name, size FROM entries ORDER BY {order_by}"):
+                    if total <= max_bytes:
+                        break
+                    evicted.append((name,))
+                    total -= size
+                    removed_bytes += size
+
+                for (name,) in evicted:
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning(f"Não foi possível remover {name} do cache: {str(e)}")
+                    self._last_access.pop(name, None)
+
+                conn.executemany("DELETE FROM entries WHERE name = ?", evicted)
+                removed_files = len(evicted)
+                self._total_size = total
+
+        logger.info(f"Cache {self.directory}: {removed_files} arquivos removidos ({removed_bytes} bytes)")
+        if self.on_evict and removed_files:
+            self.on_evict(removed_files)
+        return removed_files, removed_bytes
+
+    def rebuild(self, get_owner=None):
+        """
+        Reconstrói o índice percorrendo o diretório uma vez, incluindo arquivos gravados
+        antes do índice existir e descartando entradas de arquivos removidos
+
+        Args:
+            get_owner (callable): Função que recebe o nome do arquivo e retorna o dono já conhecido
+
+        Returns:
+            int: Número de arquivos indexados
+        """
+        with self._connect() as conn:
+            known = {
+                name: (owner, accessed_at, hits)
+                for name, owner, accessed_at, hits in conn.execute(
+                    "SELECT name, owner, accessed_at, hits FROM entries"
+                )
+            }
+
+        rows = []
+        for root, dirs, files in os.walk(self.directory):
+            # Ignorar diretórios temporários de conversões em andamento
+            dirs[:] = [d for d in dirs if not d.startswith('tmp')]
+            for filename in files:
+                if filename.startswith(INDEX_FILENAME) or filename.endswith(('.lock', '.tmp')):
+                    continue
+
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.directory)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                owner, accessed_at, hits = known.get(name, (None, stat.st_atime, 0))
+                if owner is None and get_owner:
+                    owner = get_owner(name)
+                rows.append((name, stat.st_size, owner, stat.st_mtime, accessed_at, hits))
+
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM entries")
+                conn.executemany(
+                    "INSERT INTO entries (name, size, owner, created_at, accessed_at, hits) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            self._last_access.clear()
+            self._total_size = sum(row[1] for row in rows)
+            self._total_synced_at = time.time()
+
+        return len(rows)
+
+    def clear(self, match=None):
+        """
+        Remove todos os arquivos do cache e esvazia o índice
+
+        Args:
+            match (callable): Recebe o nome do arquivo no cache e indica se ele deve ser
+                removido (padrão: todos os arquivos)
+
+        Returns:
+            int: Número de arquivos removidos, quando match é informado
+        """
+        if match is not None:
+            return self._clear_matching(match)
+
+        with self._lock:
+            for root, dirs, files in os.walk(self.directory, topdown=False):
+                for filename in files:
+                    if filename.startswith(INDEX_FILENAME):
+                        continue
+                    os.remove(os.path.join(root, filename))
+                for dirname in dirs:
+                    try:
+                        os.rmdir(os.path.join(root, dirname))
+                    except OSError:
+                        pass
+
+            with self._connect() as conn:
+                conn.execute("DELETE FROM entries")
+            self._last_access.clear()
+            self._total_size = 0
+            self._total_synced_at = time.time()
+
+    def _clear_matching(self, match):
+        removed = []
+        with self._lock:
+            for root, dirs, files in os.walk(self.directory):
+                for filename in files:
+                    if filename.startswith(INDEX_FILENAME) or filename.endswith('.lock'):
+                        continue
+                    path = os.path.join(root, filename)
+                    name = os.path.relpath(path, self.directory)
+                    if not match(name):
+                        continue
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    removed.append((name,))
+                    self._last_access.pop(name, None)
+
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM entries WHERE name = ?", removed)
+            # Recalcular o total no índice na próxima gravação
+            self._total_size = None
+
+        return len(removed)
+
+    def _get_name(self, path):
+        """
+        Retorna o caminho relativo ao diretório do cache ou None se estiver fora dele
+        """
+        name = os.path.relpath(os.path.abspath(path), self.directory)
+        if name.startswith(os.pardir):
+            return None
+        return name
+
+    def _connect(self):
+        """
+        Retorna a conexão SQLite da thread atual, criando o índice se necessário
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            conn = sqlite3.connect(self.index_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "name TEXT PRIMARY KEY, size INTEGER NOT NULL, owner TEXT, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_owner ON entries (owner)")
+            self._local.conn = conn
+        return conn
+
+
+def get_media_owner(path):
+    """
+    Converte o caminho de um arquivo de origem no caminho relativo ao MEDIA_ROOT
+    """
+    if not path:
+        return None
+    if os.path.isabs(path):
+        relative_path = os.path.relpath(path, settings.MEDIA_ROOT)
+        if not relative_path.startswith(os.pardir):
+            path = relative_path
+    return path.replace(os.sep, '/').lstrip('/')
@@ -0,0 +1,171 @@
+"""
+Índice de impressões digitais de arquivos.
+
+Associa a identidade de um arquivo no sistema de arquivos (caminho, tamanho, data de
+modificação em nanossegundos e inode) ao hash do seu conteúdo. O hash é calculado uma
+única vez por versão do arquivo e guardado em memória e em um índice SQLite, de modo
+que as consultas seguintes custam apenas um os.stat, inclusive após reiniciar o servidor.
+
+O hash usa o xxHash (XXH3 de 128 bits) quando o pacote xxhash está instalado, ou o
+BLAKE2b de 128 bits da biblioteca padrão, lendo o arquivo em blocos de 1 MB.
+"""
+
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from django.conf import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Tamanho dos blocos lidos ao calcular o hash
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+def _new_hasher():
+    """Retorna o nome do algoritmo e um objeto de hash vazio."""
+    if XXHASH_AVAILABLE:
+        return 'xxh3_128', xxhash.xxh3_128()
+    return 'blake2b_128', hashlib.blake2b(digest_size=16)
+
+
+def compute_file_hash(file_path):
+    """
+    Calcula o hash do conteúdo de um arquivo
+
+    Returns:
+        tuple: (algoritmo, hash em hexadecimal)
+    """
+    algorithm, hasher = _new_hasher()
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hasher.update(view[:size])
+    return algorithm, hasher.hexdigest()
+
+
+class FileFingerprintIndex:
+    """
+    Índice persistente de hashes de conteúdo de arquivos
+    """
+
+    # Número máximo de entradas mantidas em memória
+    MEMORY_ENTRIES = 4096
+
+    def __init__(self, index_path=None):
+        """
+        Inicializa o índice
+
+        Args:
+            index_path (str): Caminho do banco SQLite do índice
+        """
+        self.index_path = index_path or getattr(
+            settings, 'FILE_FINGERPRINT_INDEX', os.path.join(settings.BASE_DIR, 'cache', 'internal', 'file_fingerprints.sqlite3')
+        )
+        self.algorithm = _new_hasher()[0]
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def get_hash(self, file_path):
+        """
+        Retorna o hash do conteúdo de um arquivo, calculando-o apenas se o arquivo mudou
+
+        Args:
+            file_path (str): Caminho do arquivo
+
+        Returns:
+            str: Hash em hexadecimal ou None se o arquivo não existir ou não puder ser lido
+        """
+        try:
+            file_path = os.path.abspath(file_path)
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        fingerprint = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+        # Consultar a memória do processo
+        with self._lock:
+            entry = self._memory.get(file_path)
+            if entry is not None and entry[0] == fingerprint:
+                self._memory.move_to_end(file_path)
+                return entry[1]
+
+        # Consultar o índice persistente
+        file_hash = self._read_entry(file_path, fingerprint)
+        if file_hash is None:
+            try:
+                _, file_hash = compute_file_hash(file_path)
+            except OSError as e:
+                logger.error(f"Erro ao calcular hash do arquivo {file_path}: {str(e)}")
+                return None
+            self._write_entry(file_path, fingerprint, file_hash)
+
+        self._remember(file_path, fingerprint, file_hash)
+        return file_hash
+
+    def _remember(self, file_path, fingerprint, file_hash):
+        with self._lock:
+            self._memory[file_path] = (fingerprint, file_hash)
+            self._memory.move_to_end(file_path)
+            while len(self._memory) > self.MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def _read_entry(self, file_path, fingerprint):
+        try:
+            row = self._connect().execute(
+                "SELECT hash FROM fingerprints WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ? "
+                "AND algorithm = ?",
+                (file_path, *fingerprint, self.algorithm)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao consultar o índice de hashes {self.index_path}: {str(e)}")
+            return None
+        return row[0] if row else None
+
+    def _write_entry(self, file_path, fingerprint, file_hash):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, inode, algorithm, hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (file_path, *fingerprint, self.algorithm, file_hash)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao gravar no índice de hashes {self.index_path}: {str(e)}")
+
+    def _connect(self):
+        """
+        Retorna a conexão SQLite da thread atual, criando o índice se necessário
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            conn = sqlite3.connect(self.index_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                "inode INTEGER NOT NULL, algorithm TEXT NOT NULL, hash TEXT NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+
+# Instância singleton do índice
+file_fingerprints = FileFingerprintIndex()
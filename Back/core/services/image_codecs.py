@@ -0,0 +1,112 @@
+"""
+Formatos de imagem para as páginas convertidas e negociação pelo cabeçalho Accept.
+
+WebP e AVIF reduzem bastante o tamanho das páginas com a mesma qualidade visual.
+Cada formato só é oferecido se o Pillow instalado conseguir gravá-lo; o AVIF
+também pode ser habilitado em versões antigas do Pillow com o pacote pillow-avif-plugin.
+"""
+
+import logging
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+    Image.init()
+    PIL_AVAILABLE = True
+except ImportError:
+    logger.warning("PIL não encontrado. A conversão de formatos de imagem não estará disponível.")
+    PIL_AVAILABLE = False
+
+try:
+    import pillow_avif  # noqa: F401 (registra o codec AVIF no Pillow)
+except ImportError:
+    pass
+
+# Tipos MIME de cada formato
+CONTENT_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'TIFF': 'image/tiff',
+}
+
+# Qualidade padrão de cada formato com perdas (valores com qualidade visual equivalente)
+DEFAULT_QUALITY = {
+    'AVIF': 60,
+    'WEBP': 80,
+    'JPEG': 85,
+}
+
+# Formatos modernos em ordem de preferência
+PREFERRED_FORMATS = ['AVIF', 'WEBP']
+
+
+def is_format_supported(format):
+    """Verifica se o Pillow instalado consegue gravar o formato."""
+    return PIL_AVAILABLE and format.upper() in Image.SAVE
+
+SUPPORTED_FORMATS = [format for format in CONTENT_TYPES if is_format_supported(format)]
+
+
+def negotiate_format(accept_header, default='JPEG'):
+    """
+    Escolhe o formato da imagem a partir do cabeçalho Accept da requisição
+
+    Args:
+        accept_header (str): Valor do cabeçalho Accept
+        default (str): Formato usado quando o cliente não aceita nenhum formato moderno
+
+    Returns:
+        str: Formato escolhido (AVIF, WEBP ou o padrão)
+    """
+    accepted = set()
+    for item in (accept_header or '').split(','):
+        parts = [part.strip() for part in item.split(';')]
+        # Ignorar tipos recusados explicitamente (q=0)
+        if any(part.replace(' ', '') in ('q=0', 'q=0.0') for part in parts[1:]):
+            continue
+        accepted.add(parts[0].lower())
+
+    for format in PREFERRED_FORMATS:
+        if CONTENT_TYPES[format] in accepted and format in SUPPORTED_FORMATS:
+            return format
+
+    return default
+
+
+def get_default_quality(format):
+    """Retorna a qualidade padrão do formato (None para formatos sem perdas)."""
+    return DEFAULT_QUALITY.get(format.upper())
+
+
+def get_save_options(format, quality=None):
+    """
+    Retorna os argumentos de Image.save para o formato
+
+    Args:
+        format (str): Formato da imagem
+        quality (int): Qualidade (1-100) para formatos com perdas
+
+    Returns:
+        dict: Argumentos para Image.save
+    """
+    format = format.upper()
+    if format not in DEFAULT_QUALITY:
+        return {'format': format}
+
+    options = {'format': format, 'quality': quality or DEFAULT_QUALITY[format]}
+    if format == 'JPEG':
+        options['optimize'] = True
+    elif format == 'WEBP':
+        options['method'] = 4
+    return options
+
+
+def prepare_image(image, format):
+    """Converte o modo de cor da imagem quando o formato não o suporta."""
+    if format.upper() in ('JPEG', 'AVIF') and image.mode not in ('RGB', 'L'):
+        return image.convert('RGB')
+    return image
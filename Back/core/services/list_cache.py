@@ -0,0 +1,242 @@
+"""
+Cache das listagens: invalidação por geração, revalidação em segundo plano e campos pessoais.
+
+Cada listagem em cache (ex.: 'mangas_list') tem um número de versão guardado no cache
+padrão, que faz parte da chave das respostas. Os sinais post_save, post_delete e
+m2m_changed dos modelos exibidos na listagem incrementam a versão: as respostas
+antigas deixam de ser consultadas e expiram sozinhas, sem precisar procurar e remover
+cada combinação de filtros e páginas. Assim as respostas podem ficar horas em cache
+sem que conteúdo novo fique escondido.
+
+Cada resposta tem dois prazos: depois de LIST_CACHE_SOFT_TIMEOUT ela ainda é servida,
+enquanto uma única requisição a regenera em segundo plano (stale-while-revalidate);
+depois de LIST_CACHE_TIMEOUT ela expira. Falhas simultâneas da mesma chave no mesmo
+processo geram a resposta uma única vez. Cada resposta guarda um ETag do seu conteúdo.
+As regenerações rodam em um pool próprio, que não guarda os resultados, e fecham as
+conexões com o banco abertas pela thread.
+
+As respostas em cache são as mesmas para todos os usuários: campos pessoais (favoritos,
+progresso de leitura) são mesclados a cada requisição por apply_user_overlay.
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from rest_framework.utils.encoders import JSONEncoder
+from .cache_metrics import cache_metrics
+from .single_flight import single_flight
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class ListCache:
+    """
+    Versões, chaves e respostas das listagens em cache
+    """
+
+    # Tempo máximo (segundos) reservado para uma regeneração em segundo plano
+    REFRESH_LOCK_TIMEOUT = 60
+
+    # Número de regenerações simultâneas em segundo plano
+    REFRESH_WORKERS = 2
+
+    def __init__(self, timeout=None, soft_timeout=None):
+        """
+        Inicializa o serviço
+
+        Args:
+            timeout (int): Tempo de expiração das respostas em segundos
+            soft_timeout (int): Idade em segundos a partir da qual as respostas são regeneradas
+        """
+        self.timeout = timeout or getattr(settings, 'LIST_CACHE_TIMEOUT', 6 * 60 * 60)
+        self.soft_timeout = soft_timeout or getattr(settings, 'LIST_CACHE_SOFT_TIMEOUT', 5 * 60)
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def get(self, name, query_string, compute, force=False, refresh=None):
+        """
+        Retorna uma resposta da listagem, gerando-a se necessário
+
+        Uma resposta com mais de soft_timeout segundos é retornada como está e uma única
+        requisição (entre todos os processos) agenda a sua regeneração em segundo plano.
+
+        Args:
+            name (str): Nome da listagem
+            query_string (str): Parâmetros da requisição
+            compute (callable): Gera os dados da resposta
+            force (bool): Ignora a resposta em cache e a gera de novo
+            refresh (callable): Gera os dados na regeneração em segundo plano, fora da
+                requisição atual (padrão: compute); não deve depender da requisição
+
+        Returns:
+            dict: {'data': dados, 'etag': ETag do conteúdo, 'fresh_until': horário da regeneração}
+        """
+        key = self.get_key(name, query_string)
+
+        entry = None if force else cache.get(key)
+        if entry is not None:
+            cache_metrics.record_hit(name)
+            if time.time() >= entry['fresh_until'] and cache.add(f"{key}_refresh", 1, self.REFRESH_LOCK_TIMEOUT):
+                self.schedule_refresh(key, name, refresh or compute)
+            return entry
+
+        cache_metrics.record_miss(name)
+        return single_flight.do(key, lambda: self._fill(key, name, compute))
+
+    def schedule_refresh(self, key, name, compute):
+        """
+        Agenda a regeneração de uma resposta em segundo plano
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.REFRESH_WORKERS, thread_name_prefix='list-cache')
+        self._executor.submit(self._refresh, key, name, compute)
+
+    def get_version(self, name):
+        """
+        Retorna a versão atual de uma listagem
+
+        Args:
+            name (str): Nome da listagem
+
+        Returns:
+            int: Versão atual
+        """
+        version = cache.get(self._get_version_key(name))
+        if version is None:
+            version = self._reset_version(name)
+        return version
+
+    def bump(self, name):
+        """
+        Incrementa a versão de uma listagem, invalidando as respostas em cache
+        """
+        try:
+            cache.incr(self._get_version_key(name))
+        except ValueError:
+            self._reset_version(name)
+        logger.debug(f"Listagem {name} invalidada")
+
+    def get_key(self, name, query_string):
+        """
+        Retorna a chave de uma resposta da listagem
+
+        Args:
+            name (str): Nome da listagem
+            query_string (str): Parâmetros da requisição
+
+        Returns:
+            str: Chave da resposta na versão atual
+        """
+        return f"{name}_v{self.get_version(name)}_{query_string}"
+
+    def get_item_ids(self, data):
+        """
+        Retorna os IDs dos itens de uma resposta da listagem (dict paginado com 'results' ou lista)
+        """
+        items = data['results'] if isinstance(data, dict) else data
+        return [item['id'] for item in items]
+
+    def apply_user_overlay(self, data, overlay):
+        """
+        Completa uma listagem compartilhada com os campos pessoais do usuário
+
+        As listagens são guardadas em cache sem os dados do usuário (uma única cópia para
+        todos); os campos pessoais dos itens da página são obtidos a cada requisição.
+
+        Args:
+            data: Resposta da listagem (dict paginado com 'results' ou lista de itens)
+            overlay (dict): {id do item: campos do usuário}
+
+        Returns:
+            Resposta com os campos mesclados (os dados recebidos não são alterados)
+        """
+        if not overlay:
+            return data
+
+        items = data['results'] if isinstance(data, dict) else data
+        merged = [{**item, **overlay.get(item['id'], {})} for item in items]
+        if isinstance(data, dict):
+            return {**data, 'results': merged}
+        return merged
+
+    def get_etag(self, data):
+        """
+        Retorna o hash do conteúdo de uma resposta, usado como ETag
+        """
+        content = json.dumps(data, cls=JSONEncoder, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+    def invalidate_on(self, name, *senders):
+        """
+        Incrementa a versão de uma listagem quando os modelos informados forem alterados
+
+        Args:
+            name (str): Nome da listagem
+            senders: Modelos exibidos na listagem ou tabelas intermediárias de ManyToManyField
+        """
+        def invalidate(sender, **kwargs):
+            if not kwargs.get('action', 'post_').startswith('post_'):
+                return
+
+            self.bump(name)
+            # Incrementar de novo após a confirmação da transação, para descartar respostas
+            # geradas por outras requisições com os dados anteriores enquanto ela estava aberta
+            transaction.on_commit(lambda: self.bump(name))
+
+        for sender in senders:
+            if sender._meta.auto_created:
+                signals = [m2m_changed]
+            else:
+                signals = [post_save, post_delete]
+
+            for signal in signals:
+                signal.connect(
+                    invalidate, sender=sender, weak=False,
+                    dispatch_uid=f"list_cache_{name}_{sender._meta.label_lower}_{id(signal)}"
+                )
+
+    def _fill(self, key, name, compute):
+        start_time = time.time()
+        data = compute()
+        entry = {'data': data, 'etag': self.get_etag(data), 'fresh_until': time.time() + self.soft_timeout}
+        cache.set(key, entry, self.timeout)
+        cache_metrics.record_fill(name, time.time() - start_time)
+        return entry
+
+    def _refresh(self, key, name, compute):
+        # Fora do ciclo de uma requisição, as conexões da thread são fechadas aqui
+        close_old_connections()
+        try:
+            self._fill(key, name, compute)
+        except Exception as e:
+            logger.error(f"Erro ao regenerar a listagem {name} em cache: {str(e)}")
+        finally:
+            cache.delete(f"{key}_refresh")
+            close_old_connections()
+
+    def _reset_version(self, name):
+        # Se a versão foi removida do cache, recomeçar a partir do horário atual garante
+        # que nenhuma resposta gravada com uma versão anterior volte a ser usada
+        key = self._get_version_key(name)
+        version = time.time_ns() // 1000
+        if not cache.add(key, version, None):
+            # Outro processo recriou a versão ao mesmo tempo
+            version = cache.get(key, version)
+        return version
+
+    def _get_version_key(self, name):
+        return f"{name}_version"
+
+
+# Instância singleton do serviço
+list_cache = ListCache()
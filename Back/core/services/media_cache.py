@@ -0,0 +1,246 @@
+"""
+Cache unificado dos artefatos gerados a partir dos arquivos de mídia.
+
+Páginas de PDF convertidas em imagem (mangás e livros), texto extraído das páginas e
+metadados de áudio ficam em um único diretório, com um único esquema de chaves: o hash
+do conteúdo do arquivo de origem (FileFingerprintIndex) mais o nome do artefato, que
+descreve os parâmetros usados para gerá-lo (ex.: page12_200dpi_q85.jpeg). Assim, a
+mesma página pedida pelo conversor dos mangás e pelo serviço de PDF dos livros é gerada
+e guardada uma única vez, e um arquivo substituído nunca é atendido por artefatos antigos.
+
+Os artefatos de um arquivo de origem ficam em <diretório>/<hash[:2]>/<hash>/<artefato>.
+A gravação é atômica, a geração concorrente do mesmo artefato é deduplicada (single
+flight) e o tamanho total é controlado pelo índice do DiskCache (LRU ou LFU).
+"""
+
+import os
+import json
+import time
+import logging
+from django.conf import settings
+from .cache_metrics import cache_metrics
+from .disk_cache import DiskCache, get_media_owner, POLICY_LRU
+from .file_fingerprint import file_fingerprints
+from .single_flight import single_flight, atomic_write
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+def get_page_artifact(page_number, resolution, format='JPEG', quality=85):
+    """
+    Retorna o nome do artefato de uma página de PDF convertida em imagem
+
+    Args:
+        page_number (int): Número da página (começando em 1)
+        resolution (str): Resolução da conversão (ex.: '200dpi' ou 'retina-2048w')
+        format (str): Formato da imagem
+        quality (int): Qualidade da imagem
+
+    Returns:
+        str: Nome do artefato
+    """
+    return f"page{page_number}_{resolution}_q{quality}.{format.lower()}"
+
+
+class MediaCache:
+    """
+    Cache em disco dos artefatos derivados de arquivos de mídia
+    """
+
+    def __init__(self, directory, max_bytes=None, policy=POLICY_LRU, fingerprints=None, name='media', metrics=None,
+                 index_path=None):
+        """
+        Inicializa o cache
+
+        Args:
+            directory (str): Diretório do cache
+            max_bytes (int): Limite de tamanho em bytes (0 ou None desativa o limite)
+            policy (str): Política de remoção ('lru' ou 'lfu')
+            fingerprints (FileFingerprintIndex): Índice de hashes dos arquivos de origem
+            name (str): Nome do cache nas métricas
+            metrics (CacheMetrics): Registro das métricas de uso
+            index_path (str): Caminho do índice do cache (padrão: dentro do diretório)
+        """
+        self.name = name
+        self.metrics = metrics or cache_metrics
+        self.disk = DiskCache(
+            directory, max_bytes, policy, on_evict=lambda count: self.metrics.record_eviction(self.name, count),
+            index_path=index_path
+        )
+        self.directory = self.disk.directory
+        self.fingerprints = fingerprints or file_fingerprints
+
+        self.metrics.register_size(name, lambda: (self.disk.get_total_size(), self.disk.max_bytes))
+
+    def get_path(self, source_path, artifact):
+        """
+        Retorna o caminho de um artefato no cache
+
+        Args:
+            source_path (str): Caminho absoluto do arquivo de origem
+            artifact (str): Nome do artefato
+
+        Returns:
+            str: Caminho do artefato ou None se o arquivo de origem não puder ser lido
+        """
+        source_hash = self.fingerprints.get_hash(source_path)
+        if not source_hash:
+            return None
+        return os.path.join(self.directory, source_hash[:2], source_hash, artifact)
+
+    def lookup(self, source_path, artifact):
+        """
+        Procura um artefato no cache, registrando o acerto ou a falha
+
+        Returns:
+            str: Caminho do artefato ou None se ele ainda não foi gerado
+        """
+        path = self.get_path(source_path, artifact)
+        if path and os.path.exists(path):
+            self.metrics.record_hit(self.name)
+            self.disk.record_access(path, owner=get_media_owner(source_path))
+            return path
+
+        self.metrics.record_miss(self.name)
+        return None
+
+    def contains(self, source_path, artifact):
+        """
+        Verifica se um artefato já está no cache, sem registrar acesso
+        """
+        path = self.get_path(source_path, artifact)
+        return bool(path) and os.path.exists(path)
+
+    def get_or_create(self, source_path, artifact, fill):
+        """
+        Retorna um artefato do cache, gerando-o se necessário
+
+        Requisições simultâneas do mesmo artefato (inclusive de outros processos)
+        aguardam uma única geração.
+
+        Args:
+            source_path (str): Caminho absoluto do arquivo de origem
+            artifact (str): Nome do artefato
+            fill (callable): Recebe um arquivo aberto para escrita binária e grava o artefato
+
+        Returns:
+            str: Caminho do artefato ou None se o arquivo de origem não puder ser lido
+        """
+        path = self.lookup(source_path, artifact)
+        if path:
+            return path
+
+        path = self.get_path(source_path, artifact)
+        if not path:
+            return None
+
+        def create():
+            start_time = time.time()
+            with atomic_write(path) as f:
+                fill(f)
+            self.record_fill(path, source_path, time.time() - start_time)
+            return path
+
+        return single_flight.do(
+            path, create, lock_path=f"{path}.lock", check=lambda: path if os.path.exists(path) else None
+        )
+
+    def store(self, source_path, artifact, file_path, elapsed=None):
+        """
+        Move para o cache um artefato já gravado em outro arquivo (no mesmo sistema de arquivos)
+
+        Args:
+            elapsed (float): Tempo gasto para gerar o artefato (opcional)
+
+        Returns:
+            str: Caminho do artefato ou None se o arquivo de origem não puder ser lido
+        """
+        path = self.get_path(source_path, artifact)
+        if not path:
+            return None
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(file_path, path)
+        self.record_fill(path, source_path, elapsed)
+        return path
+
+    def record_fill(self, path, source_path, elapsed=None):
+        """
+        Registra um artefato recém-gravado e aplica o limite de tamanho
+
+        Args:
+            path (str): Caminho do artefato no cache
+            source_path (str): Caminho do arquivo de origem
+            elapsed (float): Tempo gasto para gerar o artefato (opcional)
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        self.metrics.record_fill(self.name, elapsed, size)
+        self.disk.record_fill(path, owner=get_media_owner(source_path))
+
+    def get_json(self, source_path, artifact, compute):
+        """
+        Retorna dados derivados de um arquivo de origem, guardados como JSON no cache
+
+        Args:
+            source_path (str): Caminho absoluto do arquivo de origem
+            artifact (str): Nome do artefato
+            compute (callable): Calcula os dados; resultados None não são guardados
+
+        Returns:
+            Dados calculados ou lidos do cache
+        """
+        path = self.lookup(source_path, artifact)
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Artefato inválido no cache {path}: {str(e)}")
+
+        start_time = time.time()
+        value = compute()
+        if value is None:
+            return None
+        elapsed = time.time() - start_time
+
+        path = self.get_path(source_path, artifact)
+        if path:
+            try:
+                with atomic_write(path, mode='w', encoding='utf-8') as f:
+                    json.dump(value, f, ensure_ascii=False)
+                self.record_fill(path, source_path, elapsed)
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"Erro ao gravar artefato no cache {path}: {str(e)}")
+        return value
+
+    def get_stats(self):
+        """
+        Retorna as métricas de uso do cache (acertos, falhas, gravações, remoções e tamanho)
+        """
+        return self.metrics.get_stats(self.name)
+
+    def clear(self, artifact_prefixes=None):
+        """
+        Remove todos os artefatos do cache ou apenas os de alguns tipos
+
+        Args:
+            artifact_prefixes (tuple): Prefixos dos nomes dos artefatos a remover
+                (ex.: ('page',) para as páginas de PDF; padrão: todos os artefatos)
+        """
+        if artifact_prefixes is None:
+            self.disk.clear()
+            return
+        self.disk.clear(match=lambda name: os.path.basename(name).startswith(tuple(artifact_prefixes)))
+
+
+# Instância singleton do cache
+media_cache = MediaCache(
+    getattr(settings, 'MEDIA_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'media_cache')),
+    max_bytes=getattr(settings, 'MEDIA_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024),
+    policy=getattr(settings, 'MEDIA_CACHE_EVICTION_POLICY', POLICY_LRU),
+    index_path=getattr(settings, 'MEDIA_CACHE_INDEX', None)
+)
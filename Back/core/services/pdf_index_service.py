@@ -0,0 +1,255 @@
+"""
+Índice persistente de metadados de arquivos PDF.
+
+Os metadados (número de páginas, dimensões das páginas, sumário e informações do
+documento) são extraídos uma única vez e gravados em um arquivo JSON por PDF,
+identificado pelo caminho, tamanho e data de modificação do arquivo. As leituras
+seguintes não precisam abrir o PDF.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from core.services.single_flight import atomic_write
+from core.services.pdf_reader_pool import pdf_reader_pool
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Importar PyPDF2 com tratamento de erro
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    logger.warning("PyPDF2 não encontrado. O índice de metadados de PDF não estará disponível.")
+    PYPDF2_AVAILABLE = False
+
+class PDFIndexService:
+    """
+    Serviço para indexar e consultar metadados de arquivos PDF
+    """
+
+    # Número máximo de entradas mantidas em memória
+    MEMORY_ENTRIES = 256
+
+    # Workers da indexação em segundo plano
+    INDEX_WORKERS = getattr(settings, 'PDF_INDEX_WORKERS', 1)
+
+    def __init__(self, index_dir=None):
+        """
+        Inicializa o serviço de índice
+
+        Args:
+            index_dir (str): Diretório onde os arquivos do índice são gravados
+        """
+        self.index_dir = index_dir or getattr(settings, 'PDF_INDEX_DIR', os.path.join(settings.BASE_DIR, 'cache', 'internal', 'pdf_index'))
+        os.makedirs(self.index_dir, exist_ok=True)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Indexações enfileiradas ou em andamento neste processo: {caminho absoluto}
+        self._indexer = None
+        self._indexing = set()
+
+    def get_info(self, pdf_path, build=True):
+        """
+        Obtém os metadados indexados de um PDF
+
+        Args:
+            pdf_path (str): Caminho absoluto para o arquivo PDF
+            build (bool): Se True, indexa o PDF quando não houver entrada válida
+
+        Returns:
+            dict: Metadados do PDF ou None se o arquivo não existir ou não puder ser lido
+        """
+        signature = self._get_signature(pdf_path)
+        if signature is None:
+            return None
+
+        # Consultar a memória do processo
+        with self._lock:
+            entry = self._memory.get(signature)
+            if entry is not None:
+                self._memory.move_to_end(signature)
+                return entry
+
+        # Consultar o índice persistente
+        entry = self._read_entry(pdf_path)
+        if entry is not None and (entry['file_size'], entry['mtime_ns']) == signature[1:]:
+            self._remember(signature, entry)
+            return entry
+
+        if not build:
+            return None
+
+        return self.index_pdf(pdf_path)
+
+    def index_pdf(self, pdf_path):
+        """
+        Extrai os metadados de um PDF e grava a entrada no índice
+
+        Args:
+            pdf_path (str): Caminho absoluto para o arquivo PDF
+
+        Returns:
+            dict: Metadados do PDF ou None em caso de erro
+        """
+        if not PYPDF2_AVAILABLE:
+            logger.error("PyPDF2 não está instalado. Não é possível indexar o PDF.")
+            return None
+
+        signature = self._get_signature(pdf_path)
+        if signature is None:
+            logger.error(f"Arquivo PDF não encontrado para indexação: {pdf_path}")
+            return None
+
+        try:
+            with pdf_reader_pool.checkout(pdf_path) as pdf_reader:
+                page_sizes = [
+                    [float(page.mediabox.width), float(page.mediabox.height)]
+                    for page in pdf_reader.pages
+                ]
+
+                metadata = {
+                    str(key): str(value)
+                    for key, value in (pdf_reader.metadata or {}).items()
+                }
+
+                try:
+                    outline = self._process_outline(pdf_reader, pdf_reader.outline)
+                except Exception as e:
+                    logger.warning(f"Não foi possível ler o sumário do PDF {pdf_path}: {str(e)}")
+                    outline = []
+
+            entry = {
+                'pdf_path': signature[0],
+                'file_name': os.path.basename(pdf_path),
+                'file_size': signature[1],
+                'mtime_ns': signature[2],
+                'total_pages': len(page_sizes),
+                'page_sizes': page_sizes,
+                'outline': outline,
+                'metadata': metadata,
+            }
+
+            self._write_entry(pdf_path, entry)
+            self._remember(signature, entry)
+
+            logger.info(f"PDF indexado: {pdf_path} ({entry['total_pages']} páginas)")
+            return entry
+        except Exception as e:
+            logger.error(f"Erro ao indexar o PDF {pdf_path}: {str(e)}")
+            return None
+
+    def schedule_index(self, pdf_path):
+        """
+        Indexa um PDF em segundo plano
+
+        PDFs com entrada válida no índice, ou já enfileirados neste processo, não são
+        enfileirados de novo. Os metadados ficam apenas no índice: o Future retornado não
+        guarda resultado.
+
+        Args:
+            pdf_path (str): Caminho absoluto para o arquivo PDF
+
+        Returns:
+            Future: Tarefa enfileirada ou None se nada foi enfileirado
+        """
+        if self.get_info(pdf_path, build=False) is not None:
+            return None
+
+        path = os.path.abspath(pdf_path)
+        with self._lock:
+            if path in self._indexing:
+                return None
+            self._indexing.add(path)
+            if self._indexer is None:
+                # Criado no primeiro uso para não iniciar threads na importação
+                self._indexer = ThreadPoolExecutor(max_workers=self.INDEX_WORKERS, thread_name_prefix='pdf-index')
+            indexer = self._indexer
+
+        return indexer.submit(self._index_task, path)
+
+    def _index_task(self, pdf_path):
+        try:
+            self.get_info(pdf_path)
+        finally:
+            with self._lock:
+                self._indexing.discard(pdf_path)
+
+    def _process_outline(self, pdf_reader, outline):
+        """
+        Converte o sumário do PDF em uma lista de dicionários com título e página
+
+        Args:
+            pdf_reader: Leitor do PDF
+            outline: Sumário do PDF
+
+        Returns:
+            list: Sumário processado
+        """
+        if not outline:
+            return []
+
+        result = []
+
+        for item in outline:
+            if isinstance(item, list):
+                # Item é uma lista de subitens
+                result.append(self._process_outline(pdf_reader, item))
+            else:
+                try:
+                    result.append({
+                        'title': str(item.title),
+                        'page': pdf_reader.get_destination_page_number(item) + 1  # PyPDF2 usa índice 0 para páginas
+                    })
+                except Exception:
+                    # Ignorar itens inválidos
+                    pass
+
+        return result
+
+    def _get_signature(self, pdf_path):
+        """
+        Retorna a assinatura (caminho, tamanho, data de modificação) do arquivo
+        """
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return None
+        return (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+
+    def _get_entry_path(self, pdf_path):
+        path_hash = hashlib.md5(os.path.abspath(pdf_path).encode()).hexdigest()
+        return os.path.join(self.index_dir, path_hash[:2], f"{path_hash}.json")
+
+    def _read_entry(self, pdf_path):
+        try:
+            with open(self._get_entry_path(pdf_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, pdf_path, entry):
+        # Gravação atômica para que leitores nunca vejam uma entrada parcial
+        with atomic_write(self._get_entry_path(pdf_path), mode='w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+
+    def _remember(self, signature, entry):
+        with self._lock:
+            # Descartar entradas antigas do mesmo arquivo
+            for key in [key for key in self._memory if key[0] == signature[0]]:
+                del self._memory[key]
+
+            self._memory[signature] = entry
+            while len(self._memory) > self.MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+# Instância singleton do serviço
+pdf_index_service = PDFIndexService()
@@ -0,0 +1,152 @@
+"""
+Pool de documentos PDF abertos com o PyPDF2.
+
+Criar um PdfReader faz o PyPDF2 ler a tabela de referências cruzadas do arquivo, o que
+em livros grandes custa mais do que extrair o texto de uma página. O pool mantém os
+últimos documentos usados abertos, identificados pelo caminho, tamanho e data de
+modificação do arquivo, e os empresta a uma thread por vez.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from django.conf import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Importar PyPDF2 com tratamento de erro
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    logger.warning("PyPDF2 não encontrado. O pool de documentos PDF não estará disponível.")
+    PYPDF2_AVAILABLE = False
+
+
+class _PooledReader:
+    """Documento aberto do pool e o estado do seu empréstimo."""
+
+    def __init__(self, signature, file, reader):
+        self.signature = signature
+        self.file = file
+        self.reader = reader
+        self.lock = threading.Lock()
+        self.users = 0
+        self.evicted = False
+
+    def close(self):
+        try:
+            self.file.close()
+        except OSError:
+            pass
+
+
+class PdfReaderPool:
+    """
+    Pool LRU de objetos PdfReader
+    """
+
+    def __init__(self, max_readers=None):
+        """
+        Inicializa o pool
+
+        Args:
+            max_readers (int): Número máximo de documentos mantidos abertos
+        """
+        self.max_readers = max_readers or getattr(settings, 'PDF_READER_POOL_SIZE', 8)
+        self._readers = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self, pdf_path):
+        """
+        Empresta o PdfReader de um PDF com uso exclusivo pela thread atual
+
+        Args:
+            pdf_path (str): Caminho absoluto para o arquivo PDF
+
+        Yields:
+            PyPDF2.PdfReader: Documento aberto
+        """
+        if not PYPDF2_AVAILABLE:
+            raise ImportError("PyPDF2 não está instalado. Instale com: pip install PyPDF2")
+
+        entry = self._acquire(pdf_path)
+        try:
+            with entry.lock:
+                yield entry.reader
+        finally:
+            self._release(entry)
+
+    def _acquire(self, pdf_path):
+        pdf_path = os.path.abspath(pdf_path)
+        stat = os.stat(pdf_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            entry = self._readers.get(pdf_path)
+            if entry is not None and entry.signature == signature:
+                self._readers.move_to_end(pdf_path)
+                entry.users += 1
+                return entry
+
+            # O arquivo mudou desde a abertura: descartar o documento antigo
+            if entry is not None:
+                self._evict(pdf_path)
+
+        # Abrir o documento fora da trava do pool (a leitura da tabela de referências pode ser demorada)
+        file = open(pdf_path, 'rb')
+        try:
+            reader = PyPDF2.PdfReader(file)
+        except Exception:
+            file.close()
+            raise
+        new_entry = _PooledReader(signature, file, reader)
+
+        with self._lock:
+            entry = self._readers.get(pdf_path)
+            if entry is not None and entry.signature == signature:
+                # Outra thread abriu o mesmo documento enquanto este era lido
+                new_entry.close()
+            else:
+                if entry is not None:
+                    self._evict(pdf_path)
+                entry = new_entry
+                self._readers[pdf_path] = entry
+
+                # Fechar os documentos usados há mais tempo
+                while len(self._readers) > self.max_readers:
+                    self._evict(next(iter(self._readers)))
+
+            self._readers.move_to_end(pdf_path)
+            entry.users += 1
+            return entry
+
+    def _release(self, entry):
+        with self._lock:
+            entry.users -= 1
+            if entry.evicted and entry.users == 0:
+                entry.close()
+
+    def _evict(self, pdf_path):
+        """Remove um documento do pool (deve ser chamado com a trava); documentos emprestados são fechados na devolução."""
+        entry = self._readers.pop(pdf_path)
+        entry.evicted = True
+        if entry.users == 0:
+            entry.close()
+
+    def clear(self):
+        """Fecha todos os documentos que não estão emprestados."""
+        with self._lock:
+            for pdf_path in list(self._readers):
+                self._evict(pdf_path)
+
+    def __len__(self):
+        return len(self._readers)
+
+
+# Instância singleton do pool
+pdf_reader_pool = PdfReaderPool()
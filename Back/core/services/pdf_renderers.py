@@ -0,0 +1,358 @@
+"""
+Backends de rasterização de páginas de PDF.
+
+O backend 'poppler' executa o pdftoppm (via pdf2image) a cada conversão, o que custa
+a criação de um processo e a releitura do PDF em toda página. Os backends em processo
+('pdfium', com o pacote pypdfium2, e 'pymupdf', com o pacote PyMuPDF) mantêm os
+documentos abertos entre as chamadas. O backend é escolhido em PDF_RENDERER_BACKEND;
+quando o pacote escolhido não está instalado, o Poppler é usado.
+
+As bibliotecas em processo não são seguras para uso simultâneo em várias threads, por
+isso cada backend serializa as suas chamadas; o paralelismo vem dos processos do servidor.
+"""
+
+import os
+import sys
+import logging
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from core.services import image_codecs
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+try:
+    from pdf2image import convert_from_path
+    PDF2IMAGE_AVAILABLE = True
+except ImportError:
+    logger.warning("pdf2image não encontrado. O backend Poppler não estará disponível.")
+    PDF2IMAGE_AVAILABLE = False
+
+    def convert_from_path(*args, **kwargs):
+        raise ImportError("pdf2image não está instalado. Instale com: pip install pdf2image")
+
+try:
+    import pypdfium2
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    try:
+        import fitz as pymupdf  # Versões antigas do PyMuPDF
+        PYMUPDF_AVAILABLE = True
+    except ImportError:
+        PYMUPDF_AVAILABLE = False
+
+# Formatos gravados diretamente pelo pdftoppm
+POPPLER_FORMATS = ('JPEG', 'PNG', 'TIFF')
+
+# Resolução base dos PDFs (pontos por polegada)
+PDF_POINTS_PER_INCH = 72
+
+# Caminho do Poppler (necessário no Windows)
+POPPLER_PATH = getattr(settings, 'POPPLER_PATH', None)
+if not POPPLER_PATH and sys.platform.startswith('win'):
+    for path in (r'C:\poppler\bin', r'C:\Program Files\poppler\bin', r'C:\Program Files (x86)\poppler\bin'):
+        if os.path.exists(path):
+            POPPLER_PATH = path
+            break
+
+
+class PDFRenderer:
+    """
+    Interface dos backends de rasterização
+    """
+
+    name = None
+
+    def is_available(self):
+        """Verifica se as dependências do backend estão instaladas."""
+        raise NotImplementedError
+
+    def render_page(self, pdf_path, page_number, dpi=200, width=None):
+        """
+        Rasteriza uma página do PDF
+
+        Args:
+            pdf_path (str): Caminho absoluto para o arquivo PDF
+            page_number (int): Número da página (começando em 1)
+            dpi (int): Resolução da imagem em DPI
+            width (int): Largura da imagem em pixels (substitui o dpi)
+
+        Returns:
+            PIL.Image.Image: Imagem da página
+        """
+        raise NotImplementedError
+
+    def get_page_count(self, pdf_path):
+        """Retorna o número de páginas do PDF."""
+        from core.services.pdf_index_service import pdf_index_service
+
+        info = pdf_index_service.get_info(pdf_path)
+        if not info:
+            raise ValueError(f"Não foi possível ler o PDF: {pdf_path}")
+        return info['total_pages']
+
+    def render_pages(self, pdf_path, first_page=1, last_page=None, dpi=200, width=None):
+        """
+        Rasteriza um intervalo de páginas
+
+        Returns:
+            iterator: Pares (número da página, imagem)
+        """
+        if last_page is None:
+            last_page = self.get_page_count(pdf_path)
+
+        for page_number in range(first_page, last_page + 1):
+            yield page_number, self.render_page(pdf_path, page_number, dpi, width)
+
+    def render_pages_to_files(self, pdf_path, output_folder, first_page=1, last_page=None, dpi=200, width=None,
+                              format='JPEG', quality=None):
+        """
+        Rasteriza um intervalo de páginas e grava cada imagem em output_folder
+
+        Returns:
+            dict: {número da página: caminho do arquivo gerado}
+        """
+        results = {}
+        for page_number, image in self.render_pages(pdf_path, first_page, last_page, dpi, width):
+            output_path = os.path.join(output_folder, f"page-{page_number}.{format.lower()}")
+            image = image_codecs.prepare_image(image, format)
+            image.save(output_path, **image_codecs.get_save_options(format, quality))
+            results[page_number] = output_path
+        return results
+
+    def close(self, pdf_path=None):
+        """Libera os documentos mantidos abertos (todos, se pdf_path for None)."""
+
+
+class PopplerRenderer(PDFRenderer):
+    """
+    Backend que executa o pdftoppm em um subprocesso a cada conversão
+    """
+
+    name = 'poppler'
+
+    def __init__(self, poppler_path=None):
+        self.poppler_path = poppler_path or POPPLER_PATH
+
+    def is_available(self):
+        return PDF2IMAGE_AVAILABLE
+
+    def _get_convert_args(self, first_page, last_page, dpi, width):
+        convert_args = {'dpi': dpi, 'first_page': first_page, 'last_page': last_page}
+
+        # Rasterizar diretamente na largura pedida
+        if width:
+            convert_args['size'] = (width, None)
+
+        if self.poppler_path:
+            convert_args['poppler_path'] = self.poppler_path
+
+        return convert_args
+
+    def render_page(self, pdf_path, page_number, dpi=200, width=None):
+        # O PPM evita uma compressão intermediária: a imagem é codificada uma única vez pelo chamador
+        images = convert_from_path(pdf_path, fmt='ppm', **self._get_convert_args(page_number, page_number, dpi, width))
+        if not images:
+            raise ValueError(f"Falha ao converter página {page_number} do PDF {pdf_path}")
+        return images[0]
+
+    def render_pages(self, pdf_path, first_page=1, last_page=None, dpi=200, width=None):
+        images = convert_from_path(pdf_path, fmt='ppm', **self._get_convert_args(first_page, last_page, dpi, width))
+        return enumerate(images, start=first_page)
+
+    def render_pages_to_files(self, pdf_path, output_folder, first_page=1, last_page=None, dpi=200, width=None,
+                              format='JPEG', quality=None):
+        if format.upper() not in POPPLER_FORMATS:
+            return super().render_pages_to_files(
+                pdf_path, output_folder, first_page, last_page, dpi, width, format, quality
+            )
+
+        # O pdftoppm grava as imagens já no formato final, sem passar pelo Pillow
+        output_paths = convert_from_path(
+            pdf_path,
+            output_folder=output_folder,
+            output_file='page',
+            paths_only=True,
+            fmt=format.lower(),
+            jpegopt={"quality": quality} if format.upper() == 'JPEG' and quality else None,
+            **self._get_convert_args(first_page, last_page, dpi, width)
+        )
+
+        results = {}
+        for output_path in output_paths:
+            page_number = self._get_page_number_from_output(output_path)
+            if page_number is not None:
+                results[page_number] = output_path
+        return results
+
+    @staticmethod
+    def _get_page_number_from_output(filename):
+        """Extrai o número da página do nome de arquivo gerado pelo pdftoppm (ex.: page-007.jpg)."""
+        name = os.path.splitext(os.path.basename(filename))[0]
+        try:
+            return int(name.rsplit('-', 1)[1])
+        except (IndexError, ValueError):
+            return None
+
+
+class InProcessRenderer(PDFRenderer):
+    """
+    Base dos backends que rasterizam no próprio processo e mantêm os documentos abertos
+    """
+
+    def __init__(self, max_open_documents=None):
+        """
+        Args:
+            max_open_documents (int): Número máximo de documentos mantidos abertos
+        """
+        self.max_open_documents = max_open_documents or getattr(settings, 'PDF_RENDERER_MAX_OPEN_DOCUMENTS', 16)
+        self._documents = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _open_document(self, pdf_path):
+        raise NotImplementedError
+
+    def _close_document(self, document):
+        document.close()
+
+    def _render(self, document, page_number, dpi, width):
+        raise NotImplementedError
+
+    def _get_scale(self, page_width, dpi, width):
+        """Calcula a escala a partir da largura da página em pontos."""
+        if width:
+            return width / page_width
+        return dpi / PDF_POINTS_PER_INCH
+
+    def _get_document(self, pdf_path):
+        """
+        Retorna o documento aberto, reabrindo-o se o arquivo mudou (deve ser chamado com a trava)
+        """
+        pdf_path = os.path.abspath(pdf_path)
+        stat = os.stat(pdf_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        entry = self._documents.get(pdf_path)
+        if entry is not None:
+            if entry[0] == signature:
+                self._documents.move_to_end(pdf_path)
+                return entry[1]
+            self._close_document(self._documents.pop(pdf_path)[1])
+
+        document = self._open_document(pdf_path)
+        self._documents[pdf_path] = (signature, document)
+
+        # Fechar os documentos usados há mais tempo
+        while len(self._documents) > self.max_open_documents:
+            _, (_, oldest) = self._documents.popitem(last=False)
+            self._close_document(oldest)
+
+        return document
+
+    def render_page(self, pdf_path, page_number, dpi=200, width=None):
+        with self._lock:
+            document = self._get_document(pdf_path)
+            if page_number < 1 or page_number > len(document):
+                raise ValueError(f"Página {page_number} inválida para o PDF {pdf_path}")
+            return self._render(document, page_number, dpi, width)
+
+    def get_page_count(self, pdf_path):
+        with self._lock:
+            return len(self._get_document(pdf_path))
+
+    def close(self, pdf_path=None):
+        with self._lock:
+            paths = [os.path.abspath(pdf_path)] if pdf_path else list(self._documents)
+            for path in paths:
+                entry = self._documents.pop(path, None)
+                if entry is not None:
+                    self._close_document(entry[1])
+
+
+class PdfiumRenderer(InProcessRenderer):
+    """
+    Backend em processo baseado no PDFium (pacote pypdfium2)
+    """
+
+    name = 'pdfium'
+
+    def is_available(self):
+        return PDFIUM_AVAILABLE
+
+    def _open_document(self, pdf_path):
+        return pypdfium2.PdfDocument(pdf_path)
+
+    def _render(self, document, page_number, dpi, width):
+        page = document[page_number - 1]
+        try:
+            scale = self._get_scale(page.get_width(), dpi, width)
+            return page.render(scale=scale).to_pil()
+        finally:
+            page.close()
+
+
+class PyMuPDFRenderer(InProcessRenderer):
+    """
+    Backend em processo baseado no MuPDF (pacote PyMuPDF)
+    """
+
+    name = 'pymupdf'
+
+    def is_available(self):
+        return PYMUPDF_AVAILABLE
+
+    def _open_document(self, pdf_path):
+        return pymupdf.open(pdf_path)
+
+    def _render(self, document, page_number, dpi, width):
+        from PIL import Image
+
+        page = document[page_number - 1]
+        scale = self._get_scale(page.rect.width, dpi, width)
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False)
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+
+# Backends disponíveis por nome
+BACKENDS = {
+    renderer_class.name: renderer_class
+    for renderer_class in (PopplerRenderer, PdfiumRenderer, PyMuPDFRenderer)
+}
+DEFAULT_BACKEND = PopplerRenderer.name
+
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+
+def get_renderer(name=None):
+    """
+    Retorna a instância compartilhada do backend de rasterização
+
+    Args:
+        name (str): Nome do backend (padrão: PDF_RENDERER_BACKEND)
+
+    Returns:
+        PDFRenderer: Backend escolhido, ou o Poppler se ele não estiver instalado
+    """
+    name = (name or getattr(settings, 'PDF_RENDERER_BACKEND', DEFAULT_BACKEND) or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        logger.warning(f"Backend de PDF desconhecido: {name}. Usando {DEFAULT_BACKEND}.")
+        name = DEFAULT_BACKEND
+
+    with _renderers_lock:
+        renderer = _renderers.get(name)
+        if renderer is None:
+            renderer = BACKENDS[name]()
+            if not renderer.is_available() and name != DEFAULT_BACKEND:
+                logger.warning(f"Backend de PDF {name} não está instalado. Usando {DEFAULT_BACKEND}.")
+                renderer = _renderers.get(DEFAULT_BACKEND) or BACKENDS[DEFAULT_BACKEND]()
+                _renderers[DEFAULT_BACKEND] = renderer
+            _renderers[name] = renderer
+        return renderer
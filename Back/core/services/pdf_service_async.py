@@ -65,7 +65,7 @@ class AsyncPDFService(PDFService):
             # Obter informações sobre o PDF
             info = self.get_pdf_info(pdf_path)
             
-            # Pré-carregar o texto de todas as páginas
+            # Pré-carregar o texto de todas as páginas (o documento é aberto uma única vez pelo pool)
             if info and 'total_pages' in info:
                 for page_number in range(1, info['total_pages'] + 1):
                     self.get_page_text(pdf_path, page_number)
@@ -140,8 +140,8 @@ class AsyncPDFService(PDFService):
             # Pré-carregar as imagens
             results = {}
             for page_number in range(start_page, end_page + 1):
-                img_str = self.get_page_as_image(pdf_path, page_number, format, dpi, quality)
-                results[page_number] = img_str is not None
+                image_path = self.get_page_image_path(pdf_path, page_number, format, dpi, quality)
+                results[page_number] = image_path is not None
             
             return {
                 'total_pages': info['total_pages'],
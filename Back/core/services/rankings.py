@@ -0,0 +1,243 @@
+"""
+Rankings pré-calculados de popularidade e tendência.
+
+Para cada tipo de conteúdo (mangá, livro, artigo) são gerados, em uma única leitura da
+tabela, os N itens mais populares (views_count) e em tendência, no total e por categoria
+(gênero, no caso dos mangás). As listas ficam nas tabelas do app rankings e as consultas
+dos endpoints passam a ler no máximo N IDs, em vez de ordenar a tabela inteira a cada
+chamada. Cada lista lida do banco fica RANKINGS_CACHE_TIMEOUT segundos no cache padrão.
+
+A pontuação de tendência decai exponencialmente com o tempo: a cada atualização, a
+pontuação anterior é multiplicada por 0,5 a cada RANKINGS_TRENDING_HALF_LIFE segundos
+decorridos e recebe as visualizações registradas desde a atualização anterior. As
+visualizações e a pontuação de cada item ficam em RankingState.
+
+As listas são geradas apenas pelo comando refresh_rankings, agendado no cron; as
+requisições nunca percorrem a tabela inteira. Enquanto um tipo de conteúdo não tiver
+rankings gerados, as leituras usam uma consulta limitada aos N itens com mais
+visualizações (também para a tendência).
+"""
+
+import time
+import heapq
+import logging
+from itertools import islice
+from collections import defaultdict
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, When, Value, IntegerField
+from django.utils import timezone
+from django.utils.text import slugify
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Modelo e campo de categoria de cada tipo de conteúdo (gêneros separados por vírgula nos mangás)
+CONTENT_TYPES = {
+    'manga': ('mangas.manga', 'genres'),
+    'book': ('books.book', 'category__slug'),
+    'article': ('articles.article', 'category__slug'),
+}
+
+# Rankings gerados para cada tipo de conteúdo
+KINDS = ('popular', 'trending')
+
+
+class Rankings:
+    """
+    Geração e leitura dos rankings
+    """
+
+    # Número de linhas em cada INSERT da gravação dos rankings
+    BATCH_SIZE = 1000
+
+    def __init__(self, size=None, cache_timeout=None, half_life=None):
+        """
+        Inicializa o serviço
+
+        Args:
+            size (int): Número de itens de cada ranking
+            cache_timeout (int): Tempo em segundos de cada ranking no cache padrão
+            half_life (int): Meia-vida em segundos da pontuação de tendência
+        """
+        self.size = size or getattr(settings, 'RANKINGS_SIZE', 100)
+        self.cache_timeout = cache_timeout or getattr(settings, 'RANKINGS_CACHE_TIMEOUT', 60)
+        self.half_life = half_life or getattr(settings, 'RANKINGS_TRENDING_HALF_LIFE', 24 * 60 * 60)
+
+    def get(self, content_type, kind='popular', category=None):
+        """
+        Retorna um ranking
+
+        Args:
+            content_type (str): 'manga', 'book' ou 'article'
+            kind (str): 'popular' ou 'trending'
+            category (str): Categoria ou gênero (opcional)
+
+        Returns:
+            list: [(id, pontuação)] do maior para o menor
+        """
+        key = self._get_list_key(content_type, kind, category)
+        ranking = cache.get(key)
+        if ranking is None:
+            ranking = self._read(content_type, kind, category)
+            cache.set(key, ranking, self.cache_timeout)
+        return [tuple(item) for item in ranking]
+
+    def get_ids(self, content_type, kind='popular', category=None):
+        """
+        Retorna os IDs de um ranking, do maior para o menor
+        """
+        return [pk for pk, _ in self.get(content_type, kind, category)]
+
+    def get_queryset(self, content_type, kind='popular', category=None, queryset=None):
+        """
+        Retorna os itens de um ranking na ordem do ranking
+
+        Args:
+            queryset: Queryset do modelo a ser filtrado (padrão: todos os itens)
+        """
+        if queryset is None:
+            queryset = apps.get_model(CONTENT_TYPES[content_type][0]).objects.all()
+        return self.order_by_ids(queryset, self.get_ids(content_type, kind, category))
+
+    @staticmethod
+    def order_by_ids(queryset, ids):
+        """
+        Filtra um queryset pelos IDs informados, mantendo a ordem da lista
+        """
+        if not ids:
+            return queryset.none()
+        return queryset.filter(pk__in=ids).order_by(
+            Case(*[When(pk=pk, then=Value(index)) for index, pk in enumerate(ids)], output_field=IntegerField())
+        )
+
+    def refresh(self, content_type=None):
+        """
+        Recalcula e grava os rankings de um tipo de conteúdo ou de todos
+
+        Returns:
+            int: Número de itens lidos
+        """
+        if content_type is None:
+            return sum(self.refresh(name) for name in CONTENT_TYPES)
+
+        RankingEntry = apps.get_model('rankings', 'RankingEntry')
+        RankingState = apps.get_model('rankings', 'RankingState')
+
+        start_time = time.time()
+        label, category_field = CONTENT_TYPES[content_type]
+        model = apps.get_model(label)
+
+        # Visualizações e pontuação de tendência de cada item na atualização anterior
+        now = timezone.now()
+        previous = {}
+        updated_at = None
+        for pk, views, trending, updated_at in RankingState.objects.filter(content_type=content_type).values_list(
+            'object_id', 'views', 'trending', 'updated_at'
+        ).iterator():
+            previous[pk] = (views, trending)
+        decay = 0.5 ** ((now - updated_at).total_seconds() / self.half_life) if updated_at else 0.0
+
+        states = []
+        scores = {kind: defaultdict(list) for kind in KINDS}
+        for pk, views, category in model.objects.values_list('pk', 'views_count', category_field).iterator():
+            if updated_at is None:
+                # Primeira atualização: ainda não há visualizações recentes para comparar
+                trending = 0.0
+            elif pk in previous:
+                last_views, last_score = previous[pk]
+                trending = last_score * decay + max(views - last_views, 0)
+            else:
+                trending = float(views)
+            states.append(RankingState(
+                content_type=content_type, object_id=pk, views=views, trending=trending, updated_at=now
+            ))
+
+            categories = [None] + self._get_categories(content_type, category)
+            for name in categories:
+                # Empates no ranking de tendência são decididos pelas visualizações totais
+                scores['popular'][name].append((views, pk))
+                scores['trending'][name].append(((trending, views), pk))
+
+        entries = []
+        lists = {}
+        for kind in KINDS:
+            for name, items in scores[kind].items():
+                top = [
+                    [pk, score[0] if kind == 'trending' else score]
+                    for score, pk in heapq.nlargest(self.size, items)
+                ]
+                lists[self._get_list_key(content_type, kind, name)] = top
+                entries.extend(
+                    RankingEntry(
+                        content_type=content_type, kind=kind, category=name or '',
+                        position=position, object_id=pk, score=score
+                    )
+                    for position, (pk, score) in enumerate(top, start=1)
+                )
+        if not states:
+            lists.update({self._get_list_key(content_type, kind, None): [] for kind in KINDS})
+
+        with transaction.atomic():
+            RankingEntry.objects.filter(content_type=content_type).delete()
+            RankingEntry.objects.bulk_create(entries, batch_size=self.BATCH_SIZE)
+            RankingState.objects.filter(content_type=content_type).delete()
+            RankingState.objects.bulk_create(states, batch_size=self.BATCH_SIZE)
+
+        # Listas de categorias que deixaram de existir expiram do cache sozinhas
+        cache.set_many(lists, self.cache_timeout)
+
+        logger.info(f"Rankings de {content_type} atualizados: {len(states)} itens em {time.time() - start_time:.2f}s")
+        return len(states)
+
+    def _read(self, content_type, kind, category):
+        """
+        Lê um ranking das tabelas, ou da tabela do conteúdo se os rankings ainda não foram gerados
+        """
+        RankingEntry = apps.get_model('rankings', 'RankingEntry')
+        RankingState = apps.get_model('rankings', 'RankingState')
+
+        ranking = list(RankingEntry.objects.filter(
+            content_type=content_type, kind=kind, category=slugify(category) if category else ''
+        ).order_by('position').values_list('object_id', 'score'))
+        if ranking or RankingState.objects.filter(content_type=content_type).exists():
+            return ranking
+
+        return self._read_fallback(content_type, category)
+
+    def _read_fallback(self, content_type, category):
+        """
+        Retorna os N itens com mais visualizações com uma consulta limitada
+        """
+        label, category_field = CONTENT_TYPES[content_type]
+        queryset = apps.get_model(label).objects.order_by('-views_count', '-pk')
+
+        if category and content_type == 'manga':
+            # Os gêneros são texto: filtrar aproximadamente no banco e conferir o gênero exato
+            # antes de limitar a N itens
+            rows = queryset.filter(genres__icontains=category.replace('-', ' ')).values_list(
+                'pk', 'views_count', category_field
+            ).iterator()
+            rows = islice(
+                (row for row in rows if slugify(category) in self._get_categories(content_type, row[2])), self.size
+            )
+            return [(pk, views) for pk, views, _ in rows]
+        if category:
+            queryset = queryset.filter(**{category_field: slugify(category)})
+        return list(queryset.values_list('pk', 'views_count')[:self.size])
+
+    def _get_categories(self, content_type, value):
+        # Categorias normalizadas como nas chaves das listas ('Slice of Life' -> 'slice-of-life')
+        if not value:
+            return []
+        names = value.split(',') if content_type == 'manga' else [value]
+        return list({slugify(name) for name in names if slugify(name)})
+
+    def _get_list_key(self, content_type, kind, category):
+        return f"rankings_{content_type}_{kind}_{slugify(category) if category else 'all'}"
+
+
+# Instância singleton do serviço
+rankings = Rankings()
@@ -0,0 +1,129 @@
+"""
+Perfil do cache padrão compartilhado entre os workers.
+
+Com vários workers do gunicorn, o LocMemCache mantém uma cópia independente das listas
+em cache, dos contadores do rate limit e dos trechos de áudio em cada processo: a taxa
+de acerto cai a cada worker adicionado e os limites de requisições não valem entre eles.
+Quando REDIS_URL está definido (e o pacote redis está instalado), o cache padrão passa
+a ser o RedisCache do Django, com conexões reaproveitadas por um pool por processo,
+prefixo nas chaves (vários ambientes podem usar o mesmo servidor) e compressão dos
+valores grandes. Sem REDIS_URL, o desenvolvimento continua usando o LocMemCache.
+
+Este módulo é importado por settings.py e não pode acessar as configurações do Django
+ao ser carregado.
+"""
+
+import zlib
+import pickle
+import warnings
+from django.core.cache.backends.redis import RedisSerializer
+
+try:
+    import redis  # noqa: F401
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Marcador no início dos valores comprimidos (valores em pickle começam com 0x80)
+COMPRESSED_MARKER = b'Z'
+
+# Tamanho mínimo (bytes) de um valor serializado para tentar comprimi-lo
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+
+# Nível de compressão do zlib (1 = mais rápido, 9 = menor)
+DEFAULT_COMPRESS_LEVEL = 6
+
+
+class CompressedSerializer(RedisSerializer):
+    """
+    Serializador do RedisCache que comprime com zlib os valores grandes
+
+    Inteiros continuam sendo gravados sem serialização, para que incr/decr (usados pelos
+    contadores do rate limit) funcionem no servidor. Valores binários (ex.: trechos de
+    áudio) já estão comprimidos e não passam pelo zlib.
+    """
+
+    def __init__(self, protocol=None, min_size=None, level=None):
+        """
+        Inicializa o serializador
+
+        Args:
+            protocol (int): Protocolo do pickle
+            min_size (int): Tamanho mínimo para comprimir (padrão: CACHE_COMPRESS_MIN_BYTES)
+            level (int): Nível de compressão (padrão: CACHE_COMPRESS_LEVEL)
+        """
+        from django.conf import settings
+
+        super().__init__(protocol)
+        self.min_size = min_size if min_size is not None else getattr(
+            settings, 'CACHE_COMPRESS_MIN_BYTES', DEFAULT_COMPRESS_MIN_BYTES
+        )
+        self.level = level if level is not None else getattr(
+            settings, 'CACHE_COMPRESS_LEVEL', DEFAULT_COMPRESS_LEVEL
+        )
+
+    def dumps(self, obj):
+        if type(obj) is int:
+            return obj
+
+        data = pickle.dumps(obj, self.protocol)
+        if len(data) < self.min_size or isinstance(obj, (bytes, bytearray)):
+            return data
+
+        compressed = zlib.compress(data, self.level)
+        if len(compressed) + 1 >= len(data):
+            return data
+        return COMPRESSED_MARKER + compressed
+
+    def loads(self, data):
+        try:
+            return int(data)
+        except ValueError:
+            if data[:1] == COMPRESSED_MARKER:
+                data = zlib.decompress(data[1:])
+            return pickle.loads(data)
+
+
+def build_default_cache(redis_url=None, key_prefix='', timeout=300, max_connections=50, socket_timeout=1.0):
+    """
+    Retorna a configuração do cache padrão (CACHES['default'])
+
+    Args:
+        redis_url (str): URL do servidor compatível com Redis (vazio usa o LocMemCache)
+        key_prefix (str): Prefixo das chaves
+        timeout (int): Tempo de expiração padrão em segundos
+        max_connections (int): Número máximo de conexões do pool de cada processo
+        socket_timeout (float): Tempo máximo de conexão e de resposta do servidor em segundos
+
+    Returns:
+        dict: Configuração do cache
+    """
+    if redis_url and not REDIS_AVAILABLE:
+        warnings.warn("REDIS_URL definido, mas o pacote redis não está instalado. Usando o LocMemCache.")
+
+    if redis_url and REDIS_AVAILABLE:
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': redis_url,
+            'TIMEOUT': timeout,
+            'KEY_PREFIX': key_prefix,
+            'OPTIONS': {
+                'serializer': 'core.services.shared_cache.CompressedSerializer',
+                'max_connections': max_connections,
+                'socket_connect_timeout': socket_timeout,
+                'socket_timeout': socket_timeout,
+                'retry_on_timeout': True,
+                'health_check_interval': 30,
+            },
+        }
+
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'unique-snowflake',
+        'TIMEOUT': timeout,
+        'KEY_PREFIX': key_prefix,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 3,  # 1/3 dos itens serão removidos quando MAX_ENTRIES for atingido
+        }
+    }
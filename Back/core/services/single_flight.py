@@ -0,0 +1,188 @@
+"""
+Execução única (single-flight) de tarefas concorrentes e gravação atômica de arquivos.
+
+Quando várias requisições precisam do mesmo resultado ainda não gerado (por exemplo,
+a mesma página de um PDF), apenas uma delas executa a tarefa e as demais aguardam o
+resultado. Dentro do processo a espera usa um evento; entre processos (vários
+workers do servidor) a coordenação é feita com um arquivo de trava criado de forma
+exclusiva ao lado do arquivo gerado.
+
+A espera tem um limite total (wait_timeout): se o resultado não ficar pronto nesse
+tempo (tarefa travada ou processo lento), a chamada executa a tarefa por conta própria.
+"""
+
+import os
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def atomic_write(path, mode='wb', encoding=None):
+    """
+    Grava um arquivo de forma atômica: o conteúdo vai para um arquivo temporário no
+    mesmo diretório, que só é renomeado para o destino depois de gravado por completo
+
+    Args:
+        path (str): Caminho final do arquivo
+        mode (str): Modo de abertura ('wb' ou 'w')
+        encoding (str): Codificação para o modo texto
+
+    Yields:
+        file: Arquivo temporário aberto para escrita
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _Call:
+    """
+    Execução em andamento de uma chave
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Garante que tarefas com a mesma chave não sejam executadas em paralelo
+    """
+
+    def __init__(self, lock_timeout=120, poll_interval=0.1, wait_timeout=30):
+        """
+        Inicializa o controle de execução única
+
+        Args:
+            lock_timeout (int): Idade em segundos a partir da qual um arquivo de trava é
+                considerado abandonado (processo encerrado no meio da tarefa)
+            poll_interval (float): Intervalo em segundos entre verificações da trava
+            wait_timeout (float): Tempo máximo em segundos aguardando outra execução antes
+                de executar a tarefa sem aguardar mais
+        """
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, lock_path=None, check=None):
+        """
+        Executa a tarefa uma única vez para a chave, mesmo com chamadas concorrentes
+
+        Args:
+            key (str): Chave da tarefa
+            func (callable): Tarefa que gera o resultado
+            lock_path (str): Arquivo de trava para coordenar outros processos (opcional)
+            check (callable): Retorna o resultado já pronto ou None; consultado antes de
+                executar a tarefa e enquanto outro processo detém a trava
+
+        Returns:
+            Resultado da tarefa (ou de check)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        # Outra thread já está executando a tarefa: aguardar o resultado dela
+        if not leader:
+            if not call.event.wait(self.wait_timeout):
+                logger.warning(f"Tempo de espera esgotado para {key}; executando a tarefa")
+                return (check() if check else None) or func()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if lock_path:
+                call.result = self._do_with_lock_file(func, lock_path, check)
+            else:
+                call.result = (check() if check else None) or func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _do_with_lock_file(self, func, lock_path, check):
+        """
+        Executa a tarefa detendo o arquivo de trava ou aguarda o processo que o detém
+        """
+        deadline = time.time() + self.wait_timeout
+        while True:
+            if self._acquire(lock_path):
+                try:
+                    # O outro processo pode ter concluído a tarefa antes de liberar a trava
+                    result = check() if check else None
+                    if result is None:
+                        result = func()
+                    return result
+                finally:
+                    self._release(lock_path)
+
+            result = check() if check else None
+            if result is not None:
+                return result
+
+            if time.time() >= deadline:
+                logger.warning(f"Tempo de espera esgotado para a trava {lock_path}; executando a tarefa")
+                return func()
+
+            self._break_stale_lock(lock_path)
+            time.sleep(self.poll_interval)
+
+    def _acquire(self, lock_path):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            return self._acquire(lock_path)
+
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return True
+
+    def _release(self, lock_path):
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+    def _break_stale_lock(self, lock_path):
+        try:
+            age = time.time() - os.path.getmtime(lock_path)
+        except OSError:
+            return
+
+        if age > self.lock_timeout:
+            logger.warning(f"Removendo trava abandonada: {lock_path} ({age:.0f}s)")
+            self._release(lock_path)
+
+# Instância singleton do serviço
+single_flight = SingleFlight()
@@ -6,6 +6,7 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from apps.articles.models import Article, Comment, Tag
 from core.services.article_service import article_service, comment_service
+from core.services.view_counter import view_counter
 from unittest.mock import patch, MagicMock
 
 User = get_user_model()
@@ -85,6 +86,7 @@ class ArticleServiceTestCase(TestCase):
 
         # Visualizar o artigo
         article_service.view_article(self.article1.id)
+        view_counter.flush()
 
         # Verificar se a contagem de visualizações foi incrementada
         article = Article.objects.get(id=self.article1.id)
@@ -0,0 +1,169 @@
+"""
+Testes para as métricas dos caches
+"""
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from core.services.cache_metrics import CacheMetrics
+
+User = get_user_model()
+
+
+class CacheMetricsTestCase(SimpleTestCase):
+    """
+    Testes para os contadores e a exportação das métricas
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'metrics.sqlite3')
+        self.metrics = CacheMetrics(self.db_path)
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_counters(self):
+        """
+        Testa a contagem de acertos, falhas, gravações e remoções
+        """
+        self.metrics.record_miss('mangas_list')
+        self.metrics.record_fill('mangas_list', seconds=0.5)
+        self.metrics.record_fill('mangas_list', seconds=0.25, size=100)
+        self.metrics.record_hit('mangas_list')
+        self.metrics.record_hit('mangas_list')
+        self.metrics.record_hit('mangas_list')
+        self.metrics.record_eviction('mangas_list', 2)
+
+        stats = self.metrics.get_stats('mangas_list')
+        self.assertEqual((stats['hits'], stats['misses'], stats['fills']), (3, 1, 2))
+        self.assertEqual((stats['evictions'], stats['fill_bytes']), (2, 100))
+        self.assertAlmostEqual(stats['hit_ratio'], 0.75)
+        self.assertAlmostEqual(stats['fill_seconds_avg'], 0.375)
+        self.assertIsNone(stats['bytes'])
+
+        self.assertEqual(self.metrics.get_stats('desconhecido')['hits'], 0)
+
+    def test_counters_are_shared_between_instances(self):
+        """
+        Testa que os contadores de processos diferentes são somados no banco compartilhado
+        """
+        other = CacheMetrics(self.db_path)
+        self.metrics.record_hit('media')
+        other.record_hit('media')
+        other.flush()
+
+        self.assertEqual(self.metrics.get_stats('media')['hits'], 2)
+
+        self.metrics.reset('media')
+        self.assertEqual(other.get_stats('media')['hits'], 0)
+
+    def test_register_size(self):
+        """
+        Testa que o tamanho do cache é lido na consulta
+        """
+        self.metrics.register_size('media', lambda: (300, 1000))
+
+        stats = self.metrics.get_snapshot()['media']
+        self.assertEqual((stats['bytes'], stats['max_bytes']), (300, 1000))
+
+    def test_render_prometheus(self):
+        """
+        Testa a exportação no formato de texto do Prometheus
+        """
+        self.metrics.register_size('media', lambda: (300, 1000))
+        self.metrics.record_hit('media')
+        self.metrics.record_fill('books_list', seconds=0.5)
+
+        text = self.metrics.render_prometheus()
+        self.assertIn('# TYPE cache_hits_total counter', text)
+        self.assertIn('cache_hits_total{cache="media"} 1', text)
+        self.assertIn('cache_fills_total{cache="books_list"} 1', text)
+        self.assertIn('cache_fill_seconds_sum{cache="books_list"} 0.500000', text)
+        self.assertIn('cache_bytes{cache="media"} 300', text)
+        self.assertIn('cache_max_bytes{cache="media"} 1000', text)
+        self.assertNotIn('cache_bytes{cache="books_list"}', text)
+
+
+class CacheMetricsEndpointTestCase(TestCase):
+    """
+    Testes para o endpoint e o comando das métricas
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.metrics = CacheMetrics(os.path.join(self.temp_dir, 'metrics.sqlite3'))
+        self.metrics.record_hit('articles_list')
+        self.metrics.record_miss('articles_list')
+
+        self._patches = [
+            patch('core.views.cache_metrics', self.metrics),
+            patch('core.management.commands.cache_metrics.cache_metrics', self.metrics),
+        ]
+        for patcher in self._patches:
+            patcher.start()
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        for patcher in self._patches:
+            patcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @override_settings(CACHE_METRICS_TOKEN='segredo')
+    def test_endpoint_access(self):
+        """
+        Testa que apenas a equipe ou o coletor com o token acessam as métricas
+        """
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer errado').status_code, 403)
+
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('cache_hits_total{cache="articles_list"} 1', response.content.decode())
+
+        user = User.objects.create_user(
+            email='usuario@example.com', username='usuario', password='senha-segura-123'
+        )
+        self.client.force_login(user)
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.client.get('/metrics/').status_code, 200)
+
+    def test_endpoint_without_token(self):
+        """
+        Testa que, sem token configurado, o cabeçalho Authorization não libera o acesso
+        """
+        with override_settings(CACHE_METRICS_TOKEN=None):
+            response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer None')
+        self.assertEqual(response.status_code, 403)
+
+    def test_command(self):
+        """
+        Testa a exibição das métricas e a opção de zerar os contadores
+        """
+        out = StringIO()
+        call_command('cache_metrics', stdout=out)
+        self.assertIn('articles_list', out.getvalue())
+        self.assertIn('50.0%', out.getvalue())
+
+        out = StringIO()
+        call_command('cache_metrics', '--format', 'prometheus', '--reset', stdout=out)
+        self.assertIn('cache_misses_total{cache="articles_list"} 1', out.getvalue())
+        self.assertEqual(self.metrics.get_stats('articles_list')['hits'], 0)
@@ -0,0 +1,220 @@
+"""
+Testes para o gerenciador de cache em disco
+"""
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from apps.mangas.models import Manga, Chapter
+from core.services.disk_cache import DiskCache, POLICY_LFU
+from core.services.media_cache import MediaCache
+from core.services.cache_metrics import CacheMetrics
+
+
+class DiskCacheTestCase(SimpleTestCase):
+    """
+    Testes para o índice e a política de remoção do cache em disco
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = DiskCache(self.cache_dir, max_bytes=300)
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _write(self, name, size=100, owner='chapters/pdf/a.pdf', cache=None):
+        path = os.path.join(self.cache_dir, name)
+        with open(path, 'wb') as f:
+            f.write(b'0' * size)
+        (cache or self.cache).record_fill(path, owner=owner)
+        return path
+
+    def test_fill_over_budget_evicts_least_recently_used(self):
+        """
+        Testa que ultrapassar o limite remove os arquivos acessados há mais tempo
+        """
+        first = self._write('1.jpeg')
+        second = self._write('2.jpeg')
+        third = self._write('3.jpeg')
+
+        # O primeiro arquivo passa a ser o mais recente
+        with patch('core.services.disk_cache.time.time', return_value=9999999999):
+            self.cache.ACCESS_UPDATE_INTERVAL = 0
+            self.cache.record_access(first)
+
+        fourth = self._write('4.jpeg')
+
+        # A limpeza vai até 90% do limite: os dois arquivos mais antigos são removidos
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertFalse(os.path.exists(third))
+        self.assertTrue(os.path.exists(fourth))
+        self.assertEqual(self.cache.get_total_size(), 200)
+
+    def test_lfu_policy_evicts_least_used(self):
+        """
+        Testa que a política LFU remove os arquivos com menos acessos
+        """
+        cache = DiskCache(self.cache_dir, max_bytes=300, policy=POLICY_LFU)
+        cache.ACCESS_UPDATE_INTERVAL = 0
+
+        first = self._write('1.jpeg', cache=cache)
+        second = self._write('2.jpeg', cache=cache)
+        third = self._write('3.jpeg', cache=cache)
+        for path in (first, third):
+            cache.record_access(path)
+
+        self._write('4.jpeg', cache=cache)
+
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(first))
+
+    def test_repeated_access_is_throttled(self):
+        """
+        Testa que acessos repetidos dentro do intervalo não escrevem no índice
+        """
+        path = self._write('1.jpeg')
+
+        with patch.object(self.cache, '_connect') as connect:
+            self.cache.record_access(path)
+
+        connect.assert_not_called()
+
+    def test_usage_and_rebuild(self):
+        """
+        Testa o uso agrupado por origem e a reconstrução do índice a partir do diretório
+        """
+        self._write('1.jpeg', owner='chapters/pdf/a.pdf')
+        self._write('2.jpeg', owner='books/b.pdf')
+        with open(os.path.join(self.cache_dir, 'antigo.jpeg'), 'wb') as f:
+            f.write(b'0' * 50)
+
+        self.assertEqual(self.cache.get_total_size(), 200)
+
+        self.assertEqual(self.cache.rebuild(), 3)
+        self.assertEqual(self.cache.get_total_size(), 250)
+        self.assertIn(('books/b.pdf', 1, 100), self.cache.get_usage_by_owner())
+
+    def test_running_total_avoids_summing_index(self):
+        """
+        Testa que as gravações atualizam o total corrente sem somar o índice a cada arquivo
+        """
+        self._write('1.jpeg')
+        with patch.object(self.cache, 'get_total_size', side_effect=AssertionError('SUM no índice')):
+            self._write('2.jpeg')
+            # Regravar um arquivo soma apenas a diferença de tamanho
+            self._write('1.jpeg', size=50)
+            self.assertEqual(self.cache._get_running_total(), 150)
+
+        self.assertEqual(self.cache.get_total_size(), 150)
+
+        # Passado o intervalo, o total é recalculado no índice (gravações de outros processos)
+        self._write('3.jpeg', cache=DiskCache(self.cache_dir, max_bytes=300))
+        self.assertEqual(self.cache._get_running_total(), 150)
+        self.cache._total_synced_at = 0
+        self.assertEqual(self.cache._get_running_total(), 250)
+
+    def test_files_outside_directory_are_ignored(self):
+        """
+        Testa que arquivos fora do diretório do cache não são indexados
+        """
+        other_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_dir, ignore_errors=True)
+        path = os.path.join(other_dir, 'fora.jpeg')
+        with open(path, 'wb') as f:
+            f.write(b'0' * 10)
+
+        self.cache.record_fill(path)
+
+        self.assertEqual(self.cache.get_total_size(), 0)
+
+    def test_index_outside_directory(self):
+        """
+        Testa o índice fora do diretório do cache (diretórios servidos publicamente)
+        """
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, ignore_errors=True)
+        cache = DiskCache(self.cache_dir, max_bytes=300, index_path=os.path.join(index_dir, 'indice', 'cache.sqlite3'))
+
+        self._write('1.jpeg', cache=cache)
+        self.assertEqual(os.listdir(self.cache_dir), ['1.jpeg'])
+        self.assertTrue(os.path.exists(cache.index_path))
+        self.assertEqual(cache.rebuild(), 1)
+
+        cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        self.assertEqual(cache.get_total_size(), 0)
+
+    def test_internal_stores_are_not_served(self):
+        """
+        Testa que os índices e os contadores internos não ficam no MEDIA_ROOT servido publicamente
+        """
+        media_root = os.path.join(os.path.abspath(settings.MEDIA_ROOT), '')
+        for path in (
+            settings.CACHE_METRICS_DB, settings.FILE_FINGERPRINT_INDEX, settings.PDF_INDEX_DIR, settings.MEDIA_CACHE_INDEX
+        ):
+            self.assertFalse(os.path.abspath(path).startswith(media_root), path)
+
+
+class MediaCacheCommandTestCase(TestCase):
+    """
+    Testes para o comando de gerenciamento do cache de mídia
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.cache_dir = tempfile.mkdtemp()
+        media_cache = MediaCache(
+            self.cache_dir, max_bytes=1000, metrics=CacheMetrics(os.path.join(self.cache_dir, 'metrics.sqlite3'))
+        )
+        self.cache = media_cache.disk
+        self._cache = patch('core.management.commands.media_cache.media_cache', media_cache)
+        self._cache.start()
+
+        manga = Manga.objects.create(title='One Piece', description='Descrição')
+        Chapter.objects.create(
+            manga=manga, title='Capítulo 1', number=1, chapter_type='pdf', pdf_file_path='chapters/pdf/op-1.pdf'
+        )
+
+        for index in range(3):
+            path = os.path.join(self.cache_dir, f'{index}.jpeg')
+            with open(path, 'wb') as f:
+                f.write(b'0' * 200)
+            self.cache.record_fill(path, owner='chapters/pdf/op-1.pdf')
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        self._cache.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_usage_by_manga(self):
+        """
+        Testa a exibição do uso agrupado por mangá
+        """
+        out = StringIO()
+        call_command('media_cache', 'usage', stdout=out)
+
+        self.assertIn('Mangá: One Piece', out.getvalue())
+        self.assertIn('3 arquivos', out.getvalue())
+
+    def test_trim(self):
+        """
+        Testa a remoção de arquivos até o limite informado
+        """
+        call_command('media_cache', 'trim', '--max-bytes', '250', stdout=StringIO())
+
+        self.assertEqual(self.cache.get_total_size(), 200)
@@ -0,0 +1,80 @@
+"""
+Testes para o índice de hashes de conteúdo dos arquivos
+"""
+
+import os
+import shutil
+import hashlib
+import tempfile
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from core.services import file_fingerprint
+from core.services.file_fingerprint import FileFingerprintIndex
+
+
+class FileFingerprintIndexTestCase(SimpleTestCase):
+    """
+    Testes para o cálculo único e a invalidação dos hashes
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, 'fingerprints.sqlite3')
+        self.file_path = os.path.join(self.temp_dir, 'livro.pdf')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'%PDF-1.4' + b'0' * 3000000)
+
+        self.index = FileFingerprintIndex(index_path=self.index_path)
+        self._compute = patch.object(
+            file_fingerprint, 'compute_file_hash', wraps=file_fingerprint.compute_file_hash
+        )
+        self.compute = self._compute.start()
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        self._compute.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_hash_is_computed_once(self):
+        """
+        Testa que consultas repetidas não releem o arquivo
+        """
+        file_hash = self.index.get_hash(self.file_path)
+        self.assertEqual(self.index.get_hash(self.file_path), file_hash)
+
+        self.assertEqual(self.compute.call_count, 1)
+        if not file_fingerprint.XXHASH_AVAILABLE:
+            with open(self.file_path, 'rb') as f:
+                self.assertEqual(file_hash, hashlib.blake2b(f.read(), digest_size=16).hexdigest())
+
+    def test_persisted_hash_survives_restart(self):
+        """
+        Testa que uma nova instância usa o hash gravado no índice
+        """
+        file_hash = self.index.get_hash(self.file_path)
+
+        index = FileFingerprintIndex(index_path=self.index_path)
+        self.assertEqual(index.get_hash(self.file_path), file_hash)
+        self.assertEqual(self.compute.call_count, 1)
+
+    def test_changed_file_is_rehashed(self):
+        """
+        Testa que a alteração do arquivo invalida o hash
+        """
+        file_hash = self.index.get_hash(self.file_path)
+
+        with open(self.file_path, 'ab') as f:
+            f.write(b'novo conteudo')
+
+        self.assertNotEqual(self.index.get_hash(self.file_path), file_hash)
+        self.assertEqual(self.compute.call_count, 2)
+
+    def test_missing_file(self):
+        """
+        Testa a consulta de um arquivo inexistente
+        """
+        self.assertIsNone(self.index.get_hash(os.path.join(self.temp_dir, 'inexistente.pdf')))
@@ -0,0 +1,46 @@
+"""
+Testes para a escolha do formato das imagens das páginas
+"""
+
+import unittest
+from django.test import SimpleTestCase
+from core.services import image_codecs
+
+
+class ImageCodecsTestCase(SimpleTestCase):
+    """
+    Testes para a negociação de formato pelo cabeçalho Accept
+    """
+    def test_negotiate_prefers_modern_formats(self):
+        """
+        Testa a preferência por AVIF e WebP quando o navegador os aceita
+        """
+        chrome_accept = 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8'
+        expected = 'AVIF' if 'AVIF' in image_codecs.SUPPORTED_FORMATS else 'WEBP'
+
+        self.assertEqual(image_codecs.negotiate_format(chrome_accept), expected)
+
+    @unittest.skipUnless('WEBP' in image_codecs.SUPPORTED_FORMATS, "Pillow sem suporte a WebP")
+    def test_negotiate_webp(self):
+        """
+        Testa a escolha do WebP e a recusa explícita com q=0
+        """
+        self.assertEqual(image_codecs.negotiate_format('image/webp,*/*'), 'WEBP')
+        self.assertEqual(image_codecs.negotiate_format('image/avif;q=0, image/webp'), 'WEBP')
+        self.assertEqual(image_codecs.negotiate_format('image/webp;q=0, */*'), 'JPEG')
+
+    def test_negotiate_falls_back_to_default(self):
+        """
+        Testa o formato padrão para clientes sem suporte a formatos modernos
+        """
+        self.assertEqual(image_codecs.negotiate_format('*/*'), 'JPEG')
+        self.assertEqual(image_codecs.negotiate_format(None), 'JPEG')
+        self.assertEqual(image_codecs.negotiate_format('application/json', default='PNG'), 'PNG')
+
+    def test_save_options(self):
+        """
+        Testa os argumentos de gravação de cada formato
+        """
+        self.assertEqual(image_codecs.get_save_options('webp')['quality'], 80)
+        self.assertEqual(image_codecs.get_save_options('JPEG', 90)['quality'], 90)
+        self.assertEqual(image_codecs.get_save_options('PNG'), {'format': 'PNG'})
@@ -0,0 +1,160 @@
+"""
+Testes para o cache das listagens
+"""
+
+import threading
+import time
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase
+from apps.articles.models import Article, Tag
+from core.services.list_cache import ListCache, list_cache
+
+
+class ListCacheTestCase(TestCase):
+    """
+    Testes para as versões das listagens
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.article = Article.objects.create(title='Primeiro artigo', content='Conteúdo do artigo')
+
+    def test_key_changes_with_version(self):
+        """
+        Testa que a chave das respostas muda a cada nova versão
+        """
+        key = list_cache.get_key('articles_list', 'page=2')
+        self.assertEqual(list_cache.get_key('articles_list', 'page=2'), key)
+        self.assertNotEqual(list_cache.get_key('articles_list', 'page=3'), key)
+
+        list_cache.bump('articles_list')
+        self.assertNotEqual(list_cache.get_key('articles_list', 'page=2'), key)
+
+    def test_lost_version_is_not_reused(self):
+        """
+        Testa que uma versão removida do cache recomeça acima das versões anteriores
+        """
+        version = list_cache.get_version('articles_list')
+        cache.delete('articles_list_version')
+        self.assertGreater(list_cache.get_version('articles_list'), version)
+
+        cache.delete('articles_list_version')
+        list_cache.bump('articles_list')
+        self.assertGreater(list_cache.get_version('articles_list'), version)
+
+    def test_model_changes_bump_version(self):
+        """
+        Testa que criação, alteração, remoção e relações ManyToMany invalidam a listagem
+        """
+        def assert_bumped(change):
+            version = list_cache.get_version('articles_list')
+            change()
+            self.assertGreater(list_cache.get_version('articles_list'), version)
+
+        assert_bumped(lambda: Article.objects.create(title='Segundo artigo', content='Conteúdo do artigo'))
+        assert_bumped(lambda: Article.objects.filter(pk=self.article.pk).first().save())
+
+        tag = Tag.objects.create(name='Python')
+        assert_bumped(lambda: self.article.tags.add(tag))
+        assert_bumped(lambda: self.article.tags.remove(tag))
+        assert_bumped(lambda: self.article.delete())
+
+        # Outras listagens não são afetadas
+        version = list_cache.get_version('books_list')
+        Article.objects.create(title='Terceiro artigo', content='Conteúdo do artigo')
+        self.assertEqual(list_cache.get_version('books_list'), version)
+
+    def test_bump_after_commit(self):
+        """
+        Testa que a versão é incrementada de novo quando a transação é confirmada
+        """
+        version = list_cache.get_version('articles_list')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = 'Título alterado'
+            self.article.save()
+            self.assertEqual(list_cache.get_version('articles_list'), version + 1)
+
+        self.assertEqual(list_cache.get_version('articles_list'), version + 2)
+
+
+class StaleWhileRevalidateTestCase(TestCase):
+    """
+    Testes para a regeneração das respostas em cache
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.list_cache = ListCache(timeout=60, soft_timeout=30)
+        self.calls = []
+
+    def compute(self, value='atual'):
+        self.calls.append(value)
+        return {'count': 1, 'results': [{'id': 1, 'title': value}]}
+
+    def expire(self, query_string=''):
+        key = self.list_cache.get_key('mangas_list', query_string)
+        entry = cache.get(key)
+        entry['fresh_until'] = time.time() - 1
+        cache.set(key, entry)
+
+    def test_stale_entry_is_served_while_one_refresh_runs(self):
+        """
+        Testa que a resposta antiga é servida e apenas uma regeneração é agendada
+        """
+        entry = self.list_cache.get('mangas_list', '', lambda: self.compute('antigo'))
+        self.expire()
+
+        with patch.object(self.list_cache, 'schedule_refresh') as schedule_refresh:
+            for _ in range(3):
+                stale = self.list_cache.get('mangas_list', '', lambda: self.compute('novo'))
+                self.assertEqual(stale['data'], entry['data'])
+
+        self.assertEqual(schedule_refresh.call_count, 1)
+        self.assertEqual(self.calls, ['antigo'])
+
+        # Executar a regeneração agendada
+        self.list_cache._refresh(*schedule_refresh.call_args.args)
+        fresh = self.list_cache.get('mangas_list', '', lambda: self.compute('outro'))
+        self.assertEqual(fresh['data']['results'][0]['title'], 'novo')
+        self.assertNotEqual(fresh['etag'], entry['etag'])
+
+        # A trava foi liberada para a próxima regeneração
+        self.expire()
+        with patch.object(self.list_cache, 'schedule_refresh') as schedule_refresh:
+            self.list_cache.get('mangas_list', '', self.compute)
+        self.assertEqual(schedule_refresh.call_count, 1)
+
+    def test_concurrent_misses_compute_once(self):
+        """
+        Testa que falhas simultâneas da mesma chave geram a resposta uma única vez
+        """
+        def slow_compute():
+            time.sleep(0.1)
+            return self.compute()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.list_cache.get('mangas_list', 'page=1', slow_compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len({entry['etag'] for entry in results}), 1)
+
+    def test_force_regenerates(self):
+        """
+        Testa que force ignora a resposta em cache
+        """
+        self.list_cache.get('mangas_list', '', lambda: self.compute('antigo'))
+        entry = self.list_cache.get('mangas_list', '', lambda: self.compute('novo'), force=True)
+        self.assertEqual(entry['data']['results'][0]['title'], 'novo')
+        self.assertEqual(self.list_cache.get('mangas_list', '', self.compute)['data'], entry['data'])
@@ -0,0 +1,230 @@
+"""
+Testes para o cache unificado de mídia
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+from django.test import SimpleTestCase, override_settings
+from core.services.file_fingerprint import FileFingerprintIndex
+from core.services.cache_metrics import CacheMetrics
+from core.services.media_cache import MediaCache, get_page_artifact
+from core.services.cache_service import CacheService
+from core.services import pdf_service as pdf_service_module
+from apps.mangas import pdf_converter
+
+
+class MediaCacheTestCase(SimpleTestCase):
+    """
+    Testes para as chaves, a gravação e os contadores do cache
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_path = os.path.join(self.temp_dir, 'livro.pdf')
+        with open(self.source_path, 'wb') as f:
+            f.write(b'%PDF-1.4 original')
+
+        self.fingerprints = FileFingerprintIndex(os.path.join(self.temp_dir, 'fingerprints.sqlite3'))
+        self.metrics = CacheMetrics(os.path.join(self.temp_dir, 'metrics.sqlite3'))
+        self.cache = MediaCache(
+            os.path.join(self.temp_dir, 'cache'), max_bytes=0, fingerprints=self.fingerprints, metrics=self.metrics
+        )
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_key_follows_content(self):
+        """
+        Testa que a chave vem do conteúdo: cópias compartilham artefatos e edições os invalidam
+        """
+        path = self.cache.get_path(self.source_path, 'info.json')
+        source_hash = self.fingerprints.get_hash(self.source_path)
+        self.assertEqual(path, os.path.join(self.cache.directory, source_hash[:2], source_hash, 'info.json'))
+
+        copy_path = os.path.join(self.temp_dir, 'copia.pdf')
+        shutil.copyfile(self.source_path, copy_path)
+        self.assertEqual(self.cache.get_path(copy_path, 'info.json'), path)
+
+        with open(self.source_path, 'wb') as f:
+            f.write(b'%PDF-1.4 nova edicao')
+        self.assertNotEqual(self.cache.get_path(self.source_path, 'info.json'), path)
+
+        self.assertIsNone(self.cache.get_path(os.path.join(self.temp_dir, 'inexistente.pdf'), 'info.json'))
+
+    def test_get_or_create_fills_once(self):
+        """
+        Testa que gerações simultâneas do mesmo artefato são executadas uma única vez
+        """
+        calls = []
+
+        def fill(f):
+            calls.append(1)
+            time.sleep(0.1)
+            f.write(b'imagem')
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get_or_create(self.source_path, 'page1.jpeg', fill)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(results)), 1)
+        with open(results[0], 'rb') as f:
+            self.assertEqual(f.read(), b'imagem')
+
+        # Nenhum temporário ou trava deve permanecer ao lado do artefato
+        self.assertEqual(os.listdir(os.path.dirname(results[0])), ['page1.jpeg'])
+
+        self.cache.get_or_create(self.source_path, 'page1.jpeg', fill)
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['fills'], stats['bytes']), (1, len(b'imagem')))
+        self.assertGreaterEqual(stats['hits'], 1)
+
+    def test_failed_fill_leaves_no_file(self):
+        """
+        Testa que uma geração com erro não deixa um artefato parcial
+        """
+        def fill(f):
+            f.write(b'parcial')
+            raise ValueError('falha')
+
+        with self.assertRaises(ValueError):
+            self.cache.get_or_create(self.source_path, 'page1.jpeg', fill)
+
+        self.assertFalse(self.cache.contains(self.source_path, 'page1.jpeg'))
+        self.assertEqual(self.cache.get_stats()['bytes'], 0)
+
+    def test_get_json(self):
+        """
+        Testa que os dados são calculados uma vez e que resultados None não são guardados
+        """
+        compute_calls = []
+
+        def compute():
+            compute_calls.append(1)
+            return {'total_pages': 3}
+
+        self.assertEqual(self.cache.get_json(self.source_path, 'info.json', compute), {'total_pages': 3})
+        self.assertEqual(self.cache.get_json(self.source_path, 'info.json', compute), {'total_pages': 3})
+        self.assertEqual(len(compute_calls), 1)
+
+        self.assertIsNone(self.cache.get_json(self.source_path, 'vazio.json', lambda: None))
+        self.assertFalse(self.cache.contains(self.source_path, 'vazio.json'))
+
+    def test_eviction(self):
+        """
+        Testa que o limite de tamanho remove os artefatos menos usados
+        """
+        cache = MediaCache(
+            os.path.join(self.temp_dir, 'limitado'), max_bytes=250, fingerprints=self.fingerprints,
+            name='limitado', metrics=self.metrics
+        )
+        for page_number in range(3):
+            cache.get_or_create(self.source_path, f"page{page_number}.jpeg", lambda f: f.write(b'0' * 100))
+
+        stats = cache.get_stats()
+        self.assertLessEqual(stats['bytes'], 250)
+        self.assertGreaterEqual(stats['evictions'], 1)
+        self.assertFalse(cache.contains(self.source_path, 'page0.jpeg'))
+        self.assertTrue(cache.contains(self.source_path, 'page2.jpeg'))
+
+
+    def test_clear_by_type(self):
+        """
+        Testa que limpar o cache de um tipo remove apenas os artefatos desse tipo
+        """
+        service = CacheService()
+        service.media_cache = self.cache
+        write = lambda f: f.write(b'0' * 10)
+        for artifact in ('page1_200dpi_q85.jpeg', 'page1_text.json', 'pdf_info.json', 'audio_info.json'):
+            self.cache.get_or_create(self.source_path, artifact, write)
+
+        service.clear_cache('audio')
+        self.assertFalse(self.cache.contains(self.source_path, 'audio_info.json'))
+        self.assertTrue(self.cache.contains(self.source_path, 'page1_200dpi_q85.jpeg'))
+        self.assertEqual(self.cache.disk.get_total_size(), 30)
+
+        self.cache.get_or_create(self.source_path, 'audio_info.json', write)
+        service.clear_cache('pdf')
+        self.assertEqual(
+            [self.cache.contains(self.source_path, artifact) for artifact in ('page1_text.json', 'pdf_info.json')],
+            [False, False]
+        )
+        self.assertTrue(self.cache.contains(self.source_path, 'audio_info.json'))
+
+        service.clear_cache()
+        self.assertEqual(self.cache.disk.get_total_size(), 0)
+
+
+class SharedPageCacheTestCase(SimpleTestCase):
+    """
+    Testes para o compartilhamento das páginas entre o conversor dos mangás e o serviço de PDF
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.media_root = tempfile.mkdtemp()
+        self.pdf_path = 'books/livro.pdf'
+        os.makedirs(os.path.join(self.media_root, 'books'))
+        with open(os.path.join(self.media_root, self.pdf_path), 'wb') as f:
+            f.write(b'%PDF-1.4')
+
+        self._settings = override_settings(MEDIA_ROOT=self.media_root)
+        self._settings.enable()
+
+        self.cache = MediaCache(
+            os.path.join(self.media_root, 'media_cache'),
+            fingerprints=FileFingerprintIndex(os.path.join(self.media_root, 'fingerprints.sqlite3')),
+            metrics=CacheMetrics(os.path.join(self.media_root, 'metrics.sqlite3'))
+        )
+        self._patches = [
+            patch.object(pdf_converter, 'media_cache', self.cache),
+            patch.object(pdf_service_module, 'media_cache', self.cache),
+        ]
+        for patcher in self._patches:
+            patcher.start()
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        for patcher in self._patches:
+            patcher.stop()
+        self._settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_page_is_rendered_once(self):
+        """
+        A mesma página pedida pelos dois caminhos deve ser rasterizada uma única vez
+        """
+        from PIL import Image
+
+        renderer = patch.object(pdf_converter, 'get_renderer')
+        get_renderer = renderer.start()
+        self.addCleanup(renderer.stop)
+        get_renderer.return_value.render_page.return_value = Image.new('RGB', (10, 10))
+
+        with patch.object(pdf_service_module, 'get_renderer', get_renderer):
+            converter_path = pdf_converter.convert_pdf_page_to_image(self.pdf_path, 1)
+            service_path = pdf_service_module.pdf_service.get_page_image_path(
+                os.path.join(self.media_root, self.pdf_path), 1
+            )
+
+        self.assertEqual(get_renderer.return_value.render_page.call_count, 1)
+        self.assertEqual(os.path.join(self.media_root, converter_path), service_path)
+        self.assertTrue(service_path.endswith(get_page_artifact(1, '200dpi')))
@@ -0,0 +1,107 @@
+"""
+Testes para o índice de metadados de PDF
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from core.services import pdf_index_service as pdf_index_module
+from core.services.pdf_index_service import PDFIndexService
+
+try:
+    from PyPDF2 import PdfWriter
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+
+@unittest.skipUnless(PYPDF2_AVAILABLE, "PyPDF2 é necessário para os testes do índice")
+class PDFIndexServiceTestCase(SimpleTestCase):
+    """
+    Testes para o serviço de índice de metadados de PDF
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_dir = os.path.join(self.temp_dir, 'index')
+        self.pdf_path = os.path.join(self.temp_dir, 'livro.pdf')
+        self._write_pdf(3)
+
+        self.service = PDFIndexService(index_dir=self.index_dir)
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_pdf(self, total_pages):
+        writer = PdfWriter()
+        for _ in range(total_pages):
+            writer.add_blank_page(width=595, height=842)
+        writer.add_metadata({'/Title': 'Livro de Teste'})
+        writer.add_outline_item('Capítulo 1', 0)
+        with open(self.pdf_path, 'wb') as f:
+            writer.write(f)
+
+    def test_index_pdf(self):
+        """
+        Testa a extração dos metadados do PDF
+        """
+        info = self.service.get_info(self.pdf_path)
+
+        self.assertEqual(info['total_pages'], 3)
+        self.assertEqual(info['page_sizes'][0], [595.0, 842.0])
+        self.assertEqual(info['metadata']['/Title'], 'Livro de Teste')
+        self.assertEqual(info['outline'], [{'title': 'Capítulo 1', 'page': 1}])
+        self.assertEqual(info['file_name'], 'livro.pdf')
+
+    def test_persisted_index_does_not_open_pdf(self):
+        """
+        Testa que uma nova instância lê o índice gravado em disco sem abrir o PDF
+        """
+        self.service.get_info(self.pdf_path)
+
+        service = PDFIndexService(index_dir=self.index_dir)
+        with patch.object(pdf_index_module.PyPDF2, 'PdfReader') as mock_reader:
+            info = service.get_info(self.pdf_path)
+
+        mock_reader.assert_not_called()
+        self.assertEqual(info['total_pages'], 3)
+
+    def test_changed_file_is_reindexed(self):
+        """
+        Testa que a alteração do arquivo invalida a entrada do índice
+        """
+        self.service.get_info(self.pdf_path)
+
+        self._write_pdf(5)
+        stat = os.stat(self.pdf_path)
+        os.utime(self.pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+        info = self.service.get_info(self.pdf_path)
+        self.assertEqual(info['total_pages'], 5)
+
+    def test_missing_file(self):
+        """
+        Testa a consulta de um arquivo inexistente
+        """
+        self.assertIsNone(self.service.get_info(os.path.join(self.temp_dir, 'inexistente.pdf')))
+        self.assertIsNone(self.service.get_info(self.pdf_path, build=False))
+
+    def test_schedule_index(self):
+        """
+        Testa que a indexação em segundo plano não guarda os metadados no resultado da tarefa
+        e não é enfileirada de novo para um PDF já indexado
+        """
+        future = self.service.schedule_index(self.pdf_path)
+        self.assertIsNone(future.result(timeout=5))
+        self.assertEqual(self.service.get_info(self.pdf_path, build=False)['total_pages'], 3)
+
+        self.assertIsNone(self.service.schedule_index(self.pdf_path))
+        self.assertEqual(self.service._indexing, set())
@@ -0,0 +1,142 @@
+"""
+Testes para o pool de documentos PDF abertos
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from core.services import pdf_reader_pool as pool_module
+from core.services.pdf_reader_pool import PdfReaderPool
+
+try:
+    import PyPDF2
+    from PyPDF2 import PdfWriter
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+
+@unittest.skipUnless(PYPDF2_AVAILABLE, "PyPDF2 é necessário para os testes do pool")
+class PdfReaderPoolTestCase(SimpleTestCase):
+    """
+    Testes para o empréstimo e a remoção dos documentos do pool
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = [self._write_pdf(f'livro-{index}.pdf', 3) for index in range(3)]
+        self.pool = PdfReaderPool(max_readers=2)
+
+        self._reader_class = patch.object(pool_module.PyPDF2, 'PdfReader', wraps=PyPDF2.PdfReader)
+        self.reader_class = self._reader_class.start()
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        self._reader_class.stop()
+        self.pool.clear()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_pdf(self, name, total_pages):
+        path = os.path.join(self.temp_dir, name)
+        writer = PdfWriter()
+        for _ in range(total_pages):
+            writer.add_blank_page(width=595, height=842)
+        with open(path, 'wb') as f:
+            writer.write(f)
+        return path
+
+    def test_reader_is_reused(self):
+        """
+        Testa que consultas seguintes ao mesmo PDF não o reabrem
+        """
+        for _ in range(3):
+            with self.pool.checkout(self.paths[0]) as reader:
+                self.assertEqual(len(reader.pages), 3)
+
+        self.assertEqual(self.reader_class.call_count, 1)
+
+    def test_changed_file_is_reopened(self):
+        """
+        Testa que a alteração do arquivo invalida o documento aberto
+        """
+        with self.pool.checkout(self.paths[0]):
+            pass
+
+        self._write_pdf('livro-0.pdf', 5)
+        stat = os.stat(self.paths[0])
+        os.utime(self.paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+        with self.pool.checkout(self.paths[0]) as reader:
+            self.assertEqual(len(reader.pages), 5)
+        self.assertEqual(self.reader_class.call_count, 2)
+
+    def test_least_recently_used_reader_is_closed(self):
+        """
+        Testa que, acima do limite, o documento usado há mais tempo é fechado
+        """
+        files = []
+        for path in self.paths:
+            with self.pool.checkout(path) as reader:
+                files.append(reader.stream)
+
+        self.assertEqual(len(self.pool), 2)
+        self.assertTrue(files[0].closed)
+        self.assertFalse(files[2].closed)
+
+    def test_borrowed_reader_is_closed_on_release(self):
+        """
+        Testa que um documento removido enquanto emprestado só é fechado na devolução
+        """
+        with self.pool.checkout(self.paths[0]) as reader:
+            self.pool.clear()
+            self.assertFalse(reader.stream.closed)
+
+        self.assertTrue(reader.stream.closed)
+
+    def test_checkout_is_exclusive(self):
+        """
+        Testa que duas threads não usam o mesmo documento ao mesmo tempo
+        """
+        active = []
+        overlaps = []
+
+        def worker():
+            with self.pool.checkout(self.paths[0]):
+                active.append(1)
+                if len(active) > 1:
+                    overlaps.append(1)
+                time.sleep(0.01)
+                active.pop()
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(overlaps, [])
+
+    def test_page_text_reuses_reader(self):
+        """
+        Testa que a extração de texto de várias páginas abre o PDF uma única vez
+        """
+        from core.services.pdf_service import PDFService
+
+        cache.clear()
+        with patch('core.services.pdf_service.pdf_reader_pool', self.pool):
+            service = PDFService()
+            for page_number in (1, 2, 3):
+                service.get_page_text(self.paths[1], page_number)
+            self.assertIsNone(service.get_page_text(self.paths[1], 4))
+
+        self.assertEqual(self.reader_class.call_count, 1)
@@ -0,0 +1,166 @@
+"""
+Testes para os backends de rasterização de páginas de PDF
+"""
+
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from PIL import Image
+from django.test import SimpleTestCase, override_settings
+from core.services import pdf_renderers
+from core.services.pdf_renderers import InProcessRenderer, PopplerRenderer, get_renderer
+
+
+class FakeDocument(list):
+    """Documento simulado: uma lista com a largura das páginas em pontos."""
+
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRenderer(InProcessRenderer):
+    """Backend em processo que conta as aberturas de documentos."""
+
+    name = 'fake'
+
+    def __init__(self, max_open_documents=None):
+        super().__init__(max_open_documents)
+        self.opened = []
+
+    def is_available(self):
+        return True
+
+    def _open_document(self, pdf_path):
+        document = FakeDocument([595, 595, 595])
+        self.opened.append(document)
+        return document
+
+    def _render(self, document, page_number, dpi, width):
+        scale = self._get_scale(document[page_number - 1], dpi, width)
+        return Image.new('RGB', (round(595 * scale), round(842 * scale)), 'white')
+
+
+class InProcessRendererTestCase(SimpleTestCase):
+    """
+    Testes para os documentos mantidos abertos pelos backends em processo
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+            path = os.path.join(self.directory, name)
+            with open(path, 'wb') as f:
+                f.write(b'%PDF-1.4')
+            self.paths.append(path)
+
+        self.renderer = FakeRenderer(max_open_documents=2)
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_document_is_kept_open(self):
+        """
+        Páginas do mesmo PDF devem ser rasterizadas sem reabrir o documento
+        """
+        for page_number in (1, 2, 3):
+            self.renderer.render_page(self.paths[0], page_number)
+
+        self.assertEqual(len(self.renderer.opened), 1)
+
+    def test_changed_file_is_reopened(self):
+        """
+        Um PDF substituído deve ser reaberto e o documento antigo fechado
+        """
+        self.renderer.render_page(self.paths[0], 1)
+        with open(self.paths[0], 'ab') as f:
+            f.write(b'\n%%EOF')
+
+        self.renderer.render_page(self.paths[0], 1)
+
+        self.assertEqual(len(self.renderer.opened), 2)
+        self.assertTrue(self.renderer.opened[0].closed)
+
+    def test_least_recently_used_document_is_closed(self):
+        """
+        Acima do limite, o documento usado há mais tempo é fechado
+        """
+        for path in self.paths:
+            self.renderer.render_page(path, 1)
+
+        self.assertTrue(self.renderer.opened[0].closed)
+        self.assertFalse(self.renderer.opened[2].closed)
+
+    def test_width_overrides_dpi(self):
+        """
+        A largura pedida define a escala da rasterização
+        """
+        image = self.renderer.render_page(self.paths[0], 1, width=1190)
+        self.assertEqual(image.size, (1190, 1684))
+
+        with self.assertRaises(ValueError):
+            self.renderer.render_page(self.paths[0], 4)
+
+    def test_render_pages_to_files(self):
+        """
+        A conversão em lote grava uma imagem por página no formato pedido
+        """
+        results = self.renderer.render_pages_to_files(self.paths[0], self.directory, 2, format='PNG', width=100)
+
+        self.assertEqual(sorted(results), [2, 3])
+        with Image.open(results[2]) as image:
+            self.assertEqual((image.format, image.width), ('PNG', 100))
+
+
+class GetRendererTestCase(SimpleTestCase):
+    """
+    Testes para a escolha do backend nas configurações
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self._renderers = patch.object(pdf_renderers, '_renderers', {})
+        self._renderers.start()
+
+    def tearDown(self):
+        """
+        Restaura as instâncias compartilhadas
+        """
+        self._renderers.stop()
+
+    @override_settings(PDF_RENDERER_BACKEND='poppler')
+    def test_default_backend(self):
+        """
+        O Poppler é o backend padrão e a instância é compartilhada
+        """
+        self.assertIsInstance(get_renderer(), PopplerRenderer)
+        self.assertIs(get_renderer(), get_renderer('poppler'))
+
+    @override_settings(PDF_RENDERER_BACKEND='pdfium')
+    def test_missing_backend_falls_back_to_poppler(self):
+        """
+        Um backend sem o pacote instalado é substituído pelo Poppler
+        """
+        with patch.object(pdf_renderers, 'PDFIUM_AVAILABLE', False):
+            self.assertIsInstance(get_renderer(), PopplerRenderer)
+
+    def test_poppler_batch_maps_output_files(self):
+        """
+        Os arquivos gerados pelo pdftoppm são associados aos números das páginas
+        """
+        output_paths = ['/tmp/saida/page-08.jpg', '/tmp/saida/page-09.jpg', '/tmp/saida/outro.jpg']
+
+        with patch.object(pdf_renderers, 'convert_from_path', return_value=output_paths) as convert_from_path:
+            results = PopplerRenderer().render_pages_to_files('/tmp/a.pdf', '/tmp/saida', 8, 9, quality=85)
+
+        self.assertEqual(results, {8: output_paths[0], 9: output_paths[1]})
+        self.assertEqual(convert_from_path.call_args.kwargs['jpegopt'], {'quality': 85})
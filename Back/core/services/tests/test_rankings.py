@@ -0,0 +1,211 @@
+"""
+Testes para os rankings de popularidade e tendência
+"""
+
+from io import StringIO
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.articles.models import Article
+from apps.categories.models import Category
+from apps.mangas.models import Manga, MangaView
+from apps.rankings.models import RankingEntry, RankingState
+from core.repositories.article_repository import article_repository
+from core.services.rankings import Rankings, rankings
+
+User = get_user_model()
+
+
+class RankingsTestCase(TestCase):
+    """
+    Testes para a geração e a leitura dos rankings
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.rankings = Rankings(size=2, cache_timeout=60, half_life=3600)
+        self.mangas = {
+            title: Manga.objects.create(title=title, description='Descrição', genres=genres, views_count=views)
+            for title, genres, views in (
+                ('Antigo Sucesso', 'Ação, Aventura', 100),
+                ('Novo Sucesso', 'Ação', 10),
+                ('Romance Calmo', 'Romance, Slice of Life', 50),
+            )
+        }
+
+    def tearDown(self):
+        """
+        Remove os rankings do cache
+        """
+        cache.clear()
+
+    def set_views(self, title, views):
+        Manga.objects.filter(pk=self.mangas[title].pk).update(views_count=views)
+
+    def age_state(self, seconds):
+        RankingState.objects.filter(content_type='manga').update(
+            updated_at=F('updated_at') - timedelta(seconds=seconds)
+        )
+
+    def titles(self, kind='popular', category=None):
+        return [
+            Manga.objects.get(pk=pk).title for pk in self.rankings.get_ids('manga', kind, category)
+        ]
+
+    def test_popular_overall_and_by_genre(self):
+        """
+        Testa os N itens mais vistos no total e por gênero
+        """
+        self.assertEqual(self.rankings.refresh('manga'), 3)
+
+        self.assertEqual(self.titles(), ['Antigo Sucesso', 'Romance Calmo'])
+        self.assertEqual(self.titles(category='Ação'), ['Antigo Sucesso', 'Novo Sucesso'])
+        self.assertEqual(self.titles(category='slice-of-life'), ['Romance Calmo'])
+        self.assertEqual(self.titles(category='Terror'), [])
+
+    def test_trending_decays_over_time(self):
+        """
+        Testa que a tendência reflete as visualizações recentes e decai com o tempo
+        """
+        self.rankings.refresh('manga')
+
+        # Uma hora depois (uma meia-vida): o item novo recebeu mais visualizações recentes
+        self.set_views('Novo Sucesso', 90)
+        self.set_views('Antigo Sucesso', 120)
+        self.age_state(3600)
+        self.rankings.refresh('manga')
+        self.assertEqual(self.titles('trending'), ['Novo Sucesso', 'Antigo Sucesso'])
+        self.assertAlmostEqual(self.rankings.get('manga', 'trending')[0][1], 80, places=2)
+
+        # Depois de mais uma meia-vida sem visualizações novas, a pontuação cai pela metade
+        self.age_state(3600)
+        self.rankings.refresh('manga')
+        self.assertAlmostEqual(self.rankings.get('manga', 'trending')[0][1], 40, places=2)
+
+        # A popularidade total continua a mesma
+        self.assertEqual(self.titles(), ['Antigo Sucesso', 'Novo Sucesso'])
+
+    def test_reads_never_refresh(self):
+        """
+        Testa que, antes do comando, as leituras usam uma consulta limitada sem gerar os
+        rankings, e que depois leem apenas as tabelas dos rankings
+        """
+        with self.assertNumQueries(3):
+            self.assertEqual(self.rankings.get_ids('manga'), [
+                self.mangas['Antigo Sucesso'].pk, self.mangas['Romance Calmo'].pk
+            ])
+        self.assertEqual(self.titles('trending', 'Ação'), ['Antigo Sucesso', 'Novo Sucesso'])
+        self.assertEqual(self.titles(category='slice-of-life'), ['Romance Calmo'])
+        self.assertFalse(RankingState.objects.exists())
+
+        self.rankings.refresh('manga')
+        self.set_views('Novo Sucesso', 1000)
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.rankings.get_ids('manga'), [
+                self.mangas['Antigo Sucesso'].pk, self.mangas['Romance Calmo'].pk
+            ])
+
+        # Lido do cache: uma consulta pelos itens do ranking
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.rankings.get_queryset('manga')), 2)
+
+    def test_fallback_filters_genre_before_limit(self):
+        """
+        Testa que a consulta limitada, antes do comando, filtra o gênero exato antes de
+        limitar a N itens
+        """
+        # 'Ação Tática' também contém 'Ação' e é o mais visto, mas não é do gênero 'Ação'
+        for title, views in (('Tático 1', 500), ('Tático 2', 400)):
+            Manga.objects.create(title=title, description='Descrição', genres='Ação Tática', views_count=views)
+
+        self.assertEqual(self.titles(category='Ação'), ['Antigo Sucesso', 'Novo Sucesso'])
+        self.assertFalse(RankingState.objects.exists())
+
+    def test_command(self):
+        """
+        Testa o comando refresh_rankings
+        """
+        out = StringIO()
+        call_command('refresh_rankings', '--type', 'manga', stdout=out)
+        self.assertIn('Rankings de manga atualizados (3 itens)', out.getvalue())
+        self.assertEqual(RankingEntry.objects.filter(content_type='manga', kind='popular', category='').count(), 3)
+        self.assertEqual(RankingState.objects.filter(content_type='manga').count(), 3)
+
+
+class RankingsConsumersTestCase(TestCase):
+    """
+    Testes para os endpoints que usam os rankings
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username='leitor', email='leitor@example.com', password='senha-123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        """
+        Remove os rankings do cache
+        """
+        cache.clear()
+
+    def test_recommendations(self):
+        """
+        Testa as recomendações sem histórico (mais populares) e por gênero
+        """
+        for title, genres, views in (
+            ('Shonen Popular', 'Ação', 300),
+            ('Shonen Lido', 'Ação', 200),
+            ('Shonen Novo', 'Ação', 100),
+            ('Romance Popular', 'Romance', 400),
+        ):
+            Manga.objects.create(title=title, description='Descrição', genres=genres, views_count=views)
+
+        response = self.client.get('/api/v1/mangas/history/recommendations/')
+        self.assertEqual(
+            [manga['title'] for manga in response.data],
+            ['Romance Popular', 'Shonen Popular', 'Shonen Lido', 'Shonen Novo']
+        )
+
+        MangaView.objects.create(user=self.user, manga=Manga.objects.get(title='Shonen Lido'))
+        response = self.client.get('/api/v1/mangas/history/recommendations/')
+        self.assertEqual([manga['title'] for manga in response.data], ['Shonen Popular', 'Shonen Novo'])
+
+    def test_popular_articles(self):
+        """
+        Testa os artigos populares do repositório
+        """
+        category = Category.objects.create(name='Rankings de teste', slug='rankings-de-teste')
+        for title, views in (('Pouco lido', 1), ('Muito lido', 50), ('Lido', 10)):
+            Article.objects.create(title=title, content='Conteúdo', category=category, views_count=views)
+
+        rankings.refresh('article')
+        self.assertEqual(
+            [article.title for article in article_repository.get_popular()],
+            ['Muito lido', 'Lido', 'Pouco lido']
+        )
+
+        # A ordem segue o ranking gravado, não as visualizações atuais, até a próxima atualização
+        Article.objects.filter(title='Pouco lido').update(views_count=500)
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                [article.title for article in article_repository.get_popular()],
+                ['Muito lido', 'Lido', 'Pouco lido']
+            )
+        self.assertEqual(
+            list(article_repository.get_popular().values_list('pk', flat=True)),
+            list(RankingEntry.objects.filter(
+                content_type='article', kind='popular', category=''
+            ).order_by('position').values_list('object_id', flat=True))
+        )
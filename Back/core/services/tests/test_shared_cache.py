@@ -0,0 +1,156 @@
+"""
+Testes para o perfil do cache compartilhado
+"""
+
+import pickle
+import unittest
+from unittest.mock import patch
+from django.core.cache.backends.redis import RedisCache
+from django.test import SimpleTestCase, override_settings
+from core.services import shared_cache
+from core.services.shared_cache import CompressedSerializer, build_default_cache, COMPRESSED_MARKER
+
+try:
+    import fakeredis
+    FAKEREDIS_AVAILABLE = True
+except ImportError:
+    FAKEREDIS_AVAILABLE = False
+
+
+class CompressedSerializerTestCase(SimpleTestCase):
+    """
+    Testes para a compressão dos valores
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.serializer = CompressedSerializer(min_size=100, level=1)
+
+    def test_large_values_are_compressed(self):
+        """
+        Testa que valores grandes são comprimidos e lidos de volta
+        """
+        value = {'results': [{'title': 'One Piece', 'description': 'Descrição ' * 20}] * 20}
+
+        data = self.serializer.dumps(value)
+        self.assertTrue(data.startswith(COMPRESSED_MARKER))
+        self.assertLess(len(data), len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+        self.assertEqual(self.serializer.loads(data), value)
+
+    def test_small_and_binary_values_are_not_compressed(self):
+        """
+        Testa que valores pequenos, binários e inteiros não passam pelo zlib
+        """
+        self.assertEqual(self.serializer.dumps({'a': 1}), pickle.dumps({'a': 1}, pickle.HIGHEST_PROTOCOL))
+
+        chunk = b'\x00' * 1000
+        self.assertFalse(self.serializer.dumps(chunk).startswith(COMPRESSED_MARKER))
+        self.assertEqual(self.serializer.loads(self.serializer.dumps(chunk)), chunk)
+
+        self.assertEqual(self.serializer.dumps(42), 42)
+        self.assertEqual(self.serializer.loads(b'42'), 42)
+
+    @override_settings(CACHE_COMPRESS_MIN_BYTES=10, CACHE_COMPRESS_LEVEL=9)
+    def test_defaults_from_settings(self):
+        """
+        Testa que os limites padrão vêm das configurações
+        """
+        serializer = CompressedSerializer()
+        self.assertEqual((serializer.min_size, serializer.level), (10, 9))
+
+
+class BuildDefaultCacheTestCase(SimpleTestCase):
+    """
+    Testes para a escolha do backend do cache padrão
+    """
+    def test_locmem_without_redis_url(self):
+        """
+        Testa que o desenvolvimento usa o LocMemCache
+        """
+        config = build_default_cache('', key_prefix='viixen')
+        self.assertEqual(config['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        self.assertEqual(config['KEY_PREFIX'], 'viixen')
+
+    def test_locmem_without_redis_package(self):
+        """
+        Testa que, sem o pacote redis, o LocMemCache é usado com um aviso
+        """
+        with patch.object(shared_cache, 'REDIS_AVAILABLE', False):
+            with self.assertWarns(UserWarning):
+                config = build_default_cache('redis://localhost:6379/0')
+        self.assertEqual(config['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+    @unittest.skipUnless(shared_cache.REDIS_AVAILABLE, "redis não está instalado")
+    def test_redis_profile(self):
+        """
+        Testa a configuração do cache compartilhado
+        """
+        config = build_default_cache('redis://cache:6379/1', key_prefix='viixen', max_connections=20)
+        self.assertEqual(config['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+        self.assertEqual(config['LOCATION'], 'redis://cache:6379/1')
+        self.assertEqual(config['KEY_PREFIX'], 'viixen')
+        self.assertEqual(config['OPTIONS']['max_connections'], 20)
+        self.assertEqual(config['OPTIONS']['serializer'], 'core.services.shared_cache.CompressedSerializer')
+
+
+@unittest.skipUnless(FAKEREDIS_AVAILABLE, "fakeredis não está instalado")
+class SharedCacheTestCase(SimpleTestCase):
+    """
+    Testes do perfil compartilhado contra um servidor simulado (fakeredis)
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.server = fakeredis.FakeServer()
+
+    def create_cache(self, key_prefix='viixen'):
+        """
+        Cria um cliente do cache como o de um worker do servidor
+        """
+        config = build_default_cache('redis://localhost:6379/0', key_prefix=key_prefix)
+        config['OPTIONS'] = dict(config['OPTIONS'], connection_class=fakeredis.FakeConnection, server=self.server)
+        return RedisCache(config['LOCATION'], config)
+
+    def test_values_are_shared_between_workers(self):
+        """
+        Testa que listas em cache e contadores do rate limit são vistos por todos os workers
+        """
+        worker1, worker2 = self.create_cache(), self.create_cache()
+
+        payload = {'count': 50, 'results': [{'id': index, 'title': f'Mangá {index}'} for index in range(50)]}
+        worker1.set('mangas_list_page_1', payload)
+        self.assertEqual(worker2.get('mangas_list_page_1'), payload)
+
+        worker1.set('ratelimit:127.0.0.1', 1)
+        worker2.incr('ratelimit:127.0.0.1')
+        self.assertEqual(worker1.incr('ratelimit:127.0.0.1'), 3)
+
+    def test_keys_are_prefixed_and_compressed(self):
+        """
+        Testa o prefixo das chaves e a compressão dos valores grandes no servidor
+        """
+        cache = self.create_cache()
+        cache.set('books_list', {'results': ['Dom Casmurro'] * 500})
+
+        client = cache._cache.get_client(write=True)
+        self.assertEqual(client.keys('*'), [b'viixen:1:books_list'])
+        self.assertTrue(client.get('viixen:1:books_list').startswith(COMPRESSED_MARKER))
+
+        # Outro ambiente no mesmo servidor não enxerga as chaves
+        self.assertIsNone(self.create_cache(key_prefix='staging').get('books_list'))
+
+    def test_connections_are_pooled(self):
+        """
+        Testa que as requisições de um worker reaproveitam o mesmo pool de conexões
+        """
+        cache = self.create_cache()
+        for index in range(10):
+            cache.set(f'chave_{index}', index)
+            cache.get(f'chave_{index}')
+
+        self.assertEqual(len(cache._cache._pools), 1)
+        pool = cache._cache._pools[0]
+        self.assertEqual(pool.max_connections, 50)
+        self.assertLessEqual(len(pool._available_connections) + len(pool._in_use_connections), 1)
@@ -0,0 +1,150 @@
+"""
+Testes para a execução única de tarefas concorrentes
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from django.test import SimpleTestCase
+from core.services.single_flight import SingleFlight, atomic_write
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    """
+    Testes para o controle de execução única
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.lock_path = os.path.join(self.temp_dir, 'pagina.jpeg.lock')
+        self.single_flight = SingleFlight(lock_timeout=5, poll_interval=0.01)
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_concurrent_calls_run_once(self):
+        """
+        Testa que chamadas simultâneas com a mesma chave executam a tarefa uma vez
+        """
+        calls = []
+        results = []
+
+        def task():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'resultado'
+
+        def worker():
+            results.append(self.single_flight.do('pagina', task, lock_path=self.lock_path))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['resultado'] * 10)
+        self.assertFalse(os.path.exists(self.lock_path))
+
+    def test_waits_for_other_process(self):
+        """
+        Testa que, com a trava de outro processo, a chamada aguarda o resultado em vez de executar a tarefa
+        """
+        open(self.lock_path, 'w').close()
+        ready = []
+
+        def finish_other_process():
+            time.sleep(0.1)
+            ready.append('resultado do outro processo')
+            os.remove(self.lock_path)
+
+        threading.Thread(target=finish_other_process).start()
+        result = self.single_flight.do(
+            'pagina',
+            lambda: self.fail('A tarefa não deveria ser executada'),
+            lock_path=self.lock_path,
+            check=lambda: ready[0] if ready else None
+        )
+
+        self.assertEqual(result, 'resultado do outro processo')
+
+    def test_stale_lock_is_broken(self):
+        """
+        Testa que uma trava abandonada é removida
+        """
+        open(self.lock_path, 'w').close()
+        old_time = time.time() - 60
+        os.utime(self.lock_path, (old_time, old_time))
+
+        result = self.single_flight.do('pagina', lambda: 'resultado', lock_path=self.lock_path)
+
+        self.assertEqual(result, 'resultado')
+        self.assertFalse(os.path.exists(self.lock_path))
+
+    def test_wait_timeout_runs_task(self):
+        """
+        Testa que, esgotado o tempo de espera, a chamada executa a tarefa sem aguardar mais
+        """
+        single_flight = SingleFlight(lock_timeout=60, poll_interval=0.01, wait_timeout=0.1)
+
+        # Trava de outro processo que não termina
+        open(self.lock_path, 'w').close()
+        self.assertEqual(single_flight.do('pagina', lambda: 'resultado', lock_path=self.lock_path), 'resultado')
+        self.assertTrue(os.path.exists(self.lock_path))
+
+        # Outra thread travada na mesma chave
+        started = threading.Event()
+        release = threading.Event()
+
+        def stuck_task():
+            started.set()
+            release.wait(5)
+            return 'travada'
+
+        thread = threading.Thread(target=single_flight.do, args=('outra', stuck_task))
+        thread.start()
+        started.wait(5)
+        try:
+            self.assertEqual(single_flight.do('outra', lambda: 'resultado'), 'resultado')
+        finally:
+            release.set()
+            thread.join()
+
+    def test_error_is_propagated_to_waiters(self):
+        """
+        Testa que o erro da tarefa é repassado e a chave é liberada
+        """
+        def task():
+            raise ValueError('falha')
+
+        with self.assertRaises(ValueError):
+            self.single_flight.do('pagina', task, lock_path=self.lock_path)
+
+        self.assertEqual(self.single_flight.do('pagina', lambda: 'ok', lock_path=self.lock_path), 'ok')
+
+    def test_atomic_write_discards_partial_file(self):
+        """
+        Testa que uma gravação interrompida não deixa arquivo parcial no destino
+        """
+        path = os.path.join(self.temp_dir, 'pagina.jpeg')
+
+        with self.assertRaises(RuntimeError):
+            with atomic_write(path) as f:
+                f.write(b'parcial')
+                raise RuntimeError('interrompido')
+
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+        with atomic_write(path) as f:
+            f.write(b'completo')
+
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'completo')
@@ -0,0 +1,133 @@
+"""
+Testes para o contador de visualizações
+"""
+
+import time
+from unittest.mock import patch
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+from apps.articles.models import Article
+from apps.books.models import Book
+from apps.mangas.models import Manga
+from core.services.view_counter import ViewCounter, view_counter
+
+
+class ViewCounterTestCase(TestCase):
+    """
+    Testes para o acúmulo e a gravação em lote das visualizações
+    """
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        cache.clear()
+        self.counter = ViewCounter(flush_interval=3600, dedup_window=60)
+        self.articles = [
+            Article.objects.create(title=f'Artigo {index}', content='Conteúdo do artigo') for index in range(3)
+        ]
+        self.manga = Manga.objects.create(title='Manga Popular', description='Descrição')
+        self.book = Book.objects.create(title='Livro Popular', description='Descrição')
+
+    def tearDown(self):
+        """
+        Remove as visitas registradas no cache
+        """
+        cache.clear()
+
+    def test_views_are_written_in_batches(self):
+        """
+        Testa que as visualizações só chegam ao banco na gravação, com um UPDATE por modelo
+        """
+        for article in self.articles:
+            for _ in range(article.pk):
+                self.counter.record(Article, article.pk)
+        self.counter.record(Manga, self.manga.pk)
+        self.counter.record(Manga, self.manga.pk)
+        self.counter.record(Book, self.book.pk)
+
+        self.assertEqual(Article.objects.get(pk=self.articles[2].pk).views_count, 0)
+        self.assertEqual(self.counter.get_count(self.manga), 2)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(self.counter.flush(), 5)
+
+        for article in self.articles:
+            self.assertEqual(Article.objects.get(pk=article.pk).views_count, article.pk)
+        self.assertEqual(Manga.objects.get(pk=self.manga.pk).views_count, 2)
+        self.assertEqual(Book.objects.get(pk=self.book.pk).views_count, 1)
+
+        # Nada pendente: a próxima gravação não acessa o banco
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counter.flush(), 0)
+
+    def test_repeated_visits_count_once(self):
+        """
+        Testa a janela de visualizações repetidas do mesmo visitante
+        """
+        self.assertTrue(self.counter.record(Manga, self.manga.pk, 'ip:10.0.0.1'))
+        self.assertFalse(self.counter.record(Manga, self.manga.pk, 'ip:10.0.0.1'))
+        self.assertTrue(self.counter.record(Manga, self.manga.pk, 'ip:10.0.0.2'))
+        self.assertTrue(self.counter.record(Book, self.book.pk, 'ip:10.0.0.1'))
+        self.assertEqual(self.counter.get_count(self.manga), 2)
+
+        # Sem janela, todas as visualizações contam
+        counter = ViewCounter(flush_interval=3600, dedup_window=0)
+        self.assertTrue(counter.record(Manga, self.manga.pk, 'ip:10.0.0.1'))
+        self.assertTrue(counter.record(Manga, self.manga.pk, 'ip:10.0.0.1'))
+
+    def test_flush_after_interval(self):
+        """
+        Testa que o registro grava as visualizações quando o intervalo termina
+        """
+        counter = ViewCounter(flush_interval=0, dedup_window=0)
+        counter.record(Article, self.articles[0].pk)
+        self.assertEqual(Article.objects.get(pk=self.articles[0].pk).views_count, 1)
+
+    def test_idle_worker_flushes_periodically(self):
+        """
+        Testa que a thread de gravação periódica grava as visualizações sem novas requisições
+        """
+        counter = ViewCounter(flush_interval=0.05, dedup_window=0)
+        with patch.object(counter, 'flush') as flush:
+            counter.record(Article, self.articles[0].pk)
+            deadline = time.time() + 5
+            while not flush.called and time.time() < deadline:
+                time.sleep(0.01)
+
+        self.assertTrue(flush.called)
+        self.assertTrue(counter._flusher.daemon)
+
+    def test_visitor_ip_ignores_client_forwarded_for(self):
+        """
+        Testa que o X-Forwarded-For só é usado com proxies confiáveis configurados
+        """
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 10.0.0.5', REMOTE_ADDR='10.0.0.9')
+        request.user = AnonymousUser()
+
+        self.assertEqual(ViewCounter(trusted_proxies=0).get_visitor(request), 'ip:10.0.0.9')
+        self.assertEqual(ViewCounter(trusted_proxies=1).get_visitor(request), 'ip:10.0.0.5')
+        self.assertEqual(ViewCounter(trusted_proxies=2).get_visitor(request), 'ip:1.1.1.1')
+        self.assertEqual(ViewCounter(trusted_proxies=3).get_visitor(request), 'ip:10.0.0.9')
+
+    def test_increment_views_endpoints(self):
+        """
+        Testa as ações increment_views de mangás e livros
+        """
+        client = APIClient()
+        for url, instance in (
+            (f'/api/v1/mangas/mangas/{self.manga.slug}/increment_views/', self.manga),
+            (f'/api/v1/books/books/{self.book.slug}/increment_views/', self.book),
+        ):
+            response = client.post(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['views_count'], 1)
+
+            # O mesmo visitante dentro da janela não conta de novo
+            response = client.post(url)
+            self.assertEqual(response.data['views_count'], 1)
+
+        view_counter.flush()
+        self.assertEqual(Manga.objects.get(pk=self.manga.pk).views_count, 1)
+        self.assertEqual(Book.objects.get(pk=self.book.pk).views_count, 1)
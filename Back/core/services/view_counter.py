@@ -0,0 +1,200 @@
+"""
+Contador de visualizações com gravação adiada (write-behind).
+
+Cada visualização de um mangá, livro ou artigo incrementaria views_count com um UPDATE
+na linha do item, disputando o bloqueio da mesma linha nos itens populares. Aqui as
+visualizações são acumuladas em memória em cada processo e somadas ao banco
+periodicamente (VIEW_COUNTER_FLUSH_INTERVAL), com um UPDATE em lote por modelo para
+todos os itens visualizados no intervalo. A gravação é feita pela requisição que encontra
+o intervalo vencido e, para que um worker ocioso não retenha as visualizações, por uma
+thread daemon iniciada no primeiro registro. Como as somas são independentes, cada
+worker grava as suas sem coordenação com os outros.
+
+Opcionalmente, visualizações repetidas do mesmo visitante (usuário ou IP) dentro de
+VIEW_COUNTER_DEDUP_WINDOW segundos são contadas uma única vez. As visitas recentes ficam
+no cache padrão, compartilhado entre os workers quando REDIS_URL está definido. O IP do
+visitante é o REMOTE_ADDR; atrás de proxies reversos, VIEW_COUNTER_TRUSTED_PROXIES indica
+quantos deles acrescentam o endereço ao X-Forwarded-For, que só então é consultado.
+"""
+
+import time
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Case, When, F, Value, PositiveIntegerField
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Acúmulo e gravação em lote das visualizações dos modelos com o campo views_count
+    """
+
+    # Número máximo de itens em cada UPDATE
+    BATCH_SIZE = 500
+
+    def __init__(self, flush_interval=None, dedup_window=None, trusted_proxies=None):
+        """
+        Inicializa o contador
+
+        Args:
+            flush_interval (int): Intervalo mínimo em segundos entre gravações no banco
+            dedup_window (int): Janela em segundos em que as visualizações de um mesmo
+                visitante contam uma vez (0 desativa)
+            trusted_proxies (int): Número de proxies reversos confiáveis à frente da aplicação
+        """
+        self.flush_interval = flush_interval if flush_interval is not None else getattr(
+            settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 10
+        )
+        self.dedup_window = dedup_window if dedup_window is not None else getattr(
+            settings, 'VIEW_COUNTER_DEDUP_WINDOW', 30 * 60
+        )
+
+        self.trusted_proxies = trusted_proxies if trusted_proxies is not None else getattr(
+            settings, 'VIEW_COUNTER_TRUSTED_PROXIES', 0
+        )
+
+        self._pending = defaultdict(int)
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def record(self, model, pk, visitor=None):
+        """
+        Registra uma visualização de um item
+
+        Args:
+            model: Classe do modelo (Manga, Book, Article)
+            pk: Chave primária do item
+            visitor (str): Identificador do visitante para ignorar visualizações repetidas (opcional)
+
+        Returns:
+            bool: True se a visualização foi contada, False se foi repetida
+        """
+        key = (model._meta.label_lower, pk)
+        if visitor is not None and not self._is_new_visit(key, visitor):
+            return False
+
+        with self._lock:
+            self._pending[key] += 1
+            flush = time.time() - self._last_flush >= self.flush_interval
+
+        if flush:
+            self.flush()
+        else:
+            self._start_flusher()
+        return True
+
+    def get_count(self, instance):
+        """
+        Retorna o contador de um item somando as visualizações ainda não gravadas neste processo
+        """
+        with self._lock:
+            pending = self._pending.get((instance._meta.label_lower, instance.pk), 0)
+        return instance.views_count + pending
+
+    def get_visitor(self, request):
+        """
+        Retorna o identificador do visitante de uma requisição: o usuário ou o IP
+
+        O X-Forwarded-For pode ser enviado pelo próprio cliente; apenas os endereços
+        acrescentados pelos trusted_proxies proxies confiáveis (os últimos da lista) são usados.
+        """
+        if request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+
+        if self.trusted_proxies:
+            addresses = [
+                address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if address.strip()
+            ]
+            if len(addresses) >= self.trusted_proxies:
+                return f"ip:{addresses[-self.trusted_proxies]}"
+        return f"ip:{request.META.get('REMOTE_ADDR')}"
+
+    def flush(self):
+        """
+        Soma ao banco as visualizações acumuladas em memória
+
+        Returns:
+            int: Número de itens atualizados
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = defaultdict(int)
+            self._last_flush = time.time()
+
+        counts_by_model = defaultdict(dict)
+        for (label, pk), count in pending.items():
+            counts_by_model[label][pk] = count
+
+        updated = 0
+        for label, counts in counts_by_model.items():
+            model = apps.get_model(label)
+            items = list(counts.items())
+            for start in range(0, len(items), self.BATCH_SIZE):
+                batch = dict(items[start:start + self.BATCH_SIZE])
+                try:
+                    model.objects.filter(pk__in=batch).update(views_count=F('views_count') + Case(
+                        *[When(pk=pk, then=Value(count)) for pk, count in batch.items()],
+                        default=Value(0), output_field=PositiveIntegerField()
+                    ))
+                    updated += len(batch)
+                except Exception as e:
+                    logger.error(f"Erro ao gravar as visualizações de {label}: {str(e)}")
+                    # Manter as visualizações para a próxima gravação
+                    with self._lock:
+                        for pk, count in batch.items():
+                            self._pending[(label, pk)] += count
+
+        if updated:
+            logger.debug(f"Visualizações de {updated} itens gravadas")
+        return updated
+
+    def _start_flusher(self):
+        """
+        Inicia a thread que grava as visualizações pendentes a cada intervalo
+        """
+        if self.flush_interval <= 0 or (self._flusher is not None and self._flusher.is_alive()):
+            return
+
+        with self._lock:
+            # A thread não sobrevive a um fork do processo: verificar se continua ativa
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name='view-counter', daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                due = bool(self._pending) and time.time() - self._last_flush >= self.flush_interval
+            if not due:
+                continue
+
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Erro na gravação periódica das visualizações: {str(e)}")
+            finally:
+                close_old_connections()
+
+    def _is_new_visit(self, key, visitor):
+        if not self.dedup_window:
+            return True
+        label, pk = key
+        return cache.add(f"view_counter_seen_{label}_{pk}_{visitor}", 1, self.dedup_window)
+
+
+# Instância singleton do serviço
+view_counter = ViewCounter()
+
+# Gravar as visualizações pendentes quando o processo terminar
+atexit.register(view_counter.flush)
@@ -1,8 +1,12 @@
 import os
 import sys
+import atexit
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
+from core.services.shared_cache import build_default_cache
 
 # Caminho base do projeto
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -55,6 +59,7 @@ INSTALLED_APPS = [
     'axes',
 
     # Apps locais
+    'core',
     'apps.accounts',
     'apps.articles',
     'apps.categories',
@@ -62,6 +67,7 @@ INSTALLED_APPS = [
     'apps.books',
     'apps.ratings',
     'apps.comments',
+    'apps.rankings',
 
 ]
 
@@ -82,16 +88,21 @@ MIDDLEWARE = [
 ]
 
 # Configurações de cache
+# Com REDIS_URL definido, o cache padrão (listas, rate limit, trechos de áudio) é compartilhado
+# por todos os workers; sem ele, cada processo usa o LocMemCache (desenvolvimento).
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'viixen')
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))  # Valores maiores são comprimidos
+CACHE_COMPRESS_LEVEL = int(os.getenv('CACHE_COMPRESS_LEVEL', 6))
+
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'TIMEOUT': 300,  # 5 minutos
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
-            'CULL_FREQUENCY': 3,  # 1/3 dos itens serão removidos quando MAX_ENTRIES for atingido
-        }
-    },
+    'default': build_default_cache(
+        REDIS_URL,
+        key_prefix=CACHE_KEY_PREFIX,
+        timeout=300,  # 5 minutos
+        max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),
+        socket_timeout=float(os.getenv('REDIS_SOCKET_TIMEOUT', 1.0)),
+    ),
     'file_cache': {
         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
         'LOCATION': os.path.join(BASE_DIR, 'cache'),
@@ -103,6 +114,27 @@ CACHES = {
     }
 }
 
+# Tempo máximo das listagens em cache (mangás, livros, artigos); alterações nos dados as invalidam antes
+LIST_CACHE_TIMEOUT = int(os.getenv('LIST_CACHE_TIMEOUT', 6 * 60 * 60))  # 6 horas
+# Idade a partir da qual a listagem é regenerada em segundo plano (a versão anterior continua sendo servida)
+LIST_CACHE_SOFT_TIMEOUT = int(os.getenv('LIST_CACHE_SOFT_TIMEOUT', 5 * 60))  # 5 minutos
+
+# Intervalo mínimo entre as gravações em lote dos contadores de visualizações
+VIEW_COUNTER_FLUSH_INTERVAL = int(os.getenv('VIEW_COUNTER_FLUSH_INTERVAL', 10))  # 10 segundos
+# Janela em que as visualizações de um mesmo visitante contam uma vez (0 desativa)
+VIEW_COUNTER_DEDUP_WINDOW = int(os.getenv('VIEW_COUNTER_DEDUP_WINDOW', 30 * 60))  # 30 minutos
+# Número de proxies reversos confiáveis que acrescentam o IP do cliente ao X-Forwarded-For
+# (0: o X-Forwarded-For é ignorado e o IP do visitante é o REMOTE_ADDR)
+VIEW_COUNTER_TRUSTED_PROXIES = int(os.getenv('VIEW_COUNTER_TRUSTED_PROXIES', 0))
+
+# Rankings de popularidade e tendência pré-calculados pelo comando refresh_rankings
+# (agendado no cron, ex.: a cada 10 minutos)
+RANKINGS_SIZE = int(os.getenv('RANKINGS_SIZE', 100))
+# Tempo em que cada ranking lido do banco fica no cache padrão
+RANKINGS_CACHE_TIMEOUT = int(os.getenv('RANKINGS_CACHE_TIMEOUT', 60))  # 1 minuto
+# Meia-vida da pontuação de tendência
+RANKINGS_TRENDING_HALF_LIFE = int(os.getenv('RANKINGS_TRENDING_HALF_LIFE', 24 * 60 * 60))  # 24 horas
+
 # Configurações de logging
 LOGGING = {
     'version': 1,
@@ -232,6 +264,17 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Dados internos dos serviços (índices e contadores), fora do MEDIA_ROOT, que é servido publicamente
+INTERNAL_DATA_DIR = os.path.join(BASE_DIR, 'cache', 'internal')
+
+# Nos testes (manage.py test), os arquivos de mídia e os dados internos ficam em um diretório temporário
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+if TESTING:
+    TEST_DATA_DIR = tempfile.mkdtemp(prefix='prometheus-tests-')
+    atexit.register(shutil.rmtree, TEST_DATA_DIR, True)
+    MEDIA_ROOT = os.path.join(TEST_DATA_DIR, 'media')
+    INTERNAL_DATA_DIR = os.path.join(TEST_DATA_DIR, 'internal')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework
@@ -247,7 +290,7 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'utils.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
@@ -346,8 +389,38 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
 MAX_UPLOAD_SIZE = 104857600  # 100MB
 
-# Configurações para conversão de PDF
-PDF_CACHE_DIR = os.path.join(MEDIA_ROOT, "pdf_cache")
+# Cache unificado dos artefatos de mídia (páginas de PDF em imagem, texto das páginas, metadados de áudio)
+MEDIA_CACHE_DIR = os.path.join(MEDIA_ROOT, "media_cache")
+# Índice de tamanhos e acessos do cache de mídia (fora do diretório servido)
+MEDIA_CACHE_INDEX = os.path.join(INTERNAL_DATA_DIR, "media_cache.sqlite3")
+
+# Limite de tamanho do cache de mídia e política de remoção ('lru' ou 'lfu')
+MEDIA_CACHE_MAX_BYTES = int(os.environ.get("MEDIA_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))  # 2GB
+MEDIA_CACHE_EVICTION_POLICY = os.environ.get("MEDIA_CACHE_EVICTION_POLICY", "lru")
+
+# Backend de rasterização das páginas: 'poppler' (subprocesso), 'pdfium' (pypdfium2) ou 'pymupdf' (PyMuPDF).
+# Os backends em processo mantêm até PDF_RENDERER_MAX_OPEN_DOCUMENTS documentos abertos entre as conversões.
+PDF_RENDERER_BACKEND = os.environ.get("PDF_RENDERER_BACKEND", "poppler")
+PDF_RENDERER_MAX_OPEN_DOCUMENTS = int(os.environ.get("PDF_RENDERER_MAX_OPEN_DOCUMENTS", 16))
+
+# Número de documentos PDF mantidos abertos pelo PyPDF2 para extração de texto e sumário
+PDF_READER_POOL_SIZE = int(os.environ.get("PDF_READER_POOL_SIZE", 8))
+
+# Contadores de uso dos caches (compartilhados pelos workers) e token do coletor do Prometheus em /metrics/
+CACHE_METRICS_DB = os.path.join(INTERNAL_DATA_DIR, "cache_metrics.sqlite3")
+CACHE_METRICS_TOKEN = os.environ.get("CACHE_METRICS_TOKEN") or None
+
+# Índice dos hashes de conteúdo dos arquivos de origem usados nas chaves dos caches em disco
+FILE_FINGERPRINT_INDEX = os.path.join(INTERNAL_DATA_DIR, "file_fingerprints.sqlite3")
+
+# Índice persistente de metadados de PDF (páginas, dimensões, sumário)
+PDF_INDEX_DIR = os.path.join(INTERNAL_DATA_DIR, "pdf_index")
+PDF_INDEX_WORKERS = int(os.environ.get("PDF_INDEX_WORKERS", 1))  # Workers da indexação em segundo plano
+
+# Envio de arquivos pelo servidor web: None (FileResponse), 'nginx' (X-Accel-Redirect) ou 'apache' (X-Sendfile)
+SENDFILE_BACKEND = os.environ.get("SENDFILE_BACKEND") or None
+SENDFILE_ROOT = MEDIA_ROOT
+SENDFILE_URL = os.environ.get("SENDFILE_URL", "/protected/")  # location interno do nginx apontando para MEDIA_ROOT
 
 # Detectar o Poppler automaticamente
 POPPLER_PATH = os.environ.get("POPPLER_PATH", None)  # Caminho para o Poppler no Windows
@@ -374,7 +447,25 @@ if not POPPLER_PATH and os.name == "nt":
                 POPPLER_PATH = directory
                 break
 
-# Configurações para áudio
+# Pré-renderização das páginas de capítulos em PDF após o upload
+PDF_PRERENDER_ENABLED = os.getenv('PDF_PRERENDER_ENABLED', 'True') == 'True'
+PDF_PRERENDER_WORKERS = int(os.getenv('PDF_PRERENDER_WORKERS', 2))
+PDF_PRERENDER_BATCH_SIZE = int(os.getenv('PDF_PRERENDER_BATCH_SIZE', 10))
+# Segundos sem progresso após os quais uma pré-renderização é considerada abandonada
+PDF_PRERENDER_STALE_TIMEOUT = int(os.getenv('PDF_PRERENDER_STALE_TIMEOUT', 300))
+
+# Leitura antecipada: páginas convertidas à frente da página aberta pelo leitor
+PDF_READAHEAD_PAGES = int(os.getenv('PDF_READAHEAD_PAGES', 3))
+PDF_READAHEAD_WORKERS = int(os.getenv('PDF_READAHEAD_WORKERS', 2))
+PDF_READAHEAD_MAX_PENDING = int(os.getenv('PDF_READAHEAD_MAX_PENDING', 100))
+
+# Número máximo de páginas convertidas em uma requisição de conversão em lote
+PDF_BATCH_MAX_PAGES = int(os.getenv('PDF_BATCH_MAX_PAGES', 20))
+
+# Extração do texto dos PDFs dos livros em segundo plano (cada tarefa lê o PDF inteiro)
+BOOK_TEXT_EXTRACTION_WORKERS = int(os.getenv('BOOK_TEXT_EXTRACTION_WORKERS', 1))
+
+# Configurações para áudio (marcadores criados pelos usuários)
 AUDIO_CACHE_DIR = os.path.join(MEDIA_ROOT, "audio_cache")
 AUDIO_FORMATS = {
     "mp3": "audio/mpeg",
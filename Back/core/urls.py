@@ -6,6 +6,7 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 from django.views.generic import TemplateView
+from core.views import cache_metrics_view
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -65,6 +66,9 @@ urlpatterns = [
     # API Root
     path(f'{api_prefix}', include('core.api_urls')),
 
+    # Métricas dos caches (formato Prometheus)
+    path('metrics/', cache_metrics_view, name='cache-metrics'),
+
     # Authentication
     path(f'{api_prefix}auth/', include('djoser.urls')),
     path(f'{api_prefix}auth/', include('djoser.urls.jwt')),
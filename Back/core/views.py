@@ -5,7 +5,10 @@ Views para o core do projeto
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from core.services.cache_metrics import cache_metrics
 
 
 @api_view(['GET'])
@@ -29,3 +32,21 @@ def api_root(request, format=None):
         'version': '1.0.0',
         'message': 'Bem-vindo à API do Viixen'
     })
+
+
+def cache_metrics_view(request):
+    """
+    Métricas dos caches no formato de texto do Prometheus
+
+    Acessível para usuários da equipe ou com o token CACHE_METRICS_TOKEN no
+    cabeçalho Authorization (Bearer), usado pelo coletor do Prometheus.
+    """
+    token = getattr(settings, 'CACHE_METRICS_TOKEN', None)
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = request.user.is_staff or (
+        token and constant_time_compare(authorization, f"Bearer {token}")
+    )
+    if not authorized:
+        return HttpResponseForbidden('Acesso negado')
+
+    return HttpResponse(cache_metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
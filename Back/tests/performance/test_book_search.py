@@ -0,0 +1,56 @@
+"""
+Benchmark da busca no conteúdo dos livros em um catálogo com milhares de livros
+"""
+
+import random
+import time
+
+from django.test import TestCase
+
+from apps.books.models import Book, BookPageText
+from core.services.book_search_service import book_search_service
+
+TOTAL_BOOKS = 3000
+PAGES_PER_BOOK = 10
+WORDS_PER_PAGE = 80
+
+VOCABULARY = [f"palavra{index}" for index in range(5000)]
+
+
+class BookSearchPerformanceTestCase(TestCase):
+    """
+    Mede o tempo de resposta da busca textual com o índice do banco de dados
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Cria um catálogo sintético de livros com o texto das páginas
+        """
+        rng = random.Random(42)
+        books = Book.objects.bulk_create([
+            Book(title=f"Livro {index}", slug=f"livro-{index}", description='Descrição', pdf_file=f"books/{index}.pdf")
+            for index in range(TOTAL_BOOKS)
+        ])
+
+        pages = []
+        for book in books:
+            for page_number in range(1, PAGES_PER_BOOK + 1):
+                text = ' '.join(rng.choice(VOCABULARY) for _ in range(WORDS_PER_PAGE))
+                pages.append(BookPageText(book=book, page_number=page_number, text=text, source='benchmark'))
+        BookPageText.objects.bulk_create(pages, batch_size=2000)
+
+    def test_search_latency(self):
+        """
+        As consultas devem ser respondidas em milissegundos
+        """
+        queries = [f"palavra{index} palavra{index + 1}" for index in range(0, 2000, 100)]
+
+        start_time = time.time()
+        for query in queries:
+            book_search_service.search(query)
+        elapsed_time = (time.time() - start_time) / len(queries)
+
+        print(f"Busca em {TOTAL_BOOKS * PAGES_PER_BOOK} páginas: {elapsed_time * 1000:.1f} ms por consulta")
+
+        self.assertLess(elapsed_time, 0.1)
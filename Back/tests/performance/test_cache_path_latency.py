@@ -0,0 +1,84 @@
+"""
+Benchmark da latência do caminho de um artefato do cache de mídia em um acerto de
+cache: hash do arquivo inteiro a cada consulta x índice de hashes por impressão
+digital do arquivo
+"""
+
+import os
+import hashlib
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from core.services.media_cache import MediaCache
+from core.services.cache_metrics import CacheMetrics
+from core.services.file_fingerprint import FileFingerprintIndex
+
+FILE_SIZE = 100 * 1024 * 1024
+LOOKUPS = 20
+
+
+def legacy_file_hash(file_path):
+    """Cálculo anterior: MD5 do arquivo inteiro em blocos de 4 KB a cada consulta."""
+    with open(file_path, 'rb') as f:
+        file_hash = hashlib.md5()
+        for chunk in iter(lambda: f.read(4096), b''):
+            file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+
+class CachePathLatencyTestCase(SimpleTestCase):
+    """
+    Compara o tempo de MediaCache.get_path para um PDF de 100 MB
+    """
+
+    def setUp(self):
+        """
+        Cria o arquivo de origem e diretórios temporários
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'livro.pdf')
+        with open(self.file_path, 'wb') as f:
+            for _ in range(FILE_SIZE // (1024 * 1024)):
+                f.write(os.urandom(1024 * 1024))
+
+        self.cache_dir = os.path.join(self.temp_dir, 'media_cache')
+        self.index = FileFingerprintIndex(index_path=os.path.join(self.temp_dir, 'fingerprints.sqlite3'))
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _measure(self, media_cache):
+        start_time = time.time()
+        for page_number in range(LOOKUPS):
+            media_cache.get_path(self.file_path, f"page{page_number}_200dpi_q85.jpeg")
+        return (time.time() - start_time) / LOOKUPS
+
+    def test_cache_hit_latency(self):
+        """
+        Com o índice, a consulta não deve reler o arquivo
+        """
+        metrics = CacheMetrics(os.path.join(self.temp_dir, 'metrics.sqlite3'))
+        legacy_cache = MediaCache(
+            self.cache_dir, fingerprints=SimpleNamespace(get_hash=legacy_file_hash), metrics=metrics
+        )
+        legacy_time = self._measure(legacy_cache)
+
+        media_cache = MediaCache(self.cache_dir, fingerprints=self.index, metrics=metrics)
+        start_time = time.time()
+        media_cache.get_path(self.file_path, 'page1_200dpi_q85.jpeg')
+        first_time = time.time() - start_time
+        indexed_time = self._measure(media_cache)
+
+        print(f"get_path com hash completo: {legacy_time * 1000:.2f} ms por consulta")
+        print(f"get_path com índice (primeira consulta): {first_time * 1000:.2f} ms")
+        print(f"get_path com índice (acerto): {indexed_time * 1000:.3f} ms por consulta")
+
+        self.assertLess(first_time, legacy_time)
+        self.assertLess(indexed_time * 100, legacy_time)
@@ -0,0 +1,75 @@
+"""
+Benchmark dos backends de rasterização de PDF: páginas por segundo
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from django.test import SimpleTestCase
+
+from core.services import pdf_renderers
+
+try:
+    from PyPDF2 import PdfWriter
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+POPPLER_AVAILABLE = bool(pdf_renderers.POPPLER_PATH or shutil.which('pdftoppm'))
+
+TOTAL_PAGES = 30
+
+
+def is_backend_available(name):
+    """Verifica se o backend pode ser executado neste ambiente."""
+    if name == pdf_renderers.PopplerRenderer.name:
+        return pdf_renderers.PDF2IMAGE_AVAILABLE and POPPLER_AVAILABLE
+    return pdf_renderers.BACKENDS[name]().is_available()
+
+
+AVAILABLE_BACKENDS = [name for name in pdf_renderers.BACKENDS if is_backend_available(name)]
+
+
+@unittest.skipUnless(PYPDF2_AVAILABLE and AVAILABLE_BACKENDS, "PyPDF2 e um backend de PDF são necessários para o benchmark")
+class PDFRendererPerformanceTestCase(SimpleTestCase):
+    """
+    Compara as páginas por segundo de cada backend instalado, página a página
+    """
+
+    def setUp(self):
+        """
+        Cria um PDF sintético
+        """
+        self.directory = tempfile.mkdtemp()
+        self.pdf_path = os.path.join(self.directory, 'benchmark.pdf')
+
+        writer = PdfWriter()
+        for _ in range(TOTAL_PAGES):
+            writer.add_blank_page(width=595, height=842)
+        with open(self.pdf_path, 'wb') as f:
+            writer.write(f)
+
+    def tearDown(self):
+        """
+        Remove os arquivos temporários
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_pages_per_second(self):
+        """
+        Cada backend rasteriza todas as páginas na largura da variante base
+        """
+        for name in AVAILABLE_BACKENDS:
+            renderer = pdf_renderers.BACKENDS[name]()
+
+            start_time = time.time()
+            for page_number in range(1, TOTAL_PAGES + 1):
+                image = renderer.render_page(self.pdf_path, page_number, width=1280)
+                self.assertEqual(image.width, 1280)
+            elapsed_time = time.time() - start_time
+            renderer.close()
+
+            print(f"{name}: {TOTAL_PAGES / elapsed_time:.1f} páginas/s ({TOTAL_PAGES} páginas em {elapsed_time:.2f}s)")
@@ -1,6 +1,10 @@
+from django.http import HttpRequest, QueryDict
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from core.services.list_cache import list_cache
 
 class SlugBasedViewSetMixin:
     """
@@ -94,4 +98,145 @@ class MultiSerializerViewSetMixin:
         if not hasattr(self, 'action'):
             return self.serializers.get('default')
             
-        return self.serializers.get(self.action, self.serializers.get('default'))
\ No newline at end of file
+        return self.serializers.get(self.action, self.serializers.get('default'))
+
+
+class CachedListMixin:
+    """
+    Mixin para ViewSets cuja listagem fica em cache, compartilhada entre os usuários.
+
+    A resposta é guardada por list_cache_name e parâmetros da requisição. Com nocache, a
+    equipe regenera a resposta compartilhada; os demais usuários recebem uma resposta
+    gerada na hora, sem alterar o cache. Respostas antigas continuam sendo servidas
+    enquanto uma única requisição as regenera em segundo plano (com uma requisição
+    anônima montada por get_list_refresh, sem reaproveitar a requisição original), e
+    cada resposta tem um ETag para que clientes com If-None-Match recebam 304. Os campos
+    pessoais são obtidos por get_user_overlay e mesclados à resposta compartilhada.
+    """
+    list_cache_name = None
+
+    # Atributos da view recriados na regeneração em segundo plano (initkwargs do roteador)
+    list_refresh_initkwargs = ('basename', 'detail', 'suffix', 'name', 'description')
+
+    def get_user_overlay(self, user, ids):
+        """
+        Retorna os campos pessoais do usuário para os itens da página: {id: campos}
+        """
+        return {}
+
+    def list(self, request, *args, **kwargs):
+        params = request.query_params.copy()
+        nocache = bool(params.pop('nocache', None))
+
+        if nocache and not request.user.is_staff:
+            data = self.get_list_data(request)
+            etag = list_cache.get_etag(data)
+        else:
+            entry = list_cache.get(
+                self.list_cache_name, params.urlencode(), lambda: self.get_list_data(request),
+                force=nocache, refresh=self.get_list_refresh(request, params.urlencode())
+            )
+            data, etag = entry['data'], entry['etag']
+
+        if request.user.is_authenticated:
+            ids = list_cache.get_item_ids(data)
+            overlay = self.get_user_overlay(request.user, ids) if ids else {}
+            if overlay:
+                data = list_cache.apply_user_overlay(data, overlay)
+                etag = f"{etag}-{list_cache.get_etag(overlay)}"
+
+        etag = f'"{etag}"'
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Authorization', 'Cookie'])
+        return response
+
+    def get_list_data(self, request):
+        """
+        Gera os dados da listagem (sem campos pessoais) que serão guardados em cache
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data).data
+
+        serializer = self.get_serializer(queryset, many=True)
+        return serializer.data
+
+    def get_list_refresh(self, request, query_string):
+        """
+        Retorna a função que regenera a listagem em segundo plano, montada apenas com
+        argumentos simples (a requisição original já terá terminado quando ela rodar)
+        """
+        view_class = type(self)
+        initkwargs = {key: getattr(self, key) for key in self.list_refresh_initkwargs if key in self.__dict__}
+        scheme, path, host = request.scheme, request.path, request.get_host()
+        return lambda: view_class.refresh_list_data(initkwargs, scheme, host, path, query_string)
+
+    @classmethod
+    def refresh_list_data(cls, initkwargs, scheme, host, path, query_string):
+        """
+        Gera os dados da listagem com uma requisição GET anônima para o endereço informado
+        """
+        view = cls(**initkwargs)
+        view.action_map = {'get': 'list'}
+        view.action = 'list'
+        view.args, view.kwargs, view.format_kwarg = (), {}, None
+        view.request = view.initialize_request(ListRefreshRequest(scheme, host, path, query_string))
+        return view.get_list_data(view.request)
+
+
+class ListRefreshRequest(HttpRequest):
+    """
+    Requisição GET anônima, sem cabeçalhos de autenticação, usada para regenerar listagens
+    """
+
+    def __init__(self, scheme, host, path, query_string):
+        super().__init__()
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.META = {'HTTP_HOST': host, 'QUERY_STRING': query_string}
+        self.GET = QueryDict(query_string)
+        self._scheme = scheme
+
+    def _get_scheme(self):
+        return self._scheme
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin para serializadores cujos campos são escolhidos pelo cliente.
+
+    ?fields=id,title limita a resposta aos campos informados. Os campos listados em
+    expandable_fields (relações que podem ser grandes) só são incluídos quando pedidos
+    com ?expand=<campo>. Os campos removidos não são calculados.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is None:
+            return
+
+        fields = self.get_query_list(request, 'fields')
+        expand = self.get_query_list(request, 'expand')
+        for name in list(self.fields):
+            if (name in self.expandable_fields and name not in expand) or (fields and name not in fields | expand):
+                self.fields.pop(name)
+
+    @staticmethod
+    def get_query_list(request, param):
+        """
+        Retorna os nomes separados por vírgula de um parâmetro da requisição
+        """
+        value = request.query_params.get(param, '')
+        return {name.strip() for name in value.split(',') if name.strip()}
@@ -0,0 +1,151 @@
+"""
+Paginação das listagens da API.
+
+As listagens continuam paginadas por número de página (?page=), com OFFSET/LIMIT e uma
+contagem do total a cada página. As views que definem keyset_ordering (ex.:
+('-created_at', '-id')) também aceitam a paginação por cursor com ?pagination=cursor:
+cada página é filtrada a partir dos valores do último item da página anterior (keyset),
+com o mesmo custo em qualquer posição da lista, e a contagem do total só é feita com
+?count=true.
+"""
+
+import json
+import base64
+import binascii
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Paginação por número de página, com paginação por cursor opcional
+
+    A ordem do cursor vem do atributo keyset_ordering da view (campos do modelo, com '-'
+    para ordem decrescente, terminando em um campo único como 'id'). Views sem
+    keyset_ordering, ou cujo modelo não tem os campos, usam sempre a paginação por
+    número de página. No modo cursor, a ordem de keyset_ordering substitui ?ordering.
+    """
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_ordering = self.get_keyset_ordering(queryset, view)
+        self.use_cursor = bool(self.keyset_ordering) and (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.count = queryset.count() if self.include_count(request) else None
+
+        queryset = queryset.order_by(*self.keyset_ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        # Um item a mais indica se há próxima página, sem contar o total
+        items = list(queryset[:page_size + 1])
+        self.has_next = len(items) > page_size
+        self.page_items = items[:page_size]
+        return self.page_items
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+
+        response = {'next': self.get_next_link()}
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+
+        last = self.page_items[-1]
+        values = [self.encode_value(getattr(last, field.lstrip('-'))) for field in self.keyset_ordering]
+        cursor = base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        url = replace_query_param(url, self.mode_query_param, 'cursor')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_keyset_ordering(self, queryset, view):
+        """
+        Retorna a ordem do cursor da view, ou None se ela não puder ser usada no modelo
+        """
+        ordering = getattr(view, 'keyset_ordering', None)
+        if not ordering:
+            return None
+
+        try:
+            for field in ordering:
+                queryset.model._meta.get_field(field.lstrip('-'))
+        except FieldDoesNotExist:
+            return None
+        return tuple(ordering)
+
+    def include_count(self, request):
+        """
+        Indica se a contagem do total foi pedida (?count=true)
+        """
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def decode_cursor(self, request, model):
+        """
+        Retorna os valores do último item da página anterior, ou None na primeira página
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.keyset_ordering):
+                raise ValueError(cursor)
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.keyset_ordering, values)
+            ]
+        except (ValueError, TypeError, UnicodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_value(value):
+        # Datas com os microssegundos completos (o DjangoJSONEncoder os corta em milissegundos)
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def get_keyset_filter(self, position):
+        """
+        Retorna o filtro dos itens posteriores à posição na ordem do cursor
+
+        Para ('-created_at', '-id'): created_at < c OU (created_at = c E id < i).
+        """
+        keyset_filter = Q()
+        for index, field in enumerate(self.keyset_ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(self.keyset_ordering[:index], position[:index]):
+                condition &= Q(**{previous.lstrip('-'): value})
+            keyset_filter |= condition
+        return keyset_filter
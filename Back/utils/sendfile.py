@@ -0,0 +1,72 @@
+"""
+Envio de arquivos do disco com suporte a cache HTTP.
+
+O arquivo é entregue sem ser lido pelo Python: com SENDFILE_BACKEND = 'nginx' a
+resposta leva apenas o cabeçalho X-Accel-Redirect, com 'apache' (ou lighttpd) o
+cabeçalho X-Sendfile, e sem configuração é usado o FileResponse, que aproveita o
+sendfile do servidor WSGI. As respostas incluem ETag e Last-Modified, e requisições
+condicionais (If-None-Match / If-Modified-Since) recebem 304.
+"""
+
+import os
+import hashlib
+import mimetypes
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+# Tempo padrão de cache no navegador/CDN (1 dia)
+DEFAULT_MAX_AGE = 60 * 60 * 24
+
+
+def get_file_etag(path, stat=None):
+    """
+    Gera um ETag a partir do caminho, tamanho e data de modificação do arquivo,
+    sem ler o conteúdo
+    """
+    stat = stat or os.stat(path)
+    key_data = f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+    return f'"{hashlib.md5(key_data.encode()).hexdigest()}"'
+
+
+def send_file(request, path, content_type=None, max_age=DEFAULT_MAX_AGE):
+    """
+    Cria a resposta que envia um arquivo do disco
+
+    Args:
+        request: Requisição HTTP
+        path (str): Caminho absoluto do arquivo
+        content_type (str): Tipo do conteúdo (padrão: deduzido pela extensão)
+        max_age (int): Tempo de cache em segundos para navegadores e CDNs
+
+    Returns:
+        HttpResponse: Resposta com o arquivo, 304 se o cliente já tiver a versão atual
+    """
+    stat = os.stat(path)
+    etag = get_file_etag(path, stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        backend = getattr(settings, 'SENDFILE_BACKEND', None)
+
+        if backend == 'nginx':
+            # O nginx entrega o arquivo a partir de um location interno
+            root = getattr(settings, 'SENDFILE_ROOT', settings.MEDIA_ROOT)
+            url = getattr(settings, 'SENDFILE_URL', '/protected/')
+            relative_path = os.path.relpath(path, root).replace(os.sep, '/')
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = quote(f"{url.rstrip('/')}/{relative_path}")
+        elif backend in ('apache', 'lighttpd'):
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = path
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
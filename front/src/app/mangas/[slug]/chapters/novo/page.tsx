@@ -44,7 +44,7 @@ export default function NovoCapituloPage({ params }: { params: { slug: string }
     const fetchManga = async () => {
       try {
         setIsLoading(true);
-        const mangaData = await mangasService.getMangaBySlug(params.slug);
+        const mangaData = await mangasService.getMangaBySlug(params.slug, 'chapters');
 
         if (!mangaData) {
           showNotification('Mangá não encontrado', 'error');
@@ -51,7 +51,7 @@ export default function MangaDetailPage({ params }: { params: { slug: string } }
         setIsLoading(true);
 
         // Buscar o mangá pelo slug
-        const mangaData = await mangasService.getMangaBySlug(params.slug);
+        const mangaData = await mangasService.getMangaBySlug(params.slug, 'chapters');
 
         if (!mangaData) {
           setError('Mangá não encontrado');
@@ -153,7 +153,7 @@ export default function MangasPage() {
             views_count: manga.views_count || 0,
             comments_count: manga.comments_count || 0,
             author_id: manga.author_id,
-            has_chapters: manga.chapters && manga.chapters.length > 0,
+            has_chapters: (manga.chapters_count || 0) > 0,
             featured: manga.featured || false
           };
         });
@@ -310,7 +310,7 @@ export default function MangasPage() {
             views_count: manga.views_count || 0,
             comments_count: manga.comments_count || 0,
             author_id: manga.author_id,
-            has_chapters: manga.chapters && manga.chapters.length > 0,
+            has_chapters: (manga.chapters_count || 0) > 0,
             featured: manga.featured || false
           };
         });
@@ -12,6 +12,7 @@ export interface Manga {
   description: string;
   cover: string | null;
   chapters: Chapter[];
+  chapters_count?: number; // Listagem: número de capítulos (a lista não inclui os capítulos)
   created_at: string;
   views_count?: number;
   comments_count?: number;
@@ -98,10 +99,13 @@ export const getMangas = async (): Promise<Manga[]> => {
 
 /**
  * Obtém um mangá pelo slug
+ *
+ * Os capítulos só são incluídos com expand = 'chapters' (sem páginas e comentários).
  */
-export const getMangaBySlug = async (slug: string): Promise<Manga | null> => {
+export const getMangaBySlug = async (slug: string, expand?: string): Promise<Manga | null> => {
   try {
-    const response = await fetch(`${API_BASE_URL}${API_ENDPOINTS.MANGAS.DETAIL(slug)}`, {
+    const query = expand ? `?expand=${encodeURIComponent(expand)}` : '';
+    const response = await fetch(`${API_BASE_URL}${API_ENDPOINTS.MANGAS.DETAIL(slug)}${query}`, {
       method: 'GET',
       headers: getDefaultHeaders(),
     });